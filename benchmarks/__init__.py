@@ -0,0 +1 @@
+# ichika 离线性能基准
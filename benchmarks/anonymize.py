@@ -0,0 +1,65 @@
+"""
+录制响应脱敏
+把真实抓到的响应里的昵称、简介、正文、头像等替换成占位内容后写入 benchmarks/fixtures/，
+ID 与时间字段保持不变，以免影响排序与增量解析的行为
+
+用法：python -m benchmarks.anonymize <录制文件> <fixture 名>
+"""
+import hashlib
+import json
+import sys
+from typing import Any
+
+from benchmarks.fixtures import FIXTURE_DIR
+
+# 需要替换为同长度占位文本的字段
+_TEXT_KEYS = {
+    "full_text", "text", "description", "name", "screen_name", "username", "location",
+    "title", "desc", "summary", "uname", "sign", "display_url", "expanded_url",
+}
+# 需要替换为占位链接的字段
+_URL_KEYS = {
+    "profile_image_url", "profile_image_url_https", "profile_banner_url", "image_url",
+    "media_url_https", "url", "face", "cover", "jump_url",
+}
+
+
+def _placeholder(value: str) -> str:
+    digest = hashlib.sha1(value.encode()).hexdigest()
+    return (digest * (len(value) // len(digest) + 1))[:len(value)]
+
+
+def anonymize(data: Any) -> Any:
+    if isinstance(data, dict):
+        result = {}
+        for k, v in data.items():
+            if isinstance(v, str) and k in _TEXT_KEYS:
+                result[k] = _placeholder(v)
+            elif isinstance(v, str) and k in _URL_KEYS and v:
+                result[k] = f"https://example.invalid/{_placeholder(v)[:16]}.jpg"
+            else:
+                result[k] = anonymize(v)
+        return result
+    if isinstance(data, list):
+        return [anonymize(v) for v in data]
+    return data
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print(__doc__)
+        return 1
+    src, name = argv
+    with open(src, encoding="utf-8") as f:
+        data = json.load(f)
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    dst = FIXTURE_DIR / f"{name}.json"
+    with open(dst, "w", encoding="utf-8") as f:
+        json.dump(anonymize(data), f, ensure_ascii=False)
+    print(f"written {dst}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
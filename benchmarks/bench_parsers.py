@@ -0,0 +1,220 @@
+"""
+时间线解析基准
+对每个平台的录制 / 生成响应分别测量：JSON 解码（json 与 orjson）、全量解析、
+带 stop_at_id 的增量解析（模拟一次轮询只有少量新推文），以及作者信息不复用的旧写法作为对照。
+除吞吐外用 tracemalloc 记录单次解析的峰值内存和分配块数
+
+用法：
+    python -m benchmarks.bench_parsers                       # 打印表格
+    python -m benchmarks.bench_parsers --save base.json      # 保存结果
+    python -m benchmarks.bench_parsers --compare base.json   # 与保存的结果对比，吞吐下降超过阈值时返回非 0
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fixtures import GENERATORS, is_recorded, load_fixture
+from ichika.utils.bili_api_manager import BilibiliApiManager
+from ichika.utils.twikit_manager import TwikitManager
+from ichika.utils.twitter_manager import TwitterManager
+from ichika.utils.x_api_manager import XAPIManager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 增量解析时假设已见过的位置：第 N 条（即本次只有 N-1 条新内容）
+NEW_ITEMS = 3
+
+
+def _timeit(fn: Callable[[], Any], min_time: float, batches: int = 5) -> float:
+    """分批重复调用累计约 min_time 秒，返回最快一批的单次平均耗时（秒），减少抖动影响"""
+    fn()
+    start = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - start, 1e-7)
+    per_batch = max(1, int(min_time / batches / once))
+    best = float("inf")
+    for _ in range(batches):
+        start = time.perf_counter()
+        for _ in range(per_batch):
+            fn()
+        best = min(best, (time.perf_counter() - start) / per_batch)
+    return best
+
+
+def _memory(fn: Callable[[], Any]) -> Dict[str, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = fn()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+    del result
+    return {"peak_kb": peak // 1024, "blocks": blocks}
+
+
+def _count(result) -> int:
+    if isinstance(result, tuple):
+        return len(result[0])
+    if isinstance(result, dict) and "tweets" in result:
+        return len(result["tweets"])
+    return len(result or ())
+
+
+# ---------- 各平台的解析用例 ----------
+# 每个用例返回 {变体名: 无参调用}，输入为已解码的响应
+
+def _graphql_cases(data: Dict) -> Dict[str, Callable]:
+    entries = data["data"]["user"]["result"]["timeline"]["timeline"]["instructions"][-1]["entries"]
+    tweet_ids = [e["entryId"][6:] for e in entries if e["entryId"].startswith("tweet-")]
+    stop = tweet_ids[min(NEW_ITEMS, len(tweet_ids)) - 1]
+
+    def no_reuse():
+        out = {}
+        for entry in entries:
+            parsed = TwitterManager.parse_twit_data_one(entry)
+            if parsed and parsed[2] is not None:
+                out[parsed[0]] = parsed[2]
+        return out
+
+    return {
+        "full": lambda: TwitterManager.parse_timeline(data),
+        "incremental": lambda: TwitterManager.parse_timeline(data, stop),
+        "no_user_reuse": no_reuse,
+    }
+
+
+def _twikit_cases(data: Dict) -> Dict[str, Callable]:
+    from twikit.tweet import tweet_from_data
+
+    entries = data["data"]["user"]["result"]["timeline"]["timeline"]["instructions"][-1]["entries"]
+    tweets = [t for t in (tweet_from_data(None, e) for e in entries if e["entryId"].startswith("tweet-")) if t]
+    stop = tweets[min(NEW_ITEMS, len(tweets)) - 1].id
+    # 解析只依赖 Tweet / User 对象，不需要登录好的客户端
+    tm = TwikitManager.__new__(TwikitManager)
+
+    def no_reuse():
+        return {p["id"]: p for p in (tm._parse_tweet(t) for t in tweets) if p and p.get("id")}
+
+    return {
+        "full": lambda: tm._parse_timeline_tweets(tweets),
+        "incremental": lambda: tm._parse_timeline_tweets(tweets, stop),
+        "no_user_reuse": no_reuse,
+    }
+
+
+def _x_api_cases(data: Dict) -> Dict[str, Callable]:
+    stop = data["data"][min(NEW_ITEMS, len(data["data"])) - 1]["id"]
+    includes = data.get("includes", {})
+    media_map = {m["media_key"]: m for m in includes.get("media", [])}
+    users_map = {u["id"]: u for u in includes.get("users", [])}
+
+    return {
+        "full": lambda: XAPIManager.parse_tweets(data),
+        "incremental": lambda: XAPIManager.parse_tweets(data, stop),
+        "no_user_reuse": lambda: [XAPIManager.parse_tweet(t, media_map, users_map) for t in data["data"]],
+    }
+
+
+def _bilibili_cases(data: Dict) -> Dict[str, Callable]:
+    unpinned = [i["id_str"] for i in data["items"] if not (i.get("modules") or {}).get("module_tag")]
+    stop = unpinned[min(NEW_ITEMS, len(unpinned)) - 1]
+    return {
+        "full": lambda: BilibiliApiManager.parse_timeline(data),
+        "incremental": lambda: BilibiliApiManager.parse_timeline(data, stop),
+    }
+
+
+CASES = [
+    ("twitter_graphql", "twitter_graphql_timeline", _graphql_cases),
+    ("twikit", "twitter_graphql_timeline", _twikit_cases),
+    ("x_api", "x_api_tweets", _x_api_cases),
+    ("bilibili", "bilibili_dynamics", _bilibili_cases),
+]
+
+
+def run(min_time: float) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    decoded = set()
+    for name, fixture, build in CASES:
+        raw = load_fixture(fixture)
+        data = json.loads(raw)
+        if fixture not in decoded:
+            decoded.add(fixture)
+            entry = {"bytes": len(raw), "recorded": is_recorded(fixture)}
+            entry["json_ms"] = _timeit(lambda: json.loads(raw), min_time) * 1000
+            if orjson is not None:
+                entry["orjson_ms"] = _timeit(lambda: orjson.loads(raw), min_time) * 1000
+            entry.update(_memory(lambda: json.loads(raw)))
+            results[f"decode/{fixture}"] = entry
+        for variant, fn in build(data).items():
+            items = _count(fn())
+            seconds = _timeit(fn, min_time)
+            entry = {"items": items, "ms": seconds * 1000, "items_per_s": items / seconds if seconds else 0.0}
+            entry.update(_memory(fn))
+            results[f"parse/{name}/{variant}"] = entry
+    return results
+
+
+def _print(results: Dict[str, Dict[str, Any]]):
+    print(f"{'case':<40} {'items':>6} {'ms':>9} {'items/s':>10} {'peak KB':>8} {'blocks':>7}")
+    for key, r in results.items():
+        if key.startswith("decode/"):
+            extra = f" orjson {r['orjson_ms']:.3f} ms" if "orjson_ms" in r else ""
+            src = "recorded" if r["recorded"] else "synthetic"
+            print(f"{key:<40} {r['bytes'] // 1024:>5}K {r['json_ms']:>9.3f} {'':>10} {r['peak_kb']:>8} {r['blocks']:>7}"
+                  f"  ({src},{extra})")
+        else:
+            print(f"{key:<40} {r['items']:>6} {r['ms']:>9.3f} {r['items_per_s']:>10.0f} {r['peak_kb']:>8} {r['blocks']:>7}")
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """返回耗时比基线慢超过 tolerance（比例）的用例"""
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for field in ("ms", "json_ms", "orjson_ms"):
+            if field in r and base.get(field) and r[field] > base[field] * (1 + tolerance):
+                regressions.append(f"{key} {field}: {base[field]:.3f} -> {r[field]:.3f}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--min-time", type=float, default=0.2, help="每个用例的最少测量时间（秒）")
+    parser.add_argument("--save", help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的结果对比")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的变慢比例")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    results = run(args.min_time)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
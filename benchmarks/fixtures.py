@@ -0,0 +1,289 @@
+"""
+基准测试用的响应数据
+优先读取 benchmarks/fixtures/<name>.json（用 benchmarks/anonymize.py 脱敏后的真实录制响应），
+不存在时按各平台的响应结构确定性地生成同等规模的数据
+"""
+import json
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from ichika.utils.snowflake import from_timestamp
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+# 固定时间基准，保证每次生成的数据一致
+_BASE_TS = 1_760_000_000
+
+
+def _words(rng: random.Random, n: int) -> str:
+    vocab = ["lorem", "ipsum", "dolor", "sit", "amet", "配信", "今日", "ありがとう", "#hashtag", "https://t.co/xxxx"]
+    return " ".join(rng.choice(vocab) for _ in range(n))
+
+
+def _gql_user(rng: random.Random, uid: int) -> Dict[str, Any]:
+    name = f"user{uid}"
+    return {
+        "__typename": "User",
+        "id": f"VXNlcjo{uid}",
+        "rest_id": str(uid),
+        "affiliates_highlighted_label": {},
+        "avatar": {"image_url": f"https://pbs.twimg.com/profile_images/{uid}/avatar_normal.jpg"},
+        "core": {"created_at": "Mon Jan 01 00:00:00 +0000 2018", "name": name.title(), "screen_name": name},
+        "dm_permissions": {"can_dm": False},
+        "has_graduated_access": True,
+        "is_blue_verified": rng.random() < 0.3,
+        # twikit 仍从 legacy 读取这些字段，线上响应两处都有
+        "legacy": {
+            "can_dm": False,
+            "can_media_tag": True,
+            "created_at": "Mon Jan 01 00:00:00 +0000 2018",
+            "name": name.title(),
+            "screen_name": name,
+            "location": "Tokyo",
+            "profile_image_url_https": f"https://pbs.twimg.com/profile_images/{uid}/avatar_normal.jpg",
+            "verified": False,
+            "default_profile": False,
+            "default_profile_image": False,
+            "description": _words(rng, 20),
+            "entities": {"description": {"urls": []}, "url": {"urls": []}},
+            "fast_followers_count": 0,
+            "favourites_count": rng.randint(0, 100000),
+            "followers_count": rng.randint(0, 1000000),
+            "friends_count": rng.randint(0, 5000),
+            "has_custom_timelines": True,
+            "is_translator": False,
+            "listed_count": rng.randint(0, 5000),
+            "media_count": rng.randint(0, 5000),
+            "normal_followers_count": rng.randint(0, 1000000),
+            "pinned_tweet_ids_str": [],
+            "possibly_sensitive": False,
+            "profile_banner_url": f"https://pbs.twimg.com/profile_banners/{uid}/1",
+            "profile_interstitial_type": "",
+            "statuses_count": rng.randint(0, 50000),
+            "translator_type": "none",
+            "want_retweets": False,
+            "withheld_in_countries": [],
+        },
+        "location": {"location": "Tokyo"},
+        "media_permissions": {"can_media_tag": True},
+        "parody_commentary_fan_label": "None",
+        "profile_image_shape": "Circle",
+        "privacy": {"protected": False},
+        "relationship_perspectives": {"following": True},
+        "verification": {"verified": False},
+    }
+
+
+def _gql_tweet(rng: random.Random, tid: int, user: Dict, ts: int, nested: int = 0) -> Dict[str, Any]:
+    from datetime import datetime, timezone
+
+    created_at = datetime.fromtimestamp(ts, timezone.utc).strftime("%a %b %d %H:%M:%S %z %Y")
+    media = [
+        {
+            "display_url": "pic.x.com/xxxx",
+            "expanded_url": f"https://x.com/{user['core']['screen_name']}/status/{tid}/photo/{i + 1}",
+            "id_str": str(tid + i + 1),
+            "indices": [100, 123],
+            "media_key": f"3_{tid + i + 1}",
+            "media_url_https": f"https://pbs.twimg.com/media/{tid}_{i}.jpg",
+            "type": "photo",
+            "url": "https://t.co/xxxx",
+            "ext_media_availability": {"status": "Available"},
+            "features": {"large": {"faces": []}, "medium": {"faces": []}, "small": {"faces": []}, "orig": {"faces": []}},
+            "sizes": {k: {"h": 1200, "w": 900, "resize": "fit"} for k in ("large", "medium", "small", "thumb")},
+            "original_info": {"height": 1200, "width": 900, "focus_rects": []},
+        }
+        for i in range(rng.choice([0, 0, 1, 2, 4]))
+    ]
+    legacy = {
+        "bookmark_count": rng.randint(0, 1000),
+        "bookmarked": False,
+        "created_at": created_at,
+        "conversation_id_str": str(tid),
+        "display_text_range": [0, 140],
+        "entities": {"hashtags": [], "media": media, "symbols": [], "timestamps": [], "urls": [], "user_mentions": []},
+        "extended_entities": {"media": media},
+        "favorite_count": rng.randint(0, 100000),
+        "favorited": False,
+        "full_text": _words(rng, 30),
+        "is_quote_status": False,
+        "lang": "ja",
+        "possibly_sensitive": False,
+        "possibly_sensitive_editable": True,
+        "quote_count": rng.randint(0, 100),
+        "reply_count": rng.randint(0, 1000),
+        "retweet_count": rng.randint(0, 10000),
+        "retweeted": False,
+        "user_id_str": user["rest_id"],
+        "id_str": str(tid),
+    }
+    result = {
+        "__typename": "Tweet",
+        "rest_id": str(tid),
+        "core": {"user_results": {"result": user}},
+        "unmention_data": {},
+        "edit_control": {"edit_tweet_ids": [str(tid)], "editable_until_msecs": str(ts * 1000), "is_edit_eligible": True, "edits_remaining": "5"},
+        "is_translatable": True,
+        "views": {"count": str(rng.randint(0, 10 ** 7)), "state": "EnabledWithCount"},
+        "source": '<a href="https://mobile.twitter.com" rel="nofollow">Twitter Web App</a>',
+        "grok_analysis_button": True,
+        "legacy": legacy,
+    }
+    return result
+
+
+def twitter_graphql_timeline(count: int = 40, seed: int = 1) -> Dict[str, Any]:
+    """UserTweets GraphQL 响应（TwitterManager.parse_timeline / TwikitManager 解析用）"""
+    rng = random.Random(seed)
+    owner = _gql_user(rng, 1000)
+    others = [_gql_user(rng, 2000 + i) for i in range(6)]
+    entries = []
+    for i in range(count):
+        ts = _BASE_TS - i * 1800
+        tid = from_timestamp(ts) + i
+        tweet = _gql_tweet(rng, tid, owner, ts)
+        kind = rng.random()
+        if kind < 0.3:
+            orig_ts = ts - 3600
+            tweet["legacy"]["retweeted_status_result"] = {
+                "result": _gql_tweet(rng, from_timestamp(orig_ts) + i, rng.choice(others), orig_ts)
+            }
+        elif kind < 0.45:
+            orig_ts = ts - 7200
+            tweet["quoted_status_result"] = {
+                "result": _gql_tweet(rng, from_timestamp(orig_ts) + i, rng.choice(others), orig_ts)
+            }
+            tweet["legacy"]["is_quote_status"] = True
+        entries.append({
+            "entryId": f"tweet-{tid}",
+            "sortIndex": str(tid),
+            "content": {
+                "entryType": "TimelineTimelineItem",
+                "__typename": "TimelineTimelineItem",
+                "itemContent": {
+                    "itemType": "TimelineTweet",
+                    "__typename": "TimelineTweet",
+                    "tweet_results": {"result": tweet},
+                    "tweetDisplayType": "Tweet",
+                },
+            },
+        })
+    entries.append({
+        "entryId": "cursor-bottom-0",
+        "sortIndex": "0",
+        "content": {"entryType": "TimelineTimelineCursor", "value": "DAABCgABGxxx", "cursorType": "Bottom"},
+    })
+    return {
+        "data": {"user": {"result": {"__typename": "User", "timeline": {"timeline": {"instructions": [
+            {"type": "TimelineClearCache"},
+            {"type": "TimelineAddEntries", "entries": entries},
+        ], "metadata": {"scribeConfig": {"page": "profileBest"}}}}}}}
+    }
+
+
+def x_api_tweets(count: int = 100, seed: int = 2) -> Dict[str, Any]:
+    """官方 API v2 users/:id/tweets 响应（XAPIManager.parse_tweets 解析用）"""
+    rng = random.Random(seed)
+    users = [
+        {"id": str(3000 + i), "name": f"User {i}", "username": f"user{i}",
+         "profile_image_url": f"https://pbs.twimg.com/profile_images/{i}/a_normal.jpg", "verified": False}
+        for i in range(5)
+    ]
+    tweets, media = [], []
+    for i in range(count):
+        ts = _BASE_TS - i * 1200
+        tid = str(from_timestamp(ts) + i)
+        keys = []
+        for j in range(rng.choice([0, 1, 2])):
+            key = f"3_{tid}{j}"
+            keys.append(key)
+            media.append({"media_key": key, "type": "photo", "url": f"https://pbs.twimg.com/media/{key}.jpg"})
+        tweet = {
+            "id": tid,
+            "text": _words(rng, 30),
+            "created_at": f"2025-10-09T{i % 24:02d}:00:00.000Z",
+            "author_id": rng.choice(users)["id"],
+            "edit_history_tweet_ids": [tid],
+            "public_metrics": {"retweet_count": 1, "reply_count": 2, "like_count": 3, "quote_count": 4, "impression_count": 5},
+            "entities": {"urls": [{"start": 0, "end": 23, "url": "https://t.co/xxxx"}], "hashtags": [], "mentions": []},
+        }
+        if keys:
+            tweet["attachments"] = {"media_keys": keys}
+        tweets.append(tweet)
+    return {
+        "data": tweets,
+        "includes": {"users": users, "media": media},
+        "meta": {"newest_id": tweets[0]["id"], "oldest_id": tweets[-1]["id"], "result_count": count, "next_token": "7140dibdnow9c7btw4"},
+    }
+
+
+def _bili_item(rng: random.Random, did: int, ts: int, mid: int, pinned: bool = False, forward: bool = True) -> Dict[str, Any]:
+    types = ["DYNAMIC_TYPE_DRAW", "DYNAMIC_TYPE_WORD", "DYNAMIC_TYPE_AV"]
+    dtype = rng.choice(types + ["DYNAMIC_TYPE_FORWARD"] if forward else types)
+    author = {
+        "mid": mid, "name": f"up{mid}", "face": f"https://i0.hdslb.com/bfs/face/{mid}.jpg",
+        "pub_ts": ts, "pub_action": "", "pub_time": "", "type": "AUTHOR_TYPE_NORMAL",
+        "decorate": {"card_url": "https://i0.hdslb.com/bfs/garb/x.png", "fan": {"num_str": "000001"}},
+        "pendant": {"image": ""}, "vip": {"status": 1, "type": 2},
+    }
+    modules: Dict[str, Any] = {
+        "module_author": author,
+        "module_dynamic": {"additional": None, "desc": {"text": _words(rng, 20), "rich_text_nodes": []}, "major": None, "topic": None},
+        "module_more": {"three_point_items": [{"label": "举报", "type": "THREE_POINT_REPORT"}]},
+        "module_stat": {"comment": {"count": 10}, "forward": {"count": 2}, "like": {"count": 100}},
+    }
+    if pinned:
+        modules["module_tag"] = {"text": "置顶"}
+    if dtype in ("DYNAMIC_TYPE_DRAW", "DYNAMIC_TYPE_WORD"):
+        modules["module_dynamic"]["major"] = {"type": "MAJOR_TYPE_OPUS", "opus": {
+            "summary": {"text": _words(rng, 30), "rich_text_nodes": []},
+            "pics": [{"url": f"https://i0.hdslb.com/bfs/new_dyn/{did}_{i}.jpg", "width": 1080, "height": 1440}
+                     for i in range(rng.randint(1, 4) if dtype == "DYNAMIC_TYPE_DRAW" else 0)],
+            "title": None,
+        }}
+    elif dtype == "DYNAMIC_TYPE_AV":
+        modules["module_dynamic"]["major"] = {"type": "MAJOR_TYPE_ARCHIVE", "archive": {
+            "aid": str(did % 10 ** 9), "bvid": "BV1xx411c7mD", "cover": f"https://i0.hdslb.com/bfs/archive/{did}.jpg",
+            "desc": _words(rng, 20), "duration_text": "10:00", "jump_url": "//www.bilibili.com/video/BV1xx411c7mD/",
+            "stat": {"danmaku": "100", "play": "10000"}, "title": _words(rng, 6),
+        }}
+    item = {
+        "basic": {"comment_id_str": str(did), "comment_type": 11, "jump_url": f"//www.bilibili.com/opus/{did}", "rid_str": str(did)},
+        "id_str": str(did),
+        "modules": modules,
+        "type": dtype,
+        "visible": True,
+    }
+    if dtype == "DYNAMIC_TYPE_FORWARD":
+        item["orig"] = _bili_item(rng, did - 12345, ts - 3600, mid + 1, forward=False)
+    return item
+
+
+def bilibili_dynamics(count: int = 30, seed: int = 3) -> Dict[str, Any]:
+    """space 动态列表响应（BilibiliApiManager.parse_timeline 解析用），第一条为置顶"""
+    rng = random.Random(seed)
+    mid = 1755331
+    items = [_bili_item(rng, 900000000000000000, _BASE_TS - 86400 * 30, mid, pinned=True)]
+    for i in range(count):
+        ts = _BASE_TS - i * 3600
+        items.append(_bili_item(rng, 1100000000000000000 - i * 100000, ts, mid))
+    return {"has_more": True, "items": items, "offset": items[-1]["id_str"], "update_baseline": items[1]["id_str"], "update_num": 0}
+
+
+GENERATORS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "twitter_graphql_timeline": twitter_graphql_timeline,
+    "x_api_tweets": x_api_tweets,
+    "bilibili_dynamics": bilibili_dynamics,
+}
+
+
+def load_fixture(name: str) -> bytes:
+    """返回原始响应字节（与线上解析前拿到的数据一致）"""
+    recorded = FIXTURE_DIR / f"{name}.json"
+    if recorded.exists():
+        return recorded.read_bytes()
+    return json.dumps(GENERATORS[name](), ensure_ascii=False).encode()
+
+
+def is_recorded(name: str) -> bool:
+    return (FIXTURE_DIR / f"{name}.json").exists()
@@ -21,3 +21,29 @@ def get(key: str, default=None):
     # 'twitter.cookie' -> 'twitter_cookie'
     attr = key.replace('.', '_').lower()
     return getattr(cfg, attr, default)
+
+
+def get_int(key: str, default: int) -> int:
+    """读取整数配置项，未配置或格式错误时返回 default"""
+    try:
+        return int(get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_float(key: str, default: float) -> float:
+    """读取浮点数配置项，未配置或格式错误时返回 default"""
+    try:
+        return float(get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_bool(key: str, default: bool = False) -> bool:
+    """读取布尔配置项，接受 true/false、1/0、yes/no"""
+    value = get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
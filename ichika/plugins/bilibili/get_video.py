@@ -11,6 +11,7 @@ from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment, Messa
 
 from ichika.config import get as cfg_get
 from ichika.utils.bili_api_manager import BilibiliApiManager
+from ichika.utils.circuit_breaker import get_breakers
 from ichika.utils.tz import SHA_TZ
 
 _BV_URL_PATTERN = re.compile(r"https?://www\.bilibili\.com/video/(BV[a-zA-Z0-9_]+)")
@@ -36,6 +37,7 @@ def _get_manager():
                 "bili_jct": cfg_get("bilibili.bili_jct") or "",
                 "buvid3": cfg_get("bilibili.buvid3") or "",
                 "dedeuserid": cfg_get("bilibili.dedeuserid") or "",
+                "breakers": get_breakers(),
             })
         except Exception as e:
             logger.error(f"BilibiliApiManager init failed: {e}")
@@ -1,33 +1,74 @@
 """
 Bilibili 动态定时推送插件
 每 5 分钟检查一次订阅用户的新动态，推送到对应群组
+各 UID 并发抓取（并发数与请求速率可配置），一轮耗时不随订阅数线性增长
+每轮每个 UID 只请求一次动态列表；用户资料缓存在 data.json 的 "users" 中，由每小时一次的任务刷新过期的部分
+遇到风控（-352/-412）时熔断器打开，本轮剩余账号和之后的轮次都跳过，直到冷却结束后试探恢复
+开启 BILIBILI_FEED_MODE 后改为读取登录账号自己的关注动态流：每轮先探测更新数，
+没有新动态只花一个很小的请求；有新动态才拉一页关注动态，按作者 UID 分发到 subscribes.json 里的群
+（需要登录账号关注所有订阅的 UP 主；一页装不下本轮新动态或请求失败时，本轮退回逐个 UID 轮询）
+开播/下播提醒：每分钟用一个批量请求查询所有订阅 UID 的直播间状态，与 data.json 的 "live_status" 比较，
+只在状态变化时推送
+开启 BILIBILI_LIVE_PUSH 后每个订阅的直播间保持一条弹幕 WebSocket 连接，收到 LIVE/PREPARING 立即推送，
+断线按指数退避重连；已连上的直播间不再参与每分钟的批量查询，全部连上时轮询不发任何请求
 配置项（.env.prod）：
   BILIBILI_SESSDATA=
   BILIBILI_BILI_JCT=
   BILIBILI_BUVID3=
   BILIBILI_DEDEUSERID=
+  BILIBILI_CONCURRENCY=3                (可选，同时抓取的 UID 数)
+  BILIBILI_RATE=60                      (可选，所有 UID 合计每分钟请求数)
+  BILIBILI_RATE_BURST=5                 (可选，允许的突发请求数)
+  BILIBILI_USER_TTL=24                  (可选，用户资料缓存有效期，小时)
+  BILIBILI_FEED_MODE=false              (可选，关注动态流模式)
+  BILIBILI_LIVE_NOTIFY=true             (可选，开播/下播提醒)
+  BILIBILI_LIVE_INTERVAL=1              (可选，直播状态查询间隔，分钟)
+  BILIBILI_LIVE_PUSH=false              (可选，弹幕连接推送模式)
+  BILIBILI_LIVE_MAX_CONN=50             (可选，推送模式的连接数上限，超出的直播间继续轮询)
+  BILIBILI_LIVE_STANDIN=127.0.0.1:9000  (可选，仅测试用，连接本地替身服务器，见 bili_live_monitor.py)
+  BREAKER_*                             (可选，熔断器参数，见 twitter/manager.py)
 """
 import asyncio
+from functools import partial
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
-from nonebot import require, logger, get_bot
+from nonebot import get_bot, get_driver, logger, require
 from nonebot.adapters.onebot.v11 import MessageSegment, Message
 
 require("nonebot_plugin_apscheduler")
 from nonebot_plugin_apscheduler import scheduler
 
-from ichika.config import get as cfg_get
-from ichika.utils.bili_api_manager import BilibiliApiManager
+from ichika.config import get as cfg_get, get_bool as cfg_get_bool, get_int as cfg_get_int
+from ichika.utils.bili_api_manager import LIVE_OFF, LIVE_ON, BilibiliApiManager
+from ichika.utils.bili_live_monitor import LiveMonitor, StandInDanmaku
+from ichika.utils.circuit_breaker import CircuitOpen, get_breakers
 from ichika.utils.fileio import read_json, write_json
+from ichika.utils.group_sender import get_sender
+from ichika.utils.media_cache import image_segments
+from ichika.utils.rate_limit import TokenBucket
 
 RESOURCE_PATH = Path(__file__).parent.parent.parent / "resources" / "bili_dynamic"
 SUBSCRIBES_FILE = RESOURCE_PATH / "subscribes.json"
 DATA_FILE = RESOURCE_PATH / "data.json"
 
-_lock = asyncio.Lock()
+# 所有 UID 共用的请求节奏，代替原来每个 UID 之间固定 sleep 2 秒
+_request_bucket = TokenBucket.per_window(
+    cfg_get_int("bilibili.rate", 60), 60, burst=cfg_get_int("bilibili.rate_burst", 5)
+)
+CONCURRENCY = max(cfg_get_int("bilibili.concurrency", 3), 1)
+FEED_MODE = cfg_get_bool("bilibili.feed_mode")
+LIVE_NOTIFY = cfg_get_bool("bilibili.live_notify", True)
+LIVE_PUSH = LIVE_NOTIFY and cfg_get_bool("bilibili.live_push")
+
+# 只保护 data.json 的读-改-写；各任务在锁外请求、推送，写回时重新读取文件，只合并自己负责的字段
+_data_lock = asyncio.Lock()
 _bm: Optional[BilibiliApiManager] = None
+_users_seeded = False
+_monitor: Optional[LiveMonitor] = None
+
+driver = get_driver()
 
 
 def _get_manager() -> Optional[BilibiliApiManager]:
@@ -41,6 +82,8 @@ def _get_manager() -> Optional[BilibiliApiManager]:
             "bili_jct": cfg_get("bilibili.bili_jct") or "",
             "buvid3": cfg_get("bilibili.buvid3") or "",
             "dedeuserid": cfg_get("bilibili.dedeuserid") or "",
+            "breakers": get_breakers(),
+            "user_ttl": cfg_get_int("bilibili.user_ttl", 24) * 3600,
         }
         try:
             _bm = BilibiliApiManager(config=config)
@@ -51,14 +94,90 @@ def _get_manager() -> Optional[BilibiliApiManager]:
 
 @scheduler.scheduled_job("interval", minutes=5, id="bilibili_dynamic_timeline")
 async def bilibili_dynamic_task() -> None:
-    async with _lock:
-        await _do_dynamic()
+    await _do_dynamic()
+
+
+@scheduler.scheduled_job("interval", hours=1, id="bilibili_profile_refresh")
+async def bilibili_profile_task() -> None:
+    await _do_profile_refresh()
+
+
+@scheduler.scheduled_job(
+    "interval", minutes=max(cfg_get_int("bilibili.live_interval", 1), 1), id="bilibili_live_status"
+)
+async def bilibili_live_task() -> None:
+    if not LIVE_NOTIFY:
+        return
+    await _do_live()
+
+
+async def _merge_data(updates: dict) -> None:
+    """重新读取 data.json 并合并 updates 后写回：字典字段按键合并，其他字段直接覆盖"""
+    async with _data_lock:
+        try:
+            data: dict = await read_json(DATA_FILE) or {}
+            for key, value in updates.items():
+                if isinstance(value, dict):
+                    data.setdefault(key, {}).update(value)
+                else:
+                    data[key] = value
+            await write_json(DATA_FILE, data)
+        except Exception as e:
+            logger.error(f"bilibili: write data failed: {e}")
+
+
+def _seed_users(bm: BilibiliApiManager, data: dict) -> None:
+    """启动后第一次读到 data.json 时，把落盘的用户资料放回缓存，避免重启后全部重新请求"""
+    global _users_seeded
+    if _users_seeded:
+        return
+    _users_seeded = True
+    for uid_str, user_info in data.get("users", {}).items():
+        if user_info:
+            bm.seed_user(int(uid_str), user_info, user_info.get("updated_at", 0))
+
+
+async def _do_profile_refresh() -> None:
+    """刷新过期或缺失的用户资料（资料 + 粉丝数两个请求），与动态轮询分开，降低热路径的请求量"""
+    bm = _get_manager()
+    if not bm or not bm.breaker_ready():
+        return
+
+    try:
+        subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
+        data: dict = await read_json(DATA_FILE) or {}
+    except Exception as e:
+        logger.error(f"bilibili: read config failed: {e}")
+        return
+    _seed_users(bm, data)
+
+    stale = [uid_str for uid_str in subscribes if uid_str and bm.is_user_stale(int(uid_str))]
+    if not stale:
+        return
+
+    refreshed = {}
+    for uid_str in stale:
+        try:
+            await _request_bucket.acquire(2)
+            user_info = await bm.get_parsed_user(int(uid_str), force=True)
+        except CircuitOpen as e:
+            logger.warning(f"bilibili: {e}, stop refreshing profiles")
+            break
+        except Exception:
+            logger.exception(f"bilibili: get_user_info {uid_str} failed")
+            continue
+        refreshed[uid_str] = {**user_info, "updated_at": int(datetime.now().timestamp())}
+    if refreshed:
+        await _merge_data({"users": refreshed})
 
 
 async def _do_dynamic() -> None:
     bm = _get_manager()
     if not bm:
         return
+    if not bm.breaker_ready():
+        logger.debug(f"bilibili: circuit open, skip ({int(bm.breaker_retry_after())}s left)")
+        return
 
     try:
         subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
@@ -69,6 +188,7 @@ async def _do_dynamic() -> None:
 
     if not subscribes:
         return
+    _seed_users(bm, data)
 
     try:
         bot = get_bot()
@@ -76,92 +196,354 @@ async def _do_dynamic() -> None:
         logger.warning("bilibili: no bot, skip")
         return
 
-    data_changed = False
+    handled, data_changed = False, False
+    if FEED_MODE:
+        handled, data_changed = await _poll_feed(bm, bot, subscribes, data)
+    if not handled:
+        data_changed = await _poll_all_uids(bm, bot, subscribes, data) or data_changed
 
-    for uid_str, conf in subscribes.items():
-        uid: int = int(uid_str)
-        groups: list[int] = conf.get("groups", [])
-        if not uid or not groups:
-            continue
+    if data_changed:
+        # 一轮可能要几分钟，期间开播事件等已经改过文件，只写回动态相关的字段
+        await _merge_data({key: data[key] for key in ("last_dynamic_id", "feed_baseline") if key in data})
 
-        # 获取 User 对象
-        user_obj = bm.get_user(uid)
 
-        # 获取用户信息
-        try:
-            user_info_raw = await user_obj.get_user_info()
-            relation_info_raw = await user_obj.get_relation_info()
-            user_info = BilibiliApiManager.parse_user_info(user_info_raw, relation_info_raw)
-        except Exception as e:
-            logger.exception(f"bilibili: get_user_info {uid} failed")
-            continue
+async def _poll_all_uids(bm: BilibiliApiManager, bot, subscribes: dict, data: dict) -> bool:
+    """逐个 UID 抓取动态并推送，返回 data 是否有改动"""
+    # 并发抓取各 UID，实际请求节奏由令牌桶决定；结果在全部完成后统一合并、写一次文件
+    sem = asyncio.Semaphore(CONCURRENCY)
+    last_ids: dict = data.get("last_dynamic_id", {})
+    due = [(uid_str, conf) for uid_str, conf in subscribes.items() if uid_str and conf.get("groups")]
 
-        data.setdefault("users", {})[uid_str] = user_info
-        data_changed = True
+    async def _run(uid_str: str, conf: dict) -> Optional[dict]:
+        async with sem:
+            return await _poll_uid(bm, bot, uid_str, conf.get("groups", []), last_ids.get(uid_str, ""))
 
-        # 获取动态列表
-        try:
-            dynamic_raw = await user_obj.get_dynamics_new()
-            dynamic_id_list, dynamics = BilibiliApiManager.parse_timeline(dynamic_raw)
-        except Exception as e:
-            logger.exception(f"bilibili: get_dynamic {uid} failed")
-            continue
+    results = await asyncio.gather(*(_run(uid_str, conf) for uid_str, conf in due), return_exceptions=True)
 
-        if not dynamic_id_list:
+    data_changed = False
+    circuit_open = False
+    for (uid_str, _), result in zip(due, results):
+        if isinstance(result, CircuitOpen):
+            circuit_open = True
             continue
+        if isinstance(result, Exception):
+            logger.warning(f"bilibili: poll {uid_str} failed: {result}")
+            continue
+        if result and result.get("last_id"):
+            data.setdefault("last_dynamic_id", {})[uid_str] = result["last_id"]
+            data_changed = True
+    if circuit_open:
+        logger.warning(f"bilibili: circuit open, some UIDs skipped ({int(bm.breaker_retry_after())}s left)")
+    return data_changed
+
 
-        # 找出新动态
-        last_id = data.get("last_dynamic_id", {}).get(uid_str, "")
-        new_ids = [did for did in dynamic_id_list if not last_id or did > last_id]
+async def _poll_feed(bm: BilibiliApiManager, bot, subscribes: dict, data: dict) -> tuple[bool, bool]:
+    """
+    关注动态流模式：先探测更新数，有新动态才拉一页关注动态，按作者 UID 分发
+    返回 (是否已处理, data 是否有改动)；未处理时由调用方退回逐个 UID 轮询
+    """
+    baseline: str = data.get("feed_baseline", "")
+    try:
+        # 第一次运行还没有基线，直接拉一页建立基线
+        if baseline:
+            await _request_bucket.acquire()
+            update_num = await bm.get_feed_update_count(baseline)
+            if update_num <= 0:
+                return True, False
+        else:
+            update_num = 0
+        await _request_bucket.acquire()
+        feed = await bm.get_followed_feed()
+        dynamic_id_list, dynamics = BilibiliApiManager.parse_timeline(feed, baseline or None)
+    except CircuitOpen as e:
+        logger.warning(f"bilibili: {e}, skip feed")
+        return True, False
+    except Exception:
+        logger.exception("bilibili: get followed feed failed, fall back to polling each UID")
+        return False, False
 
+    if feed.get("update_baseline"):
+        data["feed_baseline"] = str(feed["update_baseline"])
+    if update_num > len(feed.get("items") or []) and feed.get("has_more"):
+        # 一页装不下所有新动态，本轮改为逐个 UID 抓取，避免漏推
+        logger.info(f"bilibili: {update_num} new feed items exceed one page, poll each UID")
+        return False, True
+
+    by_uid: dict[str, list[str]] = {}
+    for did in dynamic_id_list:
+        by_uid.setdefault(str(dynamics[did].get("mid") or ""), []).append(did)
+
+    last_ids: dict = data.setdefault("last_dynamic_id", {})
+    for uid_str, ids in by_uid.items():
+        groups = (subscribes.get(uid_str) or {}).get("groups")
+        if not groups:
+            continue
+        last_id = last_ids.get(uid_str, "")
+        new_ids = [did for did in ids if not last_id or int(did) > int(last_id)]
         if not new_ids:
             continue
+        last_ids[uid_str] = max(new_ids, key=int)
+        await _push_dynamics(bm, bot, uid_str, groups, new_ids, dynamics)
+    return True, True
+
+
+async def _poll_uid(bm: BilibiliApiManager, bot, uid_str: str, groups: list[int], last_id: str) -> Optional[dict]:
+    """
+    抓取单个 UID 的动态并推送新动态（每轮只有这一个请求）
+    返回需要合并进 data.json 的结果 {"last_id"}；熔断时抛出 CircuitOpen
+    """
+    uid = int(uid_str)
+    user_obj = bm.get_user(uid)
+    result: dict = {}
+
+    # 获取动态列表，只解析比 last_dynamic_id 新的部分
+    try:
+        await _request_bucket.acquire()
+        dynamic_raw = await bm.get_dynamic_list(user_obj)
+        dynamic_id_list, dynamics = BilibiliApiManager.parse_timeline(dynamic_raw, last_id or None)
+    except CircuitOpen:
+        raise
+    except Exception:
+        logger.exception(f"bilibili: get_dynamic {uid} failed")
+        return result
+
+    # 找出新动态
+    new_ids = [did for did in dynamic_id_list if not last_id or int(did) > int(last_id)]
+    if not new_ids:
+        return result
+    result["last_id"] = max(new_ids, key=int)
+
+    await _push_dynamics(bm, bot, uid_str, groups, new_ids, dynamics)
+    return result
+
+
+async def _push_dynamics(
+    bm: BilibiliApiManager, bot, uid_str: str, groups: list[int], new_ids: list[str], dynamics: dict
+) -> None:
+    """把一个 UID 的新动态推送到订阅的群"""
+    # 过滤超过 10 分钟的旧动态
+    now_ts = datetime.now().timestamp()
+    valid_ids = [did for did in new_ids if now_ts - int(dynamics.get(did, {}).get("time", 0)) <= 600]
+
+    # 名字取缓存的资料，新订阅还没刷新资料时用动态里的作者名
+    cached = bm.cached_user(int(uid_str)) or {}
+    for did in valid_ids:
+        dyn = dynamics.get(did, {})
+        uname = cached.get("name") or dyn.get("author") or uid_str
+        text = dyn.get("text", "")
+        imgs: list[str] = dyn.get("imgs", [])
+        links: list[str] = dyn.get("links", [])
+        unknown = dyn.get("unknown_type", "")
+
+        if unknown:
+            summary = f"📢 {uname} 发布了新动态（类型：{unknown}）"
+        else:
+            summary = f"📢 {uname} 发布了新动态\n{text}"
+            if links:
+                summary += "\n" + "\n".join(link for link in links if link)
+
+        msg = Message(MessageSegment.text(summary))
+        for seg in await image_segments(imgs[:4]):
+            msg += seg
 
-        latest_id = max(new_ids)
-        data.setdefault("last_dynamic_id", {})[uid_str] = latest_id
-        data_changed = True
-
-        # 过滤超过 10 分钟的旧动态
-        now_ts = datetime.now().timestamp()
-        valid_ids = []
-        for did in new_ids:
-            dyn = dynamics.get(did, {})
-            ts = int(dyn.get("time", 0))
-            if now_ts - ts > 600:
-                continue
-            valid_ids.append(did)
-        
-        if not valid_ids:
+        failed = await get_sender().send(bot, groups, msg)
+        if failed:
+            logger.warning(f"bilibili: send {did} failed for groups {failed}")
+
+
+def _watched_rooms(uids, data: dict) -> dict[int, int]:
+    """推送模式要连接的直播间 {uid: room_id}，跳过还不知道房间号的 UID"""
+    rooms: dict = data.get("live_rooms", {})
+    return {int(uid_str): rooms[uid_str] for uid_str in uids if rooms.get(uid_str)}
+
+
+async def _do_live() -> None:
+    """
+    批量查询订阅 UID 的直播间状态，只推送开播/下播的变化
+    推送模式下已经连上弹幕服务器的直播间跳过，只查询没连上（超出连接数上限、断线重连中、还不知道房间号）的部分
+    """
+    bm = _get_manager()
+    if not bm or not bm.breaker_ready():
+        return
+
+    try:
+        subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
+        data: dict = await read_json(DATA_FILE) or {}
+    except Exception as e:
+        logger.error(f"bilibili: read config failed: {e}")
+        return
+
+    # 有推送群的 UID；轮询和弹幕连接都只针对这些，两次 watch 用同一集合，避免反复断开重连
+    subscribed = {uid_str: conf.get("groups") for uid_str, conf in subscribes.items() if uid_str and conf.get("groups")}
+    due = subscribed
+    monitor = _get_live_monitor(bm)
+    if monitor:
+        monitor.watch(_watched_rooms(subscribed, data))
+        connected = monitor.connected_uids()
+        due = {uid_str: groups for uid_str, groups in subscribed.items() if int(uid_str) not in connected}
+    if not due:
+        return
+
+    try:
+        bot = get_bot()
+    except Exception:
+        logger.warning("bilibili: no bot, skip")
+        return
+
+    try:
+        await _request_bucket.acquire()
+        statuses = await bm.get_live_status([int(uid_str) for uid_str in due])
+    except CircuitOpen as e:
+        logger.warning(f"bilibili: {e}, skip live status")
+        return
+    except Exception:
+        logger.exception("bilibili: get live status failed")
+        return
+
+    lives: dict[str, dict] = {}
+    for uid_str in due:
+        raw = statuses.get(uid_str)
+        if not raw:
             continue
+        try:
+            lives[uid_str] = BilibiliApiManager.parse_live_status(raw)
+        except ValueError as e:
+            logger.warning(f"bilibili: {e}")
+    rooms = {uid_str: live["room_id"] for uid_str, live in lives.items() if live.get("room_id")}
+    pushes = await _record_live_states(bm, lives, rooms)
 
-        uname = user_info.get("name", uid_str)
-        for did in valid_ids:
-            dyn = dynamics.get(did, {})
-            text = dyn.get("text", "")
-            imgs: list[str] = dyn.get("imgs", [])
-            links: list[str] = dyn.get("links", [])
-            unknown = dyn.get("unknown_type", "")
-
-            if unknown:
-                summary = f"📢 {uname} 发布了新动态（类型：{unknown}）"
-            else:
-                summary = f"📢 {uname} 发布了新动态\n{text}"
-                if links:
-                    summary += "\n" + "\n".join(l for l in links if l)
+    if monitor:
+        # 新知道房间号的 UID 立即开始连接
+        data.setdefault("live_rooms", {}).update(rooms)
+        monitor.watch(_watched_rooms(subscribed, data))
 
+    for uid_str, msg in pushes.items():
+        await _push_live(bot, uid_str, due[uid_str], msg, lives[uid_str])
+
+
+async def _record_live_states(bm: BilibiliApiManager, lives: dict[str, dict], rooms: dict[str, int]) -> dict[str, Message]:
+    """
+    在 _data_lock 内读取最新的 data.json，记下房间号和直播状态并写回
+    返回状态有变化、需要推送的 {UID: 消息}；轮询和弹幕事件同时报告同一次开播时只有先到的一方推送
+    """
+    async with _data_lock:
+        try:
+            data: dict = await read_json(DATA_FILE) or {}
+        except Exception as e:
+            logger.error(f"bilibili: read data failed: {e}")
+            return {}
+        data_changed = False
+        if rooms:
+            known: dict = data.setdefault("live_rooms", {})
+            data_changed = any(known.get(uid_str) != room_id for uid_str, room_id in rooms.items())
+            known.update(rooms)
+        pushes = {}
+        for uid_str, live in lives.items():
+            changed, msg = _apply_live_state(bm, uid_str, live, data)
+            data_changed = data_changed or changed
+            if msg:
+                pushes[uid_str] = msg
+        if data_changed:
             try:
-                for group_id in groups:
-                    msg = Message(MessageSegment.text(summary))
-                    for img_url in imgs[:4]:
-                        msg += MessageSegment.image(img_url)
-                    await bot.send_group_msg(group_id=group_id, message=msg)
+                await write_json(DATA_FILE, data)
             except Exception as e:
-                logger.warning(f"bilibili: send failed group={group_id}: {e}")
+                logger.error(f"bilibili: write data failed: {e}")
+    return pushes
 
-        await asyncio.sleep(2)
 
-    if data_changed:
+async def _push_live(bot, uid_str: str, groups: list[int], msg: Message, live: dict) -> None:
+    # 封面在锁外下载
+    if live.get("live_status") == LIVE_ON and live.get("live_cover"):
+        for seg in await image_segments([live["live_cover"]]):
+            msg += seg
+    failed = await get_sender().send(bot, groups, msg)
+    if failed:
+        logger.warning(f"bilibili: send live status of {uid_str} failed for groups {failed}")
+
+
+def _apply_live_state(bm: BilibiliApiManager, uid_str: str, live: dict, data: dict) -> tuple[bool, Optional[Message]]:
+    """与 data 中记录的状态比较并更新；返回 (data 是否有改动, 要推送的消息)"""
+    states: dict = data.setdefault("live_status", {})
+    now_ts = int(datetime.now().timestamp())
+    is_live = live.get("live_status") == LIVE_ON
+    prev = states.get(uid_str)
+    if prev is not None and prev.get("live") == is_live:
+        return False, None
+    since = int(live.get("live_time") or now_ts) if is_live else now_ts
+    # 记下名字，弹幕推来的下播事件里没有主播信息
+    name = live.get("name") or (prev or {}).get("name")
+    states[uid_str] = {"live": is_live, "since": since, "name": name}
+
+    # 第一次见到的 UID 只记录状态；正在直播的话，开播不超过 10 分钟才补推，避免新订阅时误报
+    if prev is None and (not is_live or now_ts - since > 600):
+        return True, None
+
+    uname = (bm.cached_user(int(uid_str)) or {}).get("name") or name or uid_str
+    if is_live:
+        summary = "\n".join(line for line in (f"🔴 {uname} 开播了", live.get("live_title"), live.get("live_url")) if line)
+    else:
+        minutes = max(now_ts - int((prev or {}).get("since") or now_ts), 0) // 60
+        summary = f"⚫ {uname} 下播了（本次直播 {minutes // 60} 小时 {minutes % 60} 分钟）"
+    return True, Message(MessageSegment.text(summary))
+
+
+def _get_live_monitor(bm: BilibiliApiManager) -> Optional[LiveMonitor]:
+    """BILIBILI_LIVE_PUSH 开启时的弹幕连接监控，未开启时返回 None"""
+    global _monitor
+    if _monitor is None and LIVE_PUSH:
+        factory = None
+        standin = cfg_get("bilibili.live_standin")
+        if standin:
+            host, _, port = str(standin).rpartition(":")
+            factory = partial(StandInDanmaku, host=host or "127.0.0.1", port=int(port))
+            logger.warning(f"bilibili: live push uses the stand-in server at {standin}")
+        _monitor = LiveMonitor(
+            _on_live_event,
+            credential=bm.credential,
+            max_connections=cfg_get_int("bilibili.live_max_conn", 50),
+            client_factory=factory,
+        )
+    return _monitor
+
+
+async def _on_live_event(uid: int, room_id: int, is_live: bool) -> None:
+    """弹幕服务器推来 LIVE/PREPARING 时立即处理，开播时补一个请求取标题和封面"""
+    bm = _get_manager()
+    if not bm:
+        return
+    # 只在比较、记录状态时持 _data_lock，不等正在进行的动态轮询
+    try:
+        subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
+    except Exception as e:
+        logger.error(f"bilibili: read config failed: {e}")
+        return
+    uid_str = str(uid)
+    groups = (subscribes.get(uid_str) or {}).get("groups")
+    if not groups:
+        return
+    try:
+        bot = get_bot()
+    except Exception:
+        logger.warning("bilibili: no bot, skip")
+        return
+
+    live = {"live_url": f"https://live.bilibili.com/{room_id}", "room_id": room_id}
+    if is_live:
         try:
-            await write_json(DATA_FILE, data)
+            raw = (await bm.get_live_status([uid])).get(uid_str)
+            if raw:
+                live = BilibiliApiManager.parse_live_status(raw)
         except Exception as e:
-            logger.error(f"bilibili: write data failed: {e}")
+            logger.warning(f"bilibili: get live status of {uid_str} failed: {e}")
+    # 事件本身就是最新状态，接口可能还没更新
+    live["live_status"] = LIVE_ON if is_live else LIVE_OFF
+
+    pushes = await _record_live_states(bm, {uid_str: live}, {})
+    if uid_str in pushes:
+        await _push_live(bot, uid_str, groups, pushes[uid_str], live)
+
+
+@driver.on_shutdown
+async def _stop_live_monitor() -> None:
+    if _monitor:
+        await _monitor.stop()
@@ -1,16 +1,23 @@
 """
 Twitter (twikit) 获取单条推文
 触发: 发送 x.com/... 或 twitter.com/... 链接
-配置: 同 timeline.py
+配置: 同 timeline.py（客户端与 timeline 共用，见 manager.py），另有
+  TWITTER_TWEET_CACHE_TTL=30            (可选，推文缓存有效期，分钟)
+  TWITTER_TWEET_NEGATIVE_TTL=10         (可选，已删除/受保护推文的缓存有效期，分钟)
+同一推文在缓存有效期内只请求一次，多个群同时发同一链接也只会请求一次
+查询在 twikit / GraphQL / 官方 API 间对冲（见 manager.py），任一后端变慢或失效时仍能快速返回
 """
 import re
-from typing import Optional
 
 from nonebot import on_regex, logger
 from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment, Message
 
-from ichika.config import get as cfg_get
-from ichika.utils.twikit_manager import TwikitManager
+from ichika.config import get_int as cfg_get_int
+from ichika.utils.cache import SingleFlightCache
+from ichika.utils import snowflake
+from ichika.utils.media_cache import image_segments
+from ichika.utils.video_cache import video_segments
+from .manager import get_router, twitter_proxy
 
 _URL_PATTERN = re.compile(
     r"https?://(?:x\.com|twitter\.com)/\w+/status/(\d+)"
@@ -18,30 +25,18 @@ _URL_PATTERN = re.compile(
 
 get_tweet_matcher = on_regex(_URL_PATTERN.pattern, priority=10, block=False)
 
-_tm: Optional[TwikitManager] = None
-
-
-def _get_manager() -> Optional[TwikitManager]:
-    global _tm
-    if _tm is None:
-        cookie = cfg_get("twitter.twikit_cookie") or cfg_get("twitter.cookie")
-        if not cookie:
-            return None
-        proxy = cfg_get("twitter.proxy")
-        config = {"cookie": cookie}
-        if proxy:
-            config["proxy"] = proxy
-        try:
-            _tm = TwikitManager(config=config)
-        except Exception as e:
-            logger.error(f"TwikitManager init failed: {e}")
-    return _tm
+# tweet_id → (tweet_data, user_info)；None 表示推文已删除或不可见
+_tweet_cache: SingleFlightCache[tuple[dict, dict]] = SingleFlightCache(
+    ttl=cfg_get_int("twitter.tweet_cache_ttl", 30) * 60,
+    maxsize=512,
+    negative_ttl=cfg_get_int("twitter.tweet_negative_ttl", 10) * 60,
+)
 
 
 @get_tweet_matcher.handle()
 async def handle_get_tweet(event: GroupMessageEvent) -> None:
-    tm = _get_manager()
-    if not tm:
+    router = get_router()
+    if not router:
         return
 
     text = event.get_plaintext()
@@ -50,20 +45,26 @@ async def handle_get_tweet(event: GroupMessageEvent) -> None:
         return
 
     tweet_id = match.group(1)
+    # 不是合法 snowflake 的 ID 不可能是推文，省掉一次请求
+    if not snowflake.is_snowflake(tweet_id):
+        return
+
     try:
-        tweet_data, user_info = await tm.get_tweet_detail(tweet_id)
+        result = await _tweet_cache.get_or_fetch(tweet_id, lambda: router.get_tweet(tweet_id))
     except Exception as e:
-        logger.warning(f"get_tweet_by_twikit failed {tweet_id}: {e}")
+        logger.warning(f"get_tweet failed {tweet_id}: {e}")
         return
 
-    if not tweet_data or not user_info:
+    if not result:
         return
+    tweet_data, user_info = result
 
     name = user_info.get("name", "")
     screen_name = user_info.get("screen_name", "")
     tweet_type = tweet_data.get("tweet_type", "default")
     tweet_text = tweet_data.get("text", "")
     imgs: list[str] = tweet_data.get("imgs", [])
+    videos: list[dict] = tweet_data.get("video_variants", [])
 
     if tweet_type == "retweet":
         rt = tweet_data.get("retweet_data", {})
@@ -75,6 +76,7 @@ async def handle_get_tweet(event: GroupMessageEvent) -> None:
             f"{rt_data.get('text', '')}"
         )
         imgs = rt_data.get("imgs", imgs)
+        videos = rt_data.get("video_variants") or videos
     elif tweet_type == "quote":
         q = tweet_data.get("quote_data", {})
         q_user = q.get("user_info", {})
@@ -88,10 +90,18 @@ async def handle_get_tweet(event: GroupMessageEvent) -> None:
         summary = f"{name}(@{screen_name})\n{tweet_text}"
 
     msg = Message(MessageSegment.text(summary))
-    for img_url in imgs[:4]:
-        msg += MessageSegment.image(img_url)
+    for seg in await image_segments(imgs[:4], proxy=twitter_proxy()):
+        msg += seg
 
     try:
         await get_tweet_matcher.send(msg)
     except Exception as e:
         logger.warning(f"get_tweet send failed: {e}")
+        return
+
+    # 视频单独成条发送，超过大小上限的跳过
+    for seg in await video_segments(videos, proxy=twitter_proxy()):
+        try:
+            await get_tweet_matcher.send(Message(seg))
+        except Exception as e:
+            logger.warning(f"get_tweet send video failed: {e}")
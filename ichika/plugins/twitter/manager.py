@@ -0,0 +1,224 @@
+"""
+Twitter (twikit) 共享客户端
+timeline 与 get_tweet 共用同一个 TwikitManager，cookie 与 X-Client-Transaction-Id 状态
+持久化在 client_state.json，启动时恢复并预热连接，重启后的第一个请求不再需要额外的首页请求与握手
+配置了代理池时，所有 Twitter 请求（twikit / GraphQL / 官方 API / 图片视频下载）走延迟最低的健康代理，
+代理连接失败时当场换下一个；超级用户发送 /proxies 查看各代理的延迟统计
+单条推文查询经 TweetRouter 在多个后端间对冲：首选后端超过其近期 p95 延迟仍未返回时并行请求下一个，
+取最先返回的有效结果
+配置项（.env.prod）：
+  TWITTER_TWIKIT_COOKIE / TWITTER_TWIKIT_COOKIES / TWITTER_PROXY / TWITTER_USER_TTL   (见 timeline.py)
+  TWITTER_TRANSACTION_TTL=12            (可选，保存的 transaction 状态有效期，小时)
+  TWITTER_PROXIES=["http://127.0.0.1:7897", "socks5://10.0.0.2:1080", "direct"]
+                                        (可选，代理池，配置后代替 TWITTER_PROXY；"direct" 表示直连)
+  TWITTER_PROXY_PROBE_URL=https://x.com/robots.txt   (可选，代理池健康检查地址)
+  TWITTER_PROXY_PROBE_INTERVAL=60       (可选，代理池健康检查间隔，秒)
+  TWITTER_COOKIE=<cookie string>        (可选，GraphQL 后端使用的网页 cookie，未配置时用 twikit 的 cookie)
+  TWITTER_AUTHORIZATION=Bearer ...      (可选，配置后启用 GraphQL 后端，网页版的 authorization 头)
+  TWITTER_CSRF_TOKEN=<ct0>              (可选，默认取 cookie 中的 ct0)
+  TWITTER_BEARER_TOKEN=<token>          (可选，配置后启用官方 API 后端)
+  TWITTER_API_TIER=free                 (可选，官方 API 套餐：free / basic / pro)
+  TWITTER_TWEET_BACKENDS=["twikit", "graphql", "api"]   (可选，后端优先顺序)
+  熔断器（Twitter / Bilibili / YouTube 共用，状态持久化在 resources/circuit_breakers.json）：
+  BREAKER_ERROR_RATE=0.5                (可选，5 分钟窗口内失败比例达到该值即熔断)
+  BREAKER_MIN_CALLS=5                   (可选，窗口内至少这么多次请求才按比例判断)
+  BREAKER_BASE_COOLDOWN=60              (可选，首次熔断时长，秒；连续熔断逐次翻倍并加随机抖动)
+  BREAKER_MAX_COOLDOWN=21600            (可选，熔断时长上限，秒)
+  BREAKER_STATE_FILE=<path>             (可选，状态文件路径)
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from nonebot import get_driver, logger, require
+
+require("nonebot_plugin_apscheduler")
+from nonebot_plugin_apscheduler import scheduler
+
+from ichika.config import get as cfg_get, get_int as cfg_get_int
+from ichika.utils.circuit_breaker import get_breakers
+from ichika.utils.proxy_pool import DEFAULT_PROBE_URL, ProxyLike, ProxyPool
+from ichika.utils.tweet_router import TweetRouter, normalize_graphql, normalize_x_api
+from ichika.utils.twikit_manager import TwikitManager
+from ichika.utils.twitter_manager import TwitterManager
+from ichika.utils.x_api_manager import XAPIManager
+
+RESOURCE_PATH = Path(__file__).parent.parent.parent / "resources" / "twitter_tl_twikit"
+USER_MAP_FILE = RESOURCE_PATH / "user_ids.json"
+STATE_FILE = RESOURCE_PATH / "client_state.json"
+X_API_BUDGET_FILE = RESOURCE_PATH / "x_api_budget.json"
+
+_tm: Optional[TwikitManager] = None
+_proxy_pool: Optional[ProxyPool] = None
+_router: Optional[TweetRouter] = None
+_warm_task: Optional[asyncio.Task] = None
+
+driver = get_driver()
+
+
+def get_proxy_pool() -> Optional[ProxyPool]:
+    """TWITTER_PROXIES 配置的代理池，未配置时返回 None"""
+    global _proxy_pool
+    if _proxy_pool is None:
+        proxies = cfg_get("twitter.proxies") or []
+        if not proxies:
+            return None
+        _proxy_pool = ProxyPool(proxies, probe_url=cfg_get("twitter.proxy_probe_url") or DEFAULT_PROBE_URL)
+    return _proxy_pool
+
+
+def twitter_proxy() -> ProxyLike:
+    """Twitter 相关下载使用的代理：代理池优先，其次单个 TWITTER_PROXY"""
+    return get_proxy_pool() or cfg_get("twitter.proxy")
+
+
+def _proxy_config() -> dict:
+    pool = get_proxy_pool()
+    if pool:
+        return {"proxy_pool": pool}
+    return {"proxy": cfg_get("twitter.proxy")} if cfg_get("twitter.proxy") else {}
+
+
+def get_manager() -> Optional[TwikitManager]:
+    global _tm
+    if _tm is None:
+        cookie = cfg_get("twitter.twikit_cookie") or cfg_get("twitter.cookie")
+        cookies = cfg_get("twitter.twikit_cookies") or []
+        if not cookie and not cookies:
+            return None
+        config = {
+            "cookie": cookie,
+            "cookies": cookies,
+            "user_ttl": cfg_get_int("twitter.user_ttl", 6) * 3600,
+            "user_map_path": str(USER_MAP_FILE),
+            "state_path": str(STATE_FILE),
+            "transaction_ttl": cfg_get_int("twitter.transaction_ttl", 12) * 3600,
+            "breakers": get_breakers(),
+            **_proxy_config(),
+        }
+        try:
+            _tm = TwikitManager(config=config)
+        except Exception as e:
+            logger.error(f"TwikitManager init failed: {e}")
+    return _tm
+
+
+def _graphql_backend():
+    authorization = cfg_get("twitter.authorization")
+    cookie = cfg_get("twitter.cookie") or cfg_get("twitter.twikit_cookie")
+    if not authorization or not isinstance(cookie, str):
+        return None
+    csrf = cfg_get("twitter.csrf_token") or next(
+        (p.split("=", 1)[1].strip() for p in cookie.split(";") if p.strip().startswith("ct0=")), ""
+    )
+    gm = TwitterManager({
+        "cookie": cookie, "authorization": authorization, "x-csrf-token": csrf, **_proxy_config(),
+    })
+
+    async def fetch(tweet_id: str):
+        response = await gm.get_tweet_detail(tweet_id)
+        response.raise_for_status()
+        return normalize_graphql(*TwitterManager.parse_tweet_detail(response.json(), tweet_id))
+
+    return fetch
+
+
+def _x_api_backend():
+    bearer_token = cfg_get("twitter.bearer_token")
+    if not bearer_token:
+        return None
+    config = {
+        "bearer_token": bearer_token,
+        "api_tier": cfg_get("twitter.api_tier") or "free",
+        "budget_path": str(X_API_BUDGET_FILE),
+        **_proxy_config(),
+    }
+    xm = XAPIManager(config)
+
+    async def fetch(tweet_id: str):
+        # 查询链接属于交互请求，不受后台轮询的预算限制；
+        # 走可取消的异步请求，对冲落败时请求还没返回就不会记入预算
+        response = await xm.aget_tweet(tweet_id)
+        return normalize_x_api(response.json())
+
+    return fetch
+
+
+def _twikit_backend():
+    tm = get_manager()
+    if not tm:
+        return None
+
+    async def fetch(tweet_id: str):
+        tweet_data, user_info = await tm.get_tweet_detail(tweet_id, raise_errors=True)
+        return (tweet_data, user_info) if tweet_data and user_info else None
+
+    return fetch
+
+
+_BACKENDS = {"twikit": _twikit_backend, "graphql": _graphql_backend, "api": _x_api_backend}
+
+
+def get_router() -> Optional[TweetRouter]:
+    """按配置顺序组装单条推文查询的后端，没有可用后端时返回 None"""
+    global _router
+    if _router is None:
+        router = TweetRouter()
+        for name in cfg_get("twitter.tweet_backends") or list(_BACKENDS):
+            factory = _BACKENDS.get(name)
+            if not factory:
+                logger.warning(f"twitter: unknown tweet backend {name}")
+                continue
+            try:
+                fetch = factory()
+            except Exception as e:
+                logger.error(f"twitter: init tweet backend {name} failed: {e}")
+                continue
+            if fetch:
+                router.add_backend(name, fetch)
+        _router = router
+    return _router if len(_router) else None
+
+
+@driver.on_startup
+async def _prewarm() -> None:
+    global _warm_task
+    tm = get_manager()
+    if not tm:
+        return
+    pool = get_proxy_pool()
+    if pool:
+        # 先测一轮延迟，预热和第一个请求就能走最快的代理
+        await pool.probe_all()
+    # 后台预热，不阻塞启动；预热完成前到来的请求由 twikit 自行初始化
+    _warm_task = asyncio.create_task(tm.warm_up())
+
+
+@driver.on_shutdown
+async def _save_state() -> None:
+    if _tm:
+        await _tm.save_state()
+    # 熔断状态在后台线程落盘，退出前等写完
+    await get_breakers().flush()
+
+
+@driver.on_shutdown
+async def _close_clients() -> None:
+    # 每个代理各有一个连接池，退出时一并关闭
+    if _tm:
+        await _tm.aclose()
+
+
+@scheduler.scheduled_job("interval", hours=1, id="twitter_twikit_save_state")
+async def twitter_twikit_save_state_task() -> None:
+    # 服务端会轮换 cookie，定期落盘避免异常退出后丢失
+    await _save_state()
+
+
+@scheduler.scheduled_job(
+    "interval", seconds=cfg_get_int("twitter.proxy_probe_interval", 60), id="twitter_proxy_probe"
+)
+async def twitter_proxy_probe_task() -> None:
+    pool = get_proxy_pool()
+    if pool:
+        await pool.probe_all()
@@ -0,0 +1,29 @@
+"""
+Twitter 代理池状态查询
+触发: /proxies（仅超级用户）
+按请求使用顺序列出各代理的健康状态、探测延迟与请求/失败次数
+"""
+from nonebot import on_command
+from nonebot.permission import SUPERUSER
+
+from .manager import get_proxy_pool
+
+proxies_matcher = on_command("proxies", permission=SUPERUSER, priority=10, block=True)
+
+
+@proxies_matcher.handle()
+async def handle_proxies() -> None:
+    pool = get_proxy_pool()
+    if not pool:
+        await proxies_matcher.finish("未配置代理池（TWITTER_PROXIES）")
+        return
+
+    lines = []
+    for url, stat in pool.stats().items():
+        latency = f"{stat['latency_ms']}ms" if stat["latency_ms"] is not None else "未测"
+        state = "✅" if stat["healthy"] else "❌"
+        # 代理地址可能带账号密码，只显示 @ 之后的部分
+        lines.append(
+            f"{state} {url.rsplit('@', 1)[-1]}  延迟 {latency}  请求 {stat['requests']}  失败 {stat['errors']}"
+        )
+    await proxies_matcher.finish("\n".join(lines))
@@ -1,16 +1,38 @@
 """
 Twitter (twikit) 定时时间线推送插件
-每2分钟检查一次订阅用户的新推文，推送到对应群组
+每分钟检查一次哪些订阅账号到了抓取时间，推送新推文到对应群组
+每个账号的抓取间隔按其发推频率自适应（活跃账号更频繁），总频率受全局预算约束
+多个账号并发抓取，请求速率由各接口的令牌桶控制
 配置项（.env.prod）：
   TWITTER_TWIKIT_COOKIE=<cookie string>
+  TWITTER_TWIKIT_COOKIES=["<cookie 1>", "<cookie 2>"]  (可选，多账号 cookie 池，请求在各账号间轮换)
   TWITTER_PROXY=http://127.0.0.1:7897   (可选)
+  TWITTER_USER_INFO_RATE=45             (可选，UserByScreenName 每账号每15分钟请求数)
+  TWITTER_TIMELINE_RATE=25              (可选，UserTweets 每账号每15分钟请求数)
+  TWITTER_RATE_BURST=5                  (可选，各接口允许的突发请求数)
+  TWITTER_CONCURRENCY=3                 (可选，同时抓取的账号数)
+  TWITTER_POLL_BUDGET=120               (可选，所有账号合计每小时抓取次数)
+  TWITTER_MIN_INTERVAL=2                (可选，单个账号最短抓取间隔，分钟)
+  TWITTER_MAX_INTERVAL=60               (可选，单个账号最长抓取间隔，分钟)
+  TWITTER_USER_TTL=6                    (可选，用户资料缓存有效期，小时)
+  TWITTER_LIST_MODE=false               (可选，列表模式，见下)
+  TWITTER_LIST_NAME=ichika              (可选，列表模式使用的私密列表名)
+  TWITTER_DEDUP_HOURS=24                (可选，同一原推在同一群内去重的时间窗口，小时)
+  TWITTER_DEDUP_SIZE=200                (可选，每个群记录的已推送原推数量上限)
+用户 screen_name → uid 映射持久化在 user_ids.json，时间线抓取直接使用 uid，
+用户资料由单独的低频任务刷新；客户端与 get_tweet 共用（见 manager.py）
+
+列表模式：所有订阅账号放进第一个 cookie 账号名下的一个私密列表（按 subscribes.json 自动增删成员），
+每分钟只抓取该列表的时间线（1~2 个请求），再按作者分发到各账号对应的群组。
+列表 ID 与成员记录在 data.json 的 "list" 中
+
+多个订阅账号转推同一条推文时，每个群只完整推送一次，之后的转推只发一行"也转推了"（不带图片）；
+各群已推送的原推 ID 记录在 data.json 的 "delivered" 中
+
+推文中的视频在文字消息之后单独发送，清晰度按大小上限挑选，下载与缓存配置见 utils/video_cache.py
 """
 import asyncio
-import json
-import random
-import re
-from pathlib import Path
-from datetime import datetime, timedelta
+import time
 from typing import Optional
 
 from nonebot import require, logger, get_bot
@@ -18,48 +40,73 @@ from nonebot.adapters.onebot.v11 import MessageSegment, Message
 
 require("nonebot_plugin_apscheduler")
 from nonebot_plugin_apscheduler import scheduler
+from twikit.errors import NotFound
 
-from ichika.config import get as cfg_get
+from ichika.config import get as cfg_get, get_bool as cfg_get_bool, get_int as cfg_get_int
+from ichika.utils.circuit_breaker import CircuitOpen
 from ichika.utils.twikit_manager import TwikitManager
 from ichika.utils.fileio import read_json, write_json
+from ichika.utils.rate_limit import TokenBucket
+from ichika.utils import snowflake
+from ichika.utils.group_sender import get_sender
+from ichika.utils.media_cache import image_segments
+from ichika.utils.video_cache import video_segments
+from ichika.utils.poll_schedule import (
+    activity_rate, allocate_intervals, record_activity, seed_activity,
+)
+from .manager import RESOURCE_PATH, get_manager, twitter_proxy
 
-RESOURCE_PATH = Path(__file__).parent.parent.parent / "resources" / "twitter_tl_twikit"
 SUBSCRIBES_FILE = RESOURCE_PATH / "subscribes.json"
 DATA_FILE = RESOURCE_PATH / "data.json"
 
-# 同一接口的最小调用间隔（秒）
-API_INTERVAL = 100
-_last_call: dict[str, float] = {}
+# 各接口的请求预算（twikit 官方限额为 UserByScreenName 95 次、UserTweets 50 次 / 15 分钟）
+# 限额按账号计算，cookie 池有几个账号预算就放大几倍
+RATE_WINDOW = 15 * 60
+_RATE_BURST = cfg_get_int("twitter.rate_burst", 5)
+# (user_info, timeline)，按 manager 实际（去重后）的 cookie 数建立，见 _rate_buckets
+_buckets: Optional[tuple[TokenBucket, TokenBucket]] = None
+CONCURRENCY = max(cfg_get_int("twitter.concurrency", 3), 1)
+
+# 自适应抓取：全局预算（次/小时）与单账号抓取间隔上下限（秒）
+POLL_BUDGET = cfg_get_int("twitter.poll_budget", 120)
+MIN_INTERVAL = max(cfg_get_int("twitter.min_interval", 2), 1) * 60
+MAX_INTERVAL = max(cfg_get_int("twitter.max_interval", 60) * 60, MIN_INTERVAL)
+# 推文最大推送延迟（秒）；间隔较长的账号按实际间隔放宽
+MAX_TWEET_AGE = 600
+
+# 跨账号去重：每个群记住最近推送过的原推 ID
+DEDUP_TTL = cfg_get_int("twitter.dedup_hours", 24) * 3600
+DEDUP_SIZE = cfg_get_int("twitter.dedup_size", 200)
+
+# 列表模式
+LIST_MODE = cfg_get_bool("twitter.list_mode")
+LIST_NAME = cfg_get("twitter.list_name") or "ichika"
+
 _lock = asyncio.Lock()
 
-_tm: Optional[TwikitManager] = None
+def _rate_buckets(tm: TwikitManager) -> tuple[TokenBucket, TokenBucket]:
+    """各接口的令牌桶 (user_info, timeline)，第一次调用时按 manager 的 cookie 账号数建立"""
+    global _buckets
+    buckets = _buckets
+    if buckets is None:
+        pool_size = max(tm.pool_size, 1)
+        buckets = _buckets = (
+            TokenBucket.per_window(
+                cfg_get_int("twitter.user_info_rate", 45) * pool_size, RATE_WINDOW, burst=_RATE_BURST
+            ),
+            TokenBucket.per_window(
+                cfg_get_int("twitter.timeline_rate", 25) * pool_size, RATE_WINDOW, burst=_RATE_BURST
+            ),
+        )
+    return buckets
 
 
-def _get_manager() -> Optional[TwikitManager]:
-    global _tm
-    if _tm is None:
-        cookie = cfg_get("twitter.twikit_cookie") or cfg_get("twitter.cookie")
-        if not cookie:
-            return None
-        proxy = cfg_get("twitter.proxy")
-        config = {"cookie": cookie}
-        if proxy:
-            config["proxy"] = proxy
-        try:
-            _tm = TwikitManager(config=config)
-        except Exception as e:
-            logger.error(f"TwikitManager init failed: {e}")
-    return _tm
+def _user_info_bucket(tm: TwikitManager) -> TokenBucket:
+    return _rate_buckets(tm)[0]
 
 
-async def _rate_limit(key: str) -> None:
-    """限速：同一 key 调用间隔至少 API_INTERVAL 秒"""
-    now = datetime.now().timestamp()
-    last = _last_call.get(key, 0)
-    wait = API_INTERVAL - (now - last)
-    if wait > 0:
-        await asyncio.sleep(wait)
-    _last_call[key] = datetime.now().timestamp()
+def _timeline_bucket(tm: TwikitManager) -> TokenBucket:
+    return _rate_buckets(tm)[1]
 
 
 def _format_tweet(tweet_data: dict, user_info: dict) -> str:
@@ -89,16 +136,72 @@ def _format_tweet(tweet_data: dict, user_info: dict) -> str:
     return f"{header}\n{body}{url}"
 
 
-@scheduler.scheduled_job("interval", minutes=7, id="twitter_twikit_timeline")
+def _due_accounts(subscribes: dict, activity: dict, now_ts: float) -> list[tuple[str, dict]]:
+    """按自适应间隔挑出本轮需要抓取的账号，最逾期的排在前面"""
+    rates = {sn: activity_rate(activity.get(sn), now_ts) for sn in subscribes}
+    intervals = allocate_intervals(rates, POLL_BUDGET, MIN_INTERVAL, MAX_INTERVAL)
+    due = []
+    for screen_name, conf in subscribes.items():
+        last_poll = activity.get(screen_name, {}).get("last_poll", 0)
+        overdue = (now_ts - last_poll) / intervals[screen_name]
+        if overdue >= 1:
+            due.append((overdue, screen_name, conf))
+    due.sort(key=lambda x: x[0], reverse=True)
+    return [(screen_name, conf) for _, screen_name, conf in due]
+
+
+@scheduler.scheduled_job("interval", minutes=1, id="twitter_twikit_timeline")
 async def twitter_twikit_timeline_task() -> None:
     async with _lock:
         await _do_timeline()
 
 
+@scheduler.scheduled_job("interval", hours=1, id="twitter_twikit_profile_refresh")
+async def twitter_twikit_profile_task() -> None:
+    # 请求阶段不持有 _lock：重启后所有资料都过期，逐个等令牌会长时间阻塞每分钟的时间线任务
+    await _do_profile_refresh()
+
+
+async def _do_profile_refresh() -> None:
+    """刷新过期的用户资料，同时校正 screen_name → uid 映射"""
+    tm = get_manager()
+    if not tm or not tm.breaker_ready():
+        return
+
+    try:
+        subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
+    except Exception as e:
+        logger.error(f"twitter_twikit: read config failed: {e}")
+        return
+
+    stale = [sn for sn in subscribes if sn and tm.is_user_stale(sn)]
+    refreshed = {}
+    for screen_name in stale:
+        await _user_info_bucket(tm).acquire()
+        user_info = await tm.get_user_info(screen_name, force=True)
+        if user_info:
+            refreshed[screen_name] = user_info
+    if not refreshed:
+        return
+
+    # 只在读写 data.json 的片刻持锁，与时间线任务的读-改-写互斥
+    async with _lock:
+        try:
+            data: dict = await read_json(DATA_FILE) or {}
+            data.setdefault("users", {}).update(refreshed)
+            await write_json(DATA_FILE, data)
+        except Exception as e:
+            logger.error(f"twitter_twikit: write data failed: {e}")
+
+
 async def _do_timeline() -> None:
-    tm = _get_manager()
+    tm = get_manager()
     if not tm:
         return
+    # 熔断期间整轮跳过，账号的 last_poll 不变，恢复后立即补抓
+    if not tm.breaker_ready():
+        logger.debug("twitter_twikit: circuit open, skip this round")
+        return
 
     try:
         subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
@@ -116,99 +219,315 @@ async def _do_timeline() -> None:
         logger.warning("twitter_twikit: no bot, skip")
         return
 
-    data_changed = False
+    if LIST_MODE:
+        await _do_list_timeline(tm, bot, subscribes, data)
+        try:
+            await write_json(DATA_FILE, data)
+        except Exception as e:
+            logger.error(f"twitter_twikit: write data failed: {e}")
+        return
+
+    due = _due_accounts(subscribes, data.setdefault("activity", {}), time.time())
+    if not due:
+        return
 
-    for screen_name, conf in subscribes.items():
-        groups: list[int] = conf.get("groups", [])
-        if not screen_name or not groups:
-            continue
+    # 并发抓取各账号，实际请求节奏由令牌桶决定
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def _run(screen_name: str, conf: dict) -> None:
+        async with sem:
+            await _poll_account(tm, bot, screen_name, conf, data)
+
+    results = await asyncio.gather(
+        *(_run(screen_name, conf) for screen_name, conf in due),
+        return_exceptions=True,
+    )
+    for (screen_name, _), result in zip(due, results):
+        if isinstance(result, Exception):
+            logger.warning(f"twitter_twikit: poll {screen_name} failed: {result}")
+
+    # 每个被抓取的账号都更新了 activity，总是需要写回
+    try:
+        await write_json(DATA_FILE, data)
+    except Exception as e:
+        logger.error(f"twitter_twikit: write data failed: {e}")
 
-        # 获取用户信息
+
+async def _poll_account(tm: TwikitManager, bot, screen_name: str, conf: dict, data: dict) -> None:
+    """抓取单个账号的时间线并推送新推文"""
+    groups: list[int] = conf.get("groups", [])
+    if not screen_name or not groups:
+        return
+
+    # 无论成功与否都记录抓取时间，失败的账号等到下个间隔再试
+    activity = data.setdefault("activity", {})
+    entry = activity.get(screen_name, {})
+    prev_poll = entry.get("last_poll")
+    entry["last_poll"] = time.time()
+    activity[screen_name] = entry
+
+    # screen_name → uid，只有映射里没有时才请求用户信息
+    uid = tm.cached_user_id(screen_name)
+    if not uid:
         try:
-            await _rate_limit(f"user_info:{screen_name}")
-            user_info = await tm.get_user_info(screen_name)
+            await _user_info_bucket(tm).acquire()
+            uid = await tm.get_user_id(screen_name)
         except Exception as e:
             logger.warning(f"twitter_twikit: get_user_info {screen_name} failed: {e}")
-            continue
+            return
 
-        if not user_info:
-            continue
+    if not uid:
+        return
+
+    # 已有频率估计的账号只需解析比 last_tweet_id 新的推文
+    last_id = data.get("last_tweet_id", {}).get(screen_name, "")
+    incremental = "score" in entry and bool(last_id)
 
-        uid = user_info["id"]
+    # 获取时间线
+    # 抓取失败时直接返回，不计入频率估计；只有成功抓到的空结果才算"没有新推文"
+    try:
+        await _timeline_bucket(tm).acquire()
+        timeline = await tm.get_user_timeline(uid, count=20, stop_at_id=last_id if incremental else None)
+    except CircuitOpen:
+        # 熔断不算一次抓取，恢复后立即补抓
+        if prev_poll is None:
+            entry.pop("last_poll", None)
+        else:
+            entry["last_poll"] = prev_poll
+        logger.debug(f"twitter_twikit: circuit open, {screen_name} skipped")
+        return
+    except Exception as e:
+        logger.warning(f"twitter_twikit: get_timeline {screen_name} failed: {e}")
+        return
 
-        # 更新用户信息缓存
-        user_cache = data.setdefault("users", {})
-        user_cache[screen_name] = user_info
-        data_changed = True
+    # 用户信息优先用缓存（时间线请求会顺带刷新），其次用上次落盘的数据
+    user_cache = data.setdefault("users", {})
+    user_info = (
+        tm.cached_user(screen_name)
+        or user_cache.get(screen_name)
+        or {"id": uid, "name": screen_name, "screen_name": screen_name}
+    )
+    user_cache[screen_name] = user_info
+
+    # 增量解析时空结果即没有新推文，仍需记入频率估计
+    if not timeline and not incremental:
+        return
 
-        # 获取时间线
-        try:
-            await _rate_limit(f"timeline:{uid}")
-            timeline = await tm.get_user_timeline(uid, count=20)
-        except Exception as e:
-            logger.warning(f"twitter_twikit: get_timeline {screen_name} failed: {e}")
-            continue
+    # 找出新推文（按 snowflake 数值对比已知 last_tweet_id）
+    new_tweets = []
 
-        if not timeline:
+    for tid, tweet_data in sorted(timeline.items(), key=lambda kv: snowflake.to_int(kv[0])):
+        if not snowflake.is_newer(tid, last_id):
             continue
+        new_tweets.append((tid, tweet_data))
 
-        # 找出新推文（对比已知 last_tweet_id）
-        last_id = data.get("last_tweet_id", {}).get(screen_name, "")
-        new_tweets = []
+    # 更新发推频率估计：首次见到的账号用当前时间线估算，之后累计新推文数
+    now_ts = time.time()
+    if incremental:
+        entry.update(record_activity(entry, len(new_tweets), now_ts))
+    else:
+        stamps = [ts for ts in map(snowflake.timestamp, timeline) if ts is not None]
+        entry.update(seed_activity(stamps, now_ts))
 
-        for tid, tweet_data in sorted(timeline.items()):
-            if last_id and tid <= last_id:
-                continue
-            new_tweets.append((tid, tweet_data))
+    if not new_tweets:
+        return
 
-        if not new_tweets:
+    # 更新 last_tweet_id 为最新一条，无论是否推送
+    latest_id = snowflake.max_id(t[0] for t in new_tweets)
+    data.setdefault("last_tweet_id", {})[screen_name] = latest_id
+
+    # 过滤旧推文：默认 10 分钟，低频账号放宽到实际抓取间隔；发布时间直接取自推文 ID
+    max_age = MAX_TWEET_AGE
+    if prev_poll:
+        max_age = min(max(MAX_TWEET_AGE, now_ts - prev_poll + 60), MAX_INTERVAL + 120)
+    valid_tweets = []
+    for tid, tweet_data in new_tweets:
+        ts = snowflake.timestamp(tid)
+        if ts is not None and now_ts - ts > max_age:
             continue
+        valid_tweets.append((tid, tweet_data))
 
-        # 更新 last_tweet_id 为最新一条，无论是否推送
-        latest_id = max(t[0] for t in new_tweets)
-        data.setdefault("last_tweet_id", {})[screen_name] = latest_id
-        data_changed = True
+    await _push_tweets(bot, groups, valid_tweets, user_info, data)
 
-        # 过滤超过 10 分钟的旧推文
-        now_ts = datetime.now().timestamp()
-        valid_tweets = []
-        for tid, tweet_data in new_tweets:
-            created_at = tweet_data.get("created_at", "")
-            try:
-                # "Fri Oct 20 12:34:56 +0000 2023"
-                dt = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
-                ts = dt.timestamp()
-                if now_ts - ts > 600:  # 10分钟 = 600秒
-                    continue
-            except Exception:
-                pass
-            valid_tweets.append((tid, tweet_data))
-            
-        if not valid_tweets:
-            continue
 
-        # 推送到各群
-        for tid, tweet_data in valid_tweets:
+def _original(tweet_data: dict) -> tuple[Optional[str], dict]:
+    """推文对应的原推 ID 及作者：转推 / 引用取被转 / 被引用的推文，普通推文取自身"""
+    tweet_type = tweet_data.get("tweet_type", "default")
+    if tweet_type in ("retweet", "quote"):
+        sub = tweet_data.get(f"{tweet_type}_data", {})
+        return sub.get("data", {}).get("id"), sub.get("user_info", {})
+    return tweet_data.get("id"), {}
+
+
+def _claim_delivery(data: dict, group_id: int, orig_id: str, screen_name: str, now_ts: float) -> bool:
+    """
+    在群的去重索引中登记原推，返回 True 表示该群此前没收到过。
+    检查与登记之间没有 await，并发抓取的多个账号不会同时判定为首次
+    """
+    index: dict = data.setdefault("delivered", {}).setdefault(str(group_id), {})
+    for oid in [oid for oid, rec in index.items() if now_ts - rec["ts"] > DEDUP_TTL]:
+        del index[oid]
+    record = index.get(orig_id)
+    if record:
+        if screen_name not in record["by"]:
+            record["by"].append(screen_name)
+        return False
+    index[orig_id] = {"ts": now_ts, "by": [screen_name]}
+    while len(index) > DEDUP_SIZE:
+        del index[min(index, key=lambda oid: index[oid]["ts"])]
+    return True
+
+
+def _release_delivery(data: dict, group_id: int, orig_id: str) -> None:
+    """发送失败时撤销登记，下一条相同原推仍会完整推送"""
+    data.get("delivered", {}).get(str(group_id), {}).pop(orig_id, None)
+
+
+def _video_variants(tweet_data: dict) -> list[dict]:
+    """推文自带的视频，转推取原推的"""
+    return (
+        tweet_data.get("video_variants")
+        or tweet_data.get("retweet_data", {}).get("data", {}).get("video_variants")
+        or []
+    )
+
+
+async def _push_tweets(
+    bot, groups: list[int], tweets: list[tuple[str, dict]], user_info: dict, data: dict
+) -> None:
+    """推送到各群：消息只构建一次，并发发送；同一原推在同一群内只完整推送一次"""
+    sender = get_sender()
+    screen_name = user_info.get("screen_name", "")
+    for tid, tweet_data in tweets:
+        tweet_type = tweet_data.get("tweet_type", "default")
+        orig_id, orig_user = _original(tweet_data)
+        now_ts = time.time()
+        # claimed：本次调用登记的群，发送失败时只撤销这些，别人登记的记录不能动
+        claimed, dup_groups = [], []
+        for group_id in groups:
+            if orig_id and _claim_delivery(data, group_id, orig_id, screen_name, now_ts):
+                claimed.append(group_id)
+            elif orig_id:
+                dup_groups.append(group_id)
+        fresh_groups = claimed if orig_id else list(groups)
+        # 引用带有新内容，总是完整推送
+        if tweet_type == "quote":
+            fresh_groups, dup_groups = list(groups), []
+
+        if fresh_groups:
             msg_text = _format_tweet(tweet_data, user_info)
             imgs: list[str] = tweet_data.get("imgs", [])
 
+            if imgs:
+                msg = Message(MessageSegment.text(msg_text))
+                # 最多发4张，经代理下载一次后以本地文件发送
+                for seg in await image_segments(imgs[:4], proxy=twitter_proxy()):
+                    msg += seg
+            else:
+                msg = msg_text
+
+            failed = await sender.send(bot, fresh_groups, msg)
+            if failed:
+                logger.warning(f"twitter_twikit: send {tid} failed for groups {failed}")
+                for group_id in failed:
+                    if group_id in claimed:
+                        _release_delivery(data, group_id, orig_id)
+
+            # 视频单独成条发送（协议端不支持与文字混排），下载一次后发往所有群
+            videos = _video_variants(tweet_data)
+            sent_groups = [g for g in fresh_groups if g not in failed]
+            if videos and sent_groups:
+                for seg in await video_segments(videos, proxy=twitter_proxy()):
+                    failed = await sender.send(bot, sent_groups, Message(seg))
+                    if failed:
+                        logger.warning(f"twitter_twikit: send video of {tid} failed for groups {failed}")
+
+        # 已推送过的原推：转推只发一行提示，原作者本人的推文直接跳过
+        if dup_groups and tweet_type == "retweet":
+            orig_sn = orig_user.get("screen_name", "")
+            line = f"{user_info.get('name', '')}(@{screen_name}) 也转推了 https://x.com/{orig_sn}/status/{orig_id}"
+            failed = await sender.send(bot, dup_groups, line)
+            if failed:
+                logger.warning(f"twitter_twikit: send {tid} failed for groups {failed}")
+
+
+async def _resolve_uids(tm: TwikitManager, subscribes: dict) -> dict[str, str]:
+    """所有订阅账号的 uid，映射里没有的才请求用户信息"""
+    uids = {}
+    for screen_name in subscribes:
+        uid = tm.cached_user_id(screen_name)
+        if not uid:
             try:
-                for group_id in groups:
-                    if imgs:
-                        msg = Message(MessageSegment.text(msg_text))
-                        for img_url in imgs[:4]:  # 最多发4张
-                            msg += MessageSegment.image(img_url)
-                        await bot.send_group_msg(group_id=group_id, message=msg)
-                    else:
-                        await bot.send_group_msg(group_id=group_id, message=msg_text)
+                await _user_info_bucket(tm).acquire()
+                uid = await tm.get_user_id(screen_name)
             except Exception as e:
-                logger.warning(f"twitter_twikit: send to group failed: {e}")
-        
-        # 每个用户处理完后随机等待，大幅降低频率
-        await asyncio.sleep(random.randint(20, 40))
+                logger.warning(f"twitter_twikit: get_user_info {screen_name} failed: {e}")
+        if uid:
+            uids[screen_name] = uid
+    return uids
+
+
+async def _do_list_timeline(tm: TwikitManager, bot, subscribes: dict, data: dict) -> None:
+    """列表模式：维护订阅列表成员，抓取列表时间线并按作者分发"""
+    subscribes = {sn: conf for sn, conf in subscribes.items() if sn and conf.get("groups")}
+    uids = await _resolve_uids(tm, subscribes)
+    if not uids:
+        return
 
-    if data_changed:
+    list_state = data.setdefault("list", {})
+    list_id = await tm.ensure_list(LIST_NAME, list_state.get("id"))
+    if not list_id:
+        return
+    if list_id != list_state.get("id"):
+        list_state.clear()
+        list_state["id"] = list_id
+
+    # 订阅变动时才同步成员
+    if sorted(uids.values()) != list_state.get("members"):
         try:
-            await write_json(DATA_FILE, data)
+            await tm.sync_list_members(list_id, uids.values())
+            list_state["members"] = sorted(uids.values())
+        except NotFound:
+            logger.warning(f"twitter_twikit: list {list_id} not found, recreating next time")
+            data.pop("list", None)
+            return
         except Exception as e:
-            logger.error(f"twitter_twikit: write data failed: {e}")
+            logger.warning(f"twitter_twikit: sync list members failed: {e}")
+            return
+
+    last_id = list_state.get("last_tweet_id", "")
+    try:
+        await _timeline_bucket(tm).acquire()
+        timeline = await tm.get_list_timeline(list_id, stop_at_id=last_id or None)
+    except NotFound:
+        logger.warning(f"twitter_twikit: list {list_id} not found, recreating next time")
+        data.pop("list", None)
+        return
+    except Exception as e:
+        logger.warning(f"twitter_twikit: get_list_timeline failed: {e}")
+        return
+
+    new_ids = [tid for tid in timeline if snowflake.is_newer(tid, last_id)]
+    if not new_ids:
+        return
+    list_state["last_tweet_id"] = snowflake.max_id(new_ids)
+
+    # 按作者分组，同时更新各账号的 last_tweet_id / 用户资料，便于与逐账号模式互相切换
+    by_author = {sn.lower(): sn for sn in subscribes}
+    routed: dict[str, list[tuple[str, dict]]] = {}
+    now_ts = time.time()
+    for tid in sorted(new_ids, key=snowflake.to_int):
+        screen_name = by_author.get((timeline[tid]["user_info"].get("screen_name") or "").lower())
+        if not screen_name:
+            continue
+        data.setdefault("users", {})[screen_name] = timeline[tid]["user_info"]
+        last_tweet_ids = data.setdefault("last_tweet_id", {})
+        if snowflake.is_newer(tid, last_tweet_ids.get(screen_name)):
+            last_tweet_ids[screen_name] = tid
+        ts = snowflake.timestamp(tid)
+        if ts is not None and now_ts - ts > MAX_TWEET_AGE:
+            continue
+        routed.setdefault(screen_name, []).append((tid, timeline[tid]["data"]))
+
+    for screen_name, tweets in routed.items():
+        await _push_tweets(bot, subscribes[screen_name]["groups"], tweets, data["users"][screen_name], data)
@@ -9,6 +9,7 @@ from nonebot.adapters.onebot.v11 import GroupMessageEvent, MessageSegment, Messa
 from dateutil import parser as dateutil_parser
 
 from ichika.config import get as cfg_get
+from ichika.utils.circuit_breaker import get_breakers
 from ichika.utils.youtube_manager import YoutubeManager
 from ichika.utils.tz import SHA_TZ
 
@@ -29,7 +30,7 @@ def _get_manager():
         if not api_key:
             return None
         try:
-            _ym = YoutubeManager(api_key=api_key)
+            _ym = YoutubeManager(api_key=api_key, breakers=get_breakers())
         except Exception as e:
             logger.error(f"YoutubeManager init failed: {e}")
     return _ym
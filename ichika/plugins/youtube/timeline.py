@@ -16,6 +16,7 @@ require("nonebot_plugin_apscheduler")
 from nonebot_plugin_apscheduler import scheduler
 
 from ichika.config import get as cfg_get
+from ichika.utils.circuit_breaker import get_breakers
 from ichika.utils.youtube_manager import YoutubeManager
 from ichika.utils.fileio import read_json, write_json
 from ichika.utils.tz import SHA_TZ
@@ -41,7 +42,7 @@ def _get_manager() -> Optional[YoutubeManager]:
         if not api_key:
             return None
         try:
-            _ym = YoutubeManager(api_key=api_key)
+            _ym = YoutubeManager(api_key=api_key, breakers=get_breakers())
         except Exception as e:
             logger.error(f"YoutubeManager init failed: {e}")
     return _ym
@@ -57,6 +58,9 @@ async def _do_ytb() -> None:
     ym = _get_manager()
     if not ym:
         return
+    if not ym.breaker_ready():
+        logger.debug("ytb: circuit open, skip")
+        return
 
     try:
         subscribes: dict = await read_json(SUBSCRIBES_FILE) or {}
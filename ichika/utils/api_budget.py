@@ -0,0 +1,281 @@
+"""
+Request budget ledger for metered APIs.
+
+Tracks two limits at once: the per-endpoint rate-limit windows reported by
+the ``x-rate-limit-*`` response headers, and a monthly cap on consumed posts.
+Background pollers are paced so the monthly cap is spread evenly over the
+billing period and a reserve is always kept for interactive requests (e.g.
+expanding a link someone just posted); interactive requests are only refused
+when a limit is actually exhausted.
+"""
+import asyncio
+import calendar
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any, Dict, Mapping, Optional
+
+from ichika.utils.fileio import write_json_sync
+
+logger = logging.getLogger(__name__)
+
+# Share of every limit held back for interactive requests
+DEFAULT_RESERVE = 0.2
+# Share of the monthly cap background pollers may run ahead of an even pace
+PACE_SLACK = 0.05
+# Minimum seconds between writes of the ledger file
+SAVE_INTERVAL = 60
+
+
+class Priority(IntEnum):
+    BACKGROUND = 0
+    INTERACTIVE = 1
+
+
+class BudgetExceeded(Exception):
+    """Raised instead of sending a request the budget cannot afford."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _period_bounds(now: float, reset_day: int):
+    """Start and end (UTC timestamps) of the billing period containing ``now``."""
+    dt = datetime.fromtimestamp(now, timezone.utc)
+    year, month = dt.year, dt.month
+    if dt.day < reset_day:
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    start = datetime(year, month, reset_day, tzinfo=timezone.utc)
+    next_year, next_month = (year, month + 1) if month < 12 else (year + 1, 1)
+    day = min(reset_day, calendar.monthrange(next_year, next_month)[1])
+    end = datetime(next_year, next_month, day, tzinfo=timezone.utc)
+    return start.timestamp(), end.timestamp()
+
+
+class BudgetLedger:
+    """
+    Ledger of API usage against rate-limit windows and a monthly post cap.
+
+    Call ``check`` before a request and ``record`` with the response headers
+    and number of posts it returned afterwards. Usage of the current period
+    is persisted to ``path`` so restarts do not forget what was spent.
+    """
+
+    def __init__(
+        self,
+        monthly_cap: int,
+        reserve: float = DEFAULT_RESERVE,
+        reset_day: int = 1,
+        path: Optional[str] = None,
+    ):
+        """
+        :param monthly_cap: posts that may be consumed per billing period
+        :param reserve: share of each limit kept for interactive requests
+        :param reset_day: day of month the cap resets (clamped to 1..28)
+        :param path: optional JSON file persisting the period usage
+        """
+        self.monthly_cap = monthly_cap
+        self.reserve = reserve
+        self.reset_day = min(max(int(reset_day), 1), 28)
+        self.path = path
+        self.used = 0
+        self.calls = 0
+        self.refused = 0
+        self.period_start = 0.0
+        self.period_end = 0.0
+        # endpoint -> {"limit", "remaining", "reset"}
+        self.windows: Dict[str, Dict[str, int]] = {}
+        self._saved_at = 0.0
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_again = False
+        self._load()
+        self._roll(time.time())
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f) or {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load budget ledger {self.path}: {e}")
+            return
+        # reset_day from the usage endpoint outlives the configured one
+        self.reset_day = min(max(int(state.get('reset_day') or self.reset_day), 1), 28)
+        self.period_start = state.get('period_start', 0.0)
+        self.period_end = state.get('period_end', 0.0)
+        self.used = state.get('used', 0)
+        self.calls = state.get('calls', 0)
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            'reset_day': self.reset_day,
+            'period_start': self.period_start,
+            'period_end': self.period_end,
+            'used': self.used,
+            'calls': self.calls,
+        }
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        try:
+            write_json_sync(self.path, state)
+        except OSError as e:
+            logger.warning(f"Failed to save budget ledger {self.path}: {e}")
+
+    def save(self, force: bool = False) -> None:
+        """
+        Persist the period usage, at most once per SAVE_INTERVAL unless ``force``.
+
+        On the event loop the (fsync'd) write runs in a thread; call ``flush`` to wait for it.
+        """
+        if not self.path:
+            return
+        now = time.time()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return
+        self._saved_at = now
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._state())
+            return
+        if self._save_task and not self._save_task.done():
+            # The running write picks up the newer state when it finishes
+            self._save_again = True
+            return
+        self._save_task = loop.create_task(self._save_in_thread())
+
+    async def _save_in_thread(self) -> None:
+        while True:
+            self._save_again = False
+            await asyncio.to_thread(self._write, self._state())
+            if not self._save_again:
+                return
+
+    async def flush(self) -> None:
+        """Write the current state and wait until it is on disk."""
+        if not self.path:
+            return
+        self.save(force=True)
+        while self._save_task and not self._save_task.done():
+            await self._save_task
+
+    def _roll(self, now: float) -> None:
+        """Start a new period once the current one is over."""
+        if self.period_start <= now < self.period_end:
+            return
+        self.period_start, self.period_end = _period_bounds(now, self.reset_day)
+        self.used = 0
+        self.calls = 0
+        self.save(force=True)
+
+    # ---------- accounting ----------
+
+    def record(self, endpoint: str, headers: Mapping[str, str], posts: int = 0, now: Optional[float] = None) -> None:
+        """
+        Record one sent request.
+
+        :param endpoint: normalized endpoint the rate-limit window belongs to
+        :param headers: response headers (x-rate-limit-limit / -remaining / -reset)
+        :param posts: posts returned, counted against the monthly cap
+        """
+        now = time.time() if now is None else now
+        self._roll(now)
+        self.calls += 1
+        self.used += posts
+        try:
+            window = {
+                'limit': int(headers['x-rate-limit-limit']),
+                'remaining': int(headers['x-rate-limit-remaining']),
+                'reset': int(headers['x-rate-limit-reset']),
+            }
+        except (KeyError, TypeError, ValueError):
+            window = None
+        if window:
+            self.windows[endpoint] = window
+        self.save()
+
+    def update_usage(self, used: int, cap: Optional[int] = None, reset_day: Optional[int] = None) -> None:
+        """Overwrite the local count with the authoritative figures from the usage endpoint."""
+        if reset_day:
+            self.reset_day = min(max(int(reset_day), 1), 28)
+            self.period_start = self.period_end = 0.0
+            self._roll(time.time())
+        if cap:
+            self.monthly_cap = cap
+        self.used = used
+        self.save(force=True)
+
+    # ---------- decisions ----------
+
+    def _pace_allowance(self, now: float) -> float:
+        """Posts background requests may have consumed by ``now`` at an even pace."""
+        elapsed = (now - self.period_start) / (self.period_end - self.period_start)
+        spendable = self.monthly_cap * (1 - self.reserve)
+        return min(spendable, spendable * elapsed + self.monthly_cap * PACE_SLACK)
+
+    def check(self, endpoint: str, priority: Priority = Priority.INTERACTIVE, now: Optional[float] = None) -> None:
+        """
+        Raise BudgetExceeded if a request to ``endpoint`` should not be sent now.
+        """
+        now = time.time() if now is None else now
+        self._roll(now)
+        try:
+            window = self.windows.get(endpoint)
+            if window and window['reset'] > now:
+                floor = 0 if priority >= Priority.INTERACTIVE else int(window['limit'] * self.reserve)
+                if window['remaining'] <= floor:
+                    raise BudgetExceeded(
+                        f"rate limit window of {endpoint} exhausted ({window['remaining']}/{window['limit']} left)",
+                        window['reset'] - now,
+                    )
+
+            if self.used >= self.monthly_cap:
+                raise BudgetExceeded(
+                    f"monthly cap reached ({self.used}/{self.monthly_cap})", self.period_end - now
+                )
+            if priority < Priority.INTERACTIVE and self.used >= self._pace_allowance(now):
+                # Wait until the even pace catches up with what was already spent
+                rate = self.monthly_cap * (1 - self.reserve) / (self.period_end - self.period_start)
+                catch_up = self.period_start + (self.used - self.monthly_cap * PACE_SLACK) / rate
+                raise BudgetExceeded(
+                    f"background budget ahead of pace ({self.used}/{self.monthly_cap})",
+                    max(min(catch_up, self.period_end) - now, 1.0),
+                )
+        except BudgetExceeded:
+            self.refused += 1
+            raise
+
+    def predict_exhaustion(self, now: Optional[float] = None) -> Optional[float]:
+        """Timestamp the monthly cap runs out at the current period's average rate, or None if it lasts the period."""
+        now = time.time() if now is None else now
+        elapsed = now - self.period_start
+        if self.used <= 0 or elapsed <= 0:
+            return None
+        eta = now + (self.monthly_cap - self.used) / (self.used / elapsed)
+        return eta if eta < self.period_end else None
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Current budget state for monitoring."""
+        now = time.time() if now is None else now
+        self._roll(now)
+        return {
+            'monthly_cap': self.monthly_cap,
+            'used': self.used,
+            'remaining': max(self.monthly_cap - self.used, 0),
+            'calls': self.calls,
+            'refused': self.refused,
+            'period_start': self.period_start,
+            'period_end': self.period_end,
+            'background_allowance': int(self._pace_allowance(now)),
+            'exhausts_at': self.predict_exhaustion(now),
+            'windows': {
+                k: dict(v, reset_in=max(v['reset'] - now, 0)) for k, v in self.windows.items()
+            },
+        }
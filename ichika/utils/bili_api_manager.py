@@ -1,16 +1,38 @@
 __all__ = ["BilibiliApiManager"]
 
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 import asyncio
 from datetime import datetime
 
-from bilibili_api import Credential, video, user
+from bilibili_api import Credential, dynamic, video, user
+from bilibili_api.exceptions import NetworkException, ResponseCodeException
+from bilibili_api.utils.network import Api
+
+from ichika.utils.cache import TTLCache
+from ichika.utils.circuit_breaker import FAILURE, OK, TRIP, BreakerRegistry
+
+# Platform name of the circuit breakers
+PLATFORM = "bilibili"
+# Response codes / HTTP statuses of Bilibili's risk control ("请求被拦截")
+RISK_CONTROL_CODES = (-352, -412)
+# Minimum seconds to stop calling after a risk-control response
+RISK_CONTROL_COOLDOWN = 5 * 60
+# Seconds a cached parsed profile is considered fresh
+DEFAULT_USER_TTL = 24 * 3600
+# Count of followed-feed items newer than a baseline; not wrapped by bilibili_api
+FEED_UPDATE_URL = "https://api.bilibili.com/x/polymer/web-dynamic/v1/feed/all/update"
+# Live room status of many users at once; not wrapped by bilibili_api either
+LIVE_STATUS_URL = "https://api.live.bilibili.com/room/v1/Room/get_status_info_by_uids"
+# live_status values of a live room
+LIVE_OFF, LIVE_ON, LIVE_ROUND = 0, 1, 2
 
 
 class BilibiliApiManager:
     def __init__(self, config: Dict[str, Any]):
         """
-        :param config: dict with keys: sessdata, bili_jct, buvid3, dedeuserid
+        :param config: dict with keys: sessdata, bili_jct, buvid3, dedeuserid,
+            optional breakers (a shared BreakerRegistry; defaults to an in-memory one),
+            optional user_ttl (seconds a parsed profile stays fresh)
         """
         self.credential = Credential(
             sessdata=str(config.get("sessdata") or ""),
@@ -18,6 +40,34 @@ class BilibiliApiManager:
             buvid3=str(config.get("buvid3") or ""),
             dedeuserid=str(config.get("dedeuserid") or ""),
         )
+        self.breakers: BreakerRegistry = config.get("breakers") or BreakerRegistry()
+        # Risk control is applied per account (and IP), so the account gets its own breaker
+        self.breaker_names = (PLATFORM, f"{PLATFORM}:{config.get('dedeuserid') or 'guest'}")
+        # uid -> parse_user_info output; profiles change rarely, so the polling loop reads
+        # them from here and a separate low-frequency job refreshes stale ones
+        self._users: TTLCache[Dict[str, Any]] = TTLCache(ttl=config.get("user_ttl") or DEFAULT_USER_TTL)
+
+    @staticmethod
+    def _classify_error(e: BaseException) -> Tuple[str, Optional[float]]:
+        if isinstance(e, ResponseCodeException):
+            if e.code in RISK_CONTROL_CODES:
+                return TRIP, RISK_CONTROL_COOLDOWN
+            # Any other API code means the request itself went through
+            return OK, None
+        if isinstance(e, NetworkException) and e.status in (412, 429):
+            return TRIP, RISK_CONTROL_COOLDOWN
+        return FAILURE, None
+
+    async def _guarded(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs an API call behind the circuit breakers; raises CircuitOpen while they are open."""
+        return await self.breakers.call(self.breaker_names, func, self._classify_error)
+
+    def breaker_ready(self) -> bool:
+        """Whether the circuit breakers would let a call through right now."""
+        return self.breakers.ready(*self.breaker_names)
+
+    def breaker_retry_after(self) -> float:
+        return self.breakers.retry_after(*self.breaker_names)
 
     def get_user(self, uid: int) -> user.User:
         """Gets a User instance."""
@@ -25,19 +75,78 @@ class BilibiliApiManager:
     
     async def get_user_info(self, user: user.User) -> Dict[str, Any]:
         """Gets a user's information."""
-        return await user.get_user_info()
+        return await self._guarded(user.get_user_info)
     
     async def get_user_relation(self, user: user.User) -> Dict[str, Any]:
         """Gets a user's relation information."""
-        return await user.get_relation_info()
+        return await self._guarded(user.get_relation_info)
     
+    async def get_parsed_user(self, uid: int, force: bool = False) -> Dict[str, Any]:
+        """Gets a user's parsed profile (info + relation), from the cache unless stale or forced."""
+        if not force:
+            cached = self._users.get(uid)
+            if cached:
+                return cached
+        user_obj = self.get_user(uid)
+        user_info = await self.get_user_info(user_obj)
+        relation = await self.get_user_relation(user_obj)
+        parsed = self.parse_user_info(user_info, relation)
+        self._users.set(uid, parsed)
+        return parsed
+
+    def cached_user(self, uid: int) -> Optional[Dict[str, Any]]:
+        """Cached parsed profile, even if stale; None when never fetched."""
+        return self._users.peek(uid)
+
+    def is_user_stale(self, uid: int) -> bool:
+        return not self._users.is_fresh(uid)
+
+    def seed_user(self, uid: int, parsed: Dict[str, Any], updated_at: float) -> None:
+        """Restores a profile saved earlier, keeping its remaining freshness."""
+        age = datetime.now().timestamp() - updated_at
+        self._users.set(uid, parsed, ttl=max(self._users.ttl - age, 0))
+
     async def get_dynamic_list(self, user: user.User, offset: str = "") -> Dict[str, Any]:
         """Gets a list of dynamics for a user."""
-        return await user.get_dynamics_new(offset=offset)
+        return await self._guarded(lambda: user.get_dynamics_new(offset=offset))
+
+    async def get_feed_update_count(self, baseline: str) -> int:
+        """Number of items in the logged-in account's followed feed newer than ``baseline``."""
+        api = Api(url=FEED_UPDATE_URL, method="GET", verify=True, credential=self.credential)
+        result = await self._guarded(
+            lambda: api.update_params(type="all", update_baseline=baseline).result
+        )
+        return int((result or {}).get("update_num") or 0)
+
+    async def get_followed_feed(self, offset: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Gets one page of the logged-in account's followed feed (all followed users, newest first).
+
+        The result has the same "items" layout as get_dynamic_list, plus "update_baseline"
+        (the newest item ID, to pass to get_feed_update_count later).
+        """
+        return await self._guarded(
+            lambda: dynamic.get_dynamic_page_info(
+                self.credential, _type=dynamic.DynamicType.ALL, offset=offset
+            )
+        )
+
+    async def get_live_status(self, uids: List[int]) -> Dict[str, Dict[str, Any]]:
+        """
+        Gets the live room status of many users in one request.
+
+        :return: raw status keyed by UID string; users without a live room are absent
+        """
+        if not uids:
+            return {}
+        api = Api(url=LIVE_STATUS_URL, method="POST", json_body=True, no_csrf=True, credential=self.credential)
+        result = await self._guarded(lambda: api.update_data(uids=[int(uid) for uid in uids]).result)
+        # An empty result comes back as [] instead of {}
+        return result if isinstance(result, dict) else {}
 
     async def get_video_info(self, bvid: str) -> Dict[str, Any]:
         video_obj = video.Video(bvid=bvid, credential=self.credential)
-        return await video_obj.get_info()
+        return await self._guarded(video_obj.get_info)
 
     @staticmethod
     def parse_user_info(user_info: Dict[str, Any], relation: Dict[str, Any]) -> Dict[str, Any]:
@@ -68,13 +177,41 @@ class BilibiliApiManager:
             )
 
     @staticmethod
-    def parse_timeline(timeline: Dict[str, Any]) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
-        """Parses a timeline of dynamics."""
+    def parse_live_status(status_raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Parses one entry of get_live_status into the live fields of parse_user_info."""
+        try:
+            room_id = status_raw.get("room_id")
+            return {
+                "name": status_raw.get("uname"),
+                "live_status": status_raw.get("live_status"),
+                "live_title": status_raw.get("title"),
+                "live_url": f"https://live.bilibili.com/{room_id}" if room_id else None,
+                "live_cover": status_raw.get("cover_from_user") or status_raw.get("keyframe"),
+                "live_time": status_raw.get("live_time"),
+                "room_id": room_id,
+            }
+        except (AttributeError, TypeError) as e:
+            raise ValueError(f"Failed to parse live status: {e}, status: {status_raw}")
+
+    @staticmethod
+    def parse_timeline(
+        timeline: Dict[str, Any], stop_at_id: Optional[str] = None
+    ) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """
+        Parses a timeline of dynamics.
+
+        :param stop_at_id: newest dynamic ID already seen; dynamics are newest-first after
+                           the pinned one, so parsing stops at the first one not newer
+        """
         try:
             dynamic_list_raw = timeline["items"]
             dynamic_id_list = []
             dynamic_data = {}
             for dr in dynamic_list_raw:
+                if stop_at_id and not (dr.get("modules", {}) or {}).get("module_tag"):
+                    id_str = dr.get("id_str")
+                    if id_str and int(id_str) <= int(stop_at_id):
+                        break
                 dynamic_id, dynamic_parsed = BilibiliApiManager._parse_dynamic_one(dr)
                 if dynamic_id and dynamic_parsed:
                     dynamic_id_list.append(dynamic_id)
@@ -106,6 +243,8 @@ class BilibiliApiManager:
                 f"{public_time.strftime('%Y-%m-%d %H:%M:%S%z') if public_time else ''}\n\n"
             ),
             "time": pub_ts,
+            "author": module_author.get("name"),
+            "mid": module_author.get("mid"),
             "imgs": [],
             "links": [dynamic_raw.get("basic", {}).get("jump_url", "")],
             "unknown_type": "",
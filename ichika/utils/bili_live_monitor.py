@@ -0,0 +1,298 @@
+"""
+Push-based live status monitor over Bilibili's danmaku WebSocket.
+
+Keeps one LiveDanmaku connection per watched room, all multiplexed on the running
+event loop, and reports LIVE / PREPARING events as soon as they arrive. Dropped
+connections reconnect with exponential backoff and jitter; the number of rooms
+watched at once is capped.
+
+StandInDanmakuServer / StandInDanmaku replace Bilibili's servers for local testing
+(newline-delimited JSON over TCP).
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import suppress
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from bilibili_api import Credential
+from bilibili_api.live import LiveDanmaku
+from bilibili_api.utils.AsyncEvent import AsyncEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 50
+DEFAULT_BASE_BACKOFF = 5.0
+DEFAULT_MAX_BACKOFF = 600.0
+# A connection that stayed up this long resets the backoff
+STABLE_AFTER = 60.0
+# Danmaku commands that change the live status, and the status they mean
+LIVE_EVENTS = {"LIVE": True, "PREPARING": False}
+
+# on_change(uid, room_id, live)
+LiveCallback = Callable[[int, int, bool], Awaitable[None]]
+# room_id -> an unconnected client (LiveDanmaku or anything with on/connect/disconnect)
+ClientFactory = Callable[[int], AsyncEvent]
+
+
+class _Room:
+    def __init__(self, uid: int, room_id: int):
+        self.uid = uid
+        self.room_id = room_id
+        self.task: Optional[asyncio.Task] = None
+        self.client: Optional[AsyncEvent] = None
+        self.connected = False
+        self.live: Optional[bool] = None
+        self.failures = 0
+        self.reconnects = 0
+
+    def status(self) -> Dict:
+        return {
+            "room_id": self.room_id,
+            "connected": self.connected,
+            "live": self.live,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+        }
+
+
+class LiveMonitor:
+    """
+    Watches live rooms over the danmaku WebSocket.
+
+    Call ``watch`` with the full {uid: room_id} mapping whenever subscriptions may have
+    changed; it starts connections for new rooms (up to the cap) and closes removed ones.
+    ``on_change`` is awaited once per status change of a room, not once per event.
+    """
+
+    def __init__(
+        self,
+        on_change: LiveCallback,
+        credential: Optional[Credential] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        base_backoff: float = DEFAULT_BASE_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        client_factory: Optional[ClientFactory] = None,
+    ):
+        """
+        :param on_change: coroutine called with (uid, room_id, live) when a room goes live or offline
+        :param credential: credential for the danmaku connections; anonymous ones get masked data
+        :param max_connections: rooms watched at once; rooms beyond the cap are left to the caller
+        :param base_backoff: seconds before the first reconnect; doubles per consecutive failure
+        :param max_backoff: cap of the reconnect delay in seconds
+        :param client_factory: builds the client for a room (defaults to LiveDanmaku)
+        """
+        self.on_change = on_change
+        self.credential = credential
+        self.max_connections = max_connections
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._factory = client_factory or self._danmaku_client
+        self._rooms: Dict[int, _Room] = {}
+        self._over_cap: Set[int] = set()
+
+    def _danmaku_client(self, room_id: int) -> AsyncEvent:
+        # Reconnects are handled here with backoff, so LiveDanmaku's own retry loop is kept short
+        client = LiveDanmaku(room_id, credential=self.credential, max_retry=1, retry_after=1)
+        client.logger.setLevel(logging.WARNING)
+        return client
+
+    # ---------- room set ----------
+
+    def watch(self, rooms: Dict[int, int]) -> None:
+        """Sets the watched rooms ({uid: room_id}); rooms past max_connections are skipped."""
+        for uid in list(self._rooms):
+            room = self._rooms[uid]
+            if rooms.get(uid) != room.room_id:
+                self._stop_room(room)
+                del self._rooms[uid]
+
+        over_cap = set()
+        for uid, room_id in rooms.items():
+            if not room_id or uid in self._rooms:
+                continue
+            if len(self._rooms) >= self.max_connections:
+                over_cap.add(uid)
+                continue
+            room = _Room(uid, room_id)
+            room.task = asyncio.create_task(self._run(room), name=f"bili-live-{room_id}")
+            self._rooms[uid] = room
+        if over_cap and over_cap != self._over_cap:
+            logger.warning(f"Live monitor is at its cap of {self.max_connections} rooms, {len(over_cap)} not watched")
+        self._over_cap = over_cap
+
+    def connected_uids(self) -> Set[int]:
+        """UIDs whose room connection is currently established."""
+        return {uid for uid, room in self._rooms.items() if room.connected}
+
+    def status(self) -> Dict[int, Dict]:
+        return {uid: room.status() for uid, room in self._rooms.items()}
+
+    async def stop(self) -> None:
+        rooms = list(self._rooms.values())
+        self._rooms.clear()
+        for room in rooms:
+            self._stop_room(room)
+        await asyncio.gather(*(r.task for r in rooms if r.task), return_exceptions=True)
+
+    @staticmethod
+    def _stop_room(room: _Room) -> None:
+        if room.task and not room.task.done():
+            room.task.cancel()
+
+    # ---------- connection loop ----------
+
+    async def _run(self, room: _Room) -> None:
+        while True:
+            client = self._factory(room.room_id)
+            room.client = client
+            connected_at: Optional[float] = None
+
+            async def on_verified(_event: dict) -> None:
+                nonlocal connected_at
+                connected_at = time.monotonic()
+                room.connected = True
+
+            async def on_live_event(event: dict) -> None:
+                await self._handle_event(room, event)
+
+            client.add_event_listener("VERIFICATION_SUCCESSFUL", on_verified)
+            for name in LIVE_EVENTS:
+                client.add_event_listener(name, on_live_event)
+
+            try:
+                # Returns when the connection is closed for good (LiveDanmaku gives up on its hosts)
+                await client.connect()
+            except asyncio.CancelledError:
+                room.connected = False
+                with suppress(Exception):
+                    await client.disconnect()
+                raise
+            except Exception as e:
+                logger.info(f"Live room {room.room_id} connection failed: {e!r}")
+            room.connected = False
+            room.client = None
+
+            if connected_at is not None and time.monotonic() - connected_at >= STABLE_AFTER:
+                room.failures = 0
+            delay = min(self.base_backoff * 2 ** room.failures, self.max_backoff)
+            delay *= random.uniform(0.8, 1.2)
+            room.failures += 1
+            room.reconnects += 1
+            logger.debug(f"Live room {room.room_id} reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _handle_event(self, room: _Room, event: dict) -> None:
+        live = LIVE_EVENTS.get(event.get("type"))
+        # LIVE is usually sent more than once at the start of a stream
+        if live is None or live == room.live:
+            return
+        room.live = live
+        try:
+            await self.on_change(room.uid, room.room_id, live)
+        except Exception:
+            logger.exception(f"Live room {room.room_id} change handler failed")
+
+
+# ---------- local stand-in for Bilibili's danmaku servers ----------
+
+
+class StandInDanmakuServer:
+    """
+    Local server that pushes danmaku commands to StandInDanmaku clients.
+
+    Clients send {"roomid": N} as their first line and get {"cmd": "VERIFICATION_SUCCESSFUL"}
+    back; ``send`` then delivers {"cmd": ..., "data": ...} lines to every client of a room.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[int, Set[asyncio.StreamWriter]] = {}
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        for writers in self._clients.values():
+            for writer in writers:
+                writer.close()
+        # Closing the transports ends the handlers' reads; let them finish before the loop does
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+        try:
+            room_id = int(json.loads(await reader.readline())["roomid"])
+        except (ValueError, KeyError, TypeError):
+            writer.close()
+            return
+        self._clients.setdefault(room_id, set()).add(writer)
+        writer.write(json.dumps({"cmd": "VERIFICATION_SUCCESSFUL"}).encode() + b"\n")
+        try:
+            await writer.drain()
+            # Clients never send anything else; wait until they hang up
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.get(room_id, set()).discard(writer)
+            writer.close()
+
+    async def send(self, room_id: int, cmd: str, data: Optional[dict] = None) -> int:
+        """Pushes a command to a room's clients; returns how many received it."""
+        line = json.dumps({"cmd": cmd, "data": data or {}}).encode() + b"\n"
+        writers = list(self._clients.get(room_id, ()))
+        for writer in writers:
+            writer.write(line)
+        await asyncio.gather(*(w.drain() for w in writers), return_exceptions=True)
+        return len(writers)
+
+    def drop(self, room_id: int) -> None:
+        """Closes a room's connections, as a server-side disconnect would."""
+        for writer in self._clients.pop(room_id, set()):
+            writer.close()
+
+
+class StandInDanmaku(AsyncEvent):
+    """Client for StandInDanmakuServer that dispatches events the way LiveDanmaku does."""
+
+    def __init__(self, room_display_id: int, host: str, port: int):
+        super().__init__()
+        self.room_display_id = room_display_id
+        self.host = host
+        self.port = port
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            self._writer.write(json.dumps({"roomid": self.room_display_id}).encode() + b"\n")
+            await self._writer.drain()
+            while line := await reader.readline():
+                message = json.loads(line)
+                cmd = message.get("cmd", "")
+                self.dispatch(cmd, {
+                    "room_display_id": self.room_display_id,
+                    "room_real_id": self.room_display_id,
+                    "type": cmd,
+                    "data": message if cmd != "VERIFICATION_SUCCESSFUL" else None,
+                })
+        finally:
+            self._writer.close()
+            self._writer = None
+
+    async def disconnect(self) -> None:
+        if self._writer:
+            self._writer.close()
+
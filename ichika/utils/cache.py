@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    Any, Awaitable, Callable, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar,
+)
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    In-memory cache whose entries expire ``ttl`` seconds after being set.
+
+    With ``maxsize`` the cache also evicts the least recently used entry once
+    full. Expired entries stay around until evicted so callers that can live
+    with stale data may still ``peek`` at them.
+    """
+
+    def __init__(self, ttl: float, maxsize: Optional[int] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._data))
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Returns the value if present and not expired."""
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        self._data.move_to_end(key)
+        return item[1]
+
+    def peek(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Returns the value even if it has expired, without touching LRU order."""
+        item = self._data.get(key)
+        return default if item is None else item[1]
+
+    def is_fresh(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] > time.monotonic()
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def items(self) -> Dict[Hashable, Any]:
+        """Snapshot of the unexpired entries."""
+        now = time.monotonic()
+        return {k: v for k, (exp, v) in self._data.items() if exp > now}
+
+
+class SingleFlightCache(TTLCache[V]):
+    """
+    LRU + TTL cache for async lookups with in-flight request coalescing.
+
+    Concurrent ``get_or_fetch`` calls for the same key share one fetch.
+    A fetch returning None is remembered for ``negative_ttl`` seconds (e.g. a
+    deleted tweet); a fetch raising an exception is not cached at all.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, ttl: float, maxsize: Optional[int] = None, negative_ttl: Optional[float] = None):
+        super().__init__(ttl=ttl, maxsize=maxsize)
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._inflight: Dict[Hashable, "asyncio.Future[Optional[V]]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Optional[V]]]) -> Optional[V]:
+        cached = self.get(key, self._MISSING)
+        if cached is not self._MISSING:
+            self.hits += 1
+            return None if cached is _NEGATIVE else cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited future does not log "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if value is None:
+                self.set(key, _NEGATIVE, ttl=self.negative_ttl)
+            else:
+                self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+
+# Stored in place of None so that a cached "not found" differs from a miss
+_NEGATIVE: Any = object()
@@ -0,0 +1,405 @@
+"""
+Circuit breakers for upstream platforms and the credentials used against them.
+
+A breaker counts the outcome of every call in a sliding window. Once enough
+calls failed (or an unambiguous "stop" signal such as a 429 or a Bilibili
+risk-control code arrives) it opens and refuses calls without touching the
+network. After the cooldown it lets a few probe calls through (half-open): a
+successful probe closes it, a failed one reopens it with a doubled, jittered
+cooldown. Breaker state is persisted so a restart does not immediately hammer
+an account that is still locked out.
+
+Names are ``"<platform>"`` for the platform as a whole and
+``"<platform>:<credential>"`` for one account/key; callers check both.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple, TypeVar
+
+from ichika.config import get as cfg_get, get_float as cfg_get_float, get_int as cfg_get_int
+from ichika.utils.fileio import write_json_sync
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Outcome classes returned by a call's classifier
+OK = 'ok'
+FAILURE = 'failure'
+TRIP = 'trip'
+
+# Seconds of call outcomes considered for the error rate
+DEFAULT_WINDOW = 300
+# Calls needed in the window before the error rate is trusted
+DEFAULT_MIN_CALLS = 5
+# Failure share of the window that opens the breaker
+DEFAULT_ERROR_RATE = 0.5
+# First cooldown; doubled for every consecutive trip
+DEFAULT_BASE_COOLDOWN = 60
+DEFAULT_MAX_COOLDOWN = 6 * 3600
+# Cooldowns are stretched by a random factor in [1 - JITTER, 1 + JITTER]
+JITTER = 0.2
+# Calls let through at once while half-open
+DEFAULT_HALF_OPEN_PROBES = 1
+# Minimum seconds between writes of the state file (transitions are always written)
+SAVE_INTERVAL = 60
+DEFAULT_STATE_FILE = Path(__file__).parent.parent / "resources" / "circuit_breakers.json"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a platform whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {int(retry_after)}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Breaker state machine for one platform or credential."""
+
+    def __init__(
+        self,
+        name: str,
+        window: float = DEFAULT_WINDOW,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        base_cooldown: float = DEFAULT_BASE_COOLDOWN,
+        max_cooldown: float = DEFAULT_MAX_COOLDOWN,
+        half_open_probes: int = DEFAULT_HALF_OPEN_PROBES,
+        on_change: Optional[Callable[['CircuitBreaker'], None]] = None,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_probes = half_open_probes
+        self._on_change = on_change
+
+        self.state = CLOSED
+        self.open_until = 0.0
+        # Consecutive trips without a successful probe in between, drives the backoff
+        self.trips = 0
+        self.total_trips = 0
+        self._probes = 0
+        # (timestamp, ok) of recent calls
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+
+    # ---------- state ----------
+
+    def _refresh(self, now: float) -> None:
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+            self._probes = 0
+            logger.info(f"Circuit {self.name} half-open, probing")
+
+    def ready(self, now: Optional[float] = None) -> bool:
+        """Whether a call would currently be allowed (does not claim a probe)."""
+        now = now or time.time()
+        self._refresh(now)
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            return self._probes < self.half_open_probes
+        return True
+
+    def retry_after(self, now: Optional[float] = None) -> float:
+        now = now or time.time()
+        return max(0.0, self.open_until - now)
+
+    def allow(self) -> None:
+        """Claims permission for one call, raising ``CircuitOpen`` when refused."""
+        now = time.time()
+        if not self.ready(now):
+            raise CircuitOpen(self.name, self.retry_after(now) or self.base_cooldown)
+        if self.state == HALF_OPEN:
+            self._probes += 1
+
+    def release(self) -> None:
+        """Returns a claimed half-open probe whose outcome is unknown (e.g. cancelled)."""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def record_success(self) -> None:
+        now = time.time()
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.trips = 0
+            self._probes = 0
+            self._outcomes.clear()
+            logger.info(f"Circuit {self.name} closed")
+            self._changed()
+            return
+        self._outcomes.append((now, True))
+        self._prune(now)
+
+    def record_failure(self) -> None:
+        now = time.time()
+        if self.state == HALF_OPEN:
+            self.trip()
+            return
+        self._outcomes.append((now, False))
+        self._prune(now)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if failures / len(self._outcomes) >= self.error_rate:
+                self.trip()
+
+    def trip(self, cooldown: Optional[float] = None) -> None:
+        """
+        Opens the breaker.
+
+        :param cooldown: minimum seconds to stay open (e.g. a rate-limit reset time);
+            the exponential backoff applies when it is longer
+        """
+        backoff = min(self.base_cooldown * (2 ** self.trips), self.max_cooldown)
+        backoff *= random.uniform(1 - JITTER, 1 + JITTER)
+        duration = max(backoff, cooldown or 0)
+        now = time.time()
+        self.state = OPEN
+        self.open_until = max(self.open_until, now + duration)
+        self.trips += 1
+        self.total_trips += 1
+        self._probes = 0
+        self._outcomes.clear()
+        logger.warning(f"Circuit {self.name} opened for {int(self.open_until - now)}s (trip #{self.trips})")
+        self._changed()
+
+    def _changed(self) -> None:
+        if self._on_change:
+            self._on_change(self)
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'state': self.state, 'open_until': self.open_until, 'trips': self.trips, 'total_trips': self.total_trips}
+
+    def load(self, state: Dict[str, Any]) -> None:
+        self.state = state.get('state', CLOSED)
+        if self.state not in (CLOSED, OPEN, HALF_OPEN):
+            self.state = CLOSED
+        self.open_until = state.get('open_until', 0.0)
+        self.trips = state.get('trips', 0)
+        self.total_trips = state.get('total_trips', 0)
+        # Probes in flight did not survive the restart
+        if self.state == HALF_OPEN:
+            self._probes = 0
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        self._refresh(now)
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            'state': self.state,
+            'retry_after': int(self.retry_after(now)),
+            'trips': self.trips,
+            'total_trips': self.total_trips,
+            'window_calls': len(self._outcomes),
+            'window_failures': failures,
+        }
+
+
+class BreakerRegistry:
+    """
+    Named breakers sharing one settings set and one state file.
+
+    ``call``/``call_sync`` wrap a request: every named breaker must allow it,
+    and its outcome (as classified by the caller) is recorded on all of them.
+    """
+
+    def __init__(self, path: Optional[str] = None, **settings):
+        """
+        :param path: optional JSON file persisting breaker state across restarts
+        :param settings: keyword arguments for every ``CircuitBreaker`` created
+        """
+        self.path = path
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._saved: Dict[str, Dict[str, Any]] = self._load()
+        self._saved_at = 0.0
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_again = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f) or {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load circuit breaker state {self.path}: {e}")
+            return {}
+
+    def _state(self) -> Dict[str, Dict[str, Any]]:
+        state = dict(self._saved)
+        state.update({name: b.to_dict() for name, b in list(self._breakers.items())})
+        return state
+
+    def _write(self, state: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            write_json_sync(self.path, state)
+        except OSError as e:
+            logger.warning(f"Failed to save circuit breaker state {self.path}: {e}")
+
+    def save(self, force: bool = False) -> None:
+        """
+        Persists breaker state, at most once per SAVE_INTERVAL unless ``force``.
+
+        On the event loop the (fsync'd) write runs in a thread; call ``flush`` to wait for it.
+        """
+        if not self.path:
+            return
+        now = time.time()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return
+        self._saved_at = now
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # call_sync from a worker thread
+            self._write(self._state())
+            return
+        if self._save_task and not self._save_task.done():
+            # The running write picks up the newer state when it finishes
+            self._save_again = True
+            return
+        self._save_task = loop.create_task(self._save_in_thread())
+
+    async def _save_in_thread(self) -> None:
+        while True:
+            self._save_again = False
+            await asyncio.to_thread(self._write, self._state())
+            if not self._save_again:
+                return
+
+    async def flush(self) -> None:
+        """Writes the current state and waits until it is on disk."""
+        if not self.path:
+            return
+        self.save(force=True)
+        while self._save_task and not self._save_task.done():
+            await self._save_task
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, on_change=lambda _: self.save(force=True), **self.settings)
+            if name in self._saved:
+                breaker.load(self._saved[name])
+            self._breakers[name] = breaker
+        return breaker
+
+    def ready(self, *names: str) -> bool:
+        return all(self.get(n).ready() for n in names)
+
+    def retry_after(self, *names: str) -> float:
+        return max((self.get(n).retry_after() for n in names), default=0.0)
+
+    def _acquire(self, names: Iterable[str]) -> list:
+        breakers = [self.get(n) for n in names]
+        # Check all before claiming, so a refused call does not hold a half-open probe
+        for b in breakers:
+            if not b.ready():
+                raise CircuitOpen(b.name, b.retry_after() or b.base_cooldown)
+        for b in breakers:
+            b.allow()
+        return breakers
+
+    @staticmethod
+    def _settle(breakers: list, outcome: str, cooldown: Optional[float] = None) -> None:
+        for b in breakers:
+            if outcome == OK:
+                b.record_success()
+            elif outcome == TRIP:
+                # A hard stop signal opens the credential breaker directly; the
+                # platform breaker only counts it, as other credentials may still work
+                if ':' in b.name:
+                    b.trip(cooldown)
+                else:
+                    b.record_failure()
+            else:
+                b.record_failure()
+
+    async def call(
+        self,
+        names: Iterable[str],
+        func: Callable[[], Awaitable[T]],
+        classify: Callable[[BaseException], Tuple[str, Optional[float]]],
+    ) -> T:
+        """
+        Runs ``func()`` guarded by the named breakers.
+
+        :param classify: maps an exception to ``(OK | FAILURE | TRIP, cooldown)``;
+            OK is for errors that prove the platform is healthy (e.g. not found)
+        """
+        breakers = self._acquire(names)
+        try:
+            result = await func()
+        except Exception as e:
+            outcome, cooldown = classify(e)
+            self._settle(breakers, outcome, cooldown)
+            self.save()
+            raise
+        except BaseException:
+            # Cancelled: nothing was learned about the platform
+            for b in breakers:
+                b.release()
+            raise
+        self._settle(breakers, OK)
+        self.save()
+        return result
+
+    def call_sync(
+        self,
+        names: Iterable[str],
+        func: Callable[[], T],
+        classify: Callable[[BaseException], Tuple[str, Optional[float]]],
+    ) -> T:
+        """Blocking counterpart of ``call`` for synchronous clients."""
+        breakers = self._acquire(names)
+        try:
+            result = func()
+        except Exception as e:
+            outcome, cooldown = classify(e)
+            self._settle(breakers, outcome, cooldown)
+            self.save()
+            raise
+        self._settle(breakers, OK)
+        self.save()
+        return result
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: b.status() for name, b in self._breakers.items()}
+
+
+_registry: Optional[BreakerRegistry] = None
+
+
+def get_breakers() -> BreakerRegistry:
+    """Registry shared by all platform managers, so every job sees the same breaker state."""
+    global _registry
+    if _registry is None:
+        _registry = BreakerRegistry(
+            path=str(cfg_get("breaker.state_file") or DEFAULT_STATE_FILE),
+            error_rate=cfg_get_float("breaker.error_rate", DEFAULT_ERROR_RATE),
+            min_calls=cfg_get_int("breaker.min_calls", DEFAULT_MIN_CALLS),
+            base_cooldown=cfg_get_float("breaker.base_cooldown", DEFAULT_BASE_COOLDOWN),
+            max_cooldown=cfg_get_float("breaker.max_cooldown", DEFAULT_MAX_COOLDOWN),
+        )
+    return _registry
@@ -5,6 +5,15 @@ import os
 import tempfile
 from typing import Union
 
+try:
+    # orjson 解析大 JSON 明显更快，没装时退回标准库
+    import orjson
+
+    def loads(content: Union[str, bytes]):
+        return orjson.loads(content)
+except ImportError:
+    loads = json.loads
+
 
 async def read_json(path: str):
     if not os.path.exists(path):
@@ -14,8 +23,8 @@ async def read_json(path: str):
             content = await f.read()
         if not content.strip():
             return None
-        return json.loads(content)
-    except (FileNotFoundError, json.JSONDecodeError):
+        return loads(content)
+    except (FileNotFoundError, ValueError):
         return None
 
 
@@ -35,6 +44,11 @@ async def write_json(path: str, data: Union[dict, list]):
     # Perform the write in a thread to allow fsync and atomic replace without blocking loop
     await asyncio.to_thread(_sync_write_atomic, path, line)
 
+
+def write_json_sync(path: str, data: Union[dict, list]):
+    # For callers outside the event loop (e.g. requests-based managers)
+    _sync_write_atomic(path, json.dumps(data, ensure_ascii=False, indent=4))
+
 async def read_txt(path: str):
     async with aiofiles.open(path, 'r') as f:
         data = await f.read()
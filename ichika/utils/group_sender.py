@@ -0,0 +1,137 @@
+"""
+群消息扇出发送
+同一条消息只构建一次，并发发送到所有目标群：
+- 全局并发上限，避免瞬间向协议端压太多请求
+- 每个群有最小发送间隔，多个推送任务共用同一节奏
+- 单个群失败按指数退避重试，不影响其他群；只重试确定没有送达的失败，
+  超时或协议端返回失败时消息可能已经发出，重试会在群里重复刷屏，直接放弃
+配置项（.env.prod）：
+  PUSH_MIN_INTERVAL=1.5                 (可选，同一个群两次发送的最小间隔，秒)
+  PUSH_CONCURRENCY=4                    (可选，同时进行的发送请求数)
+  PUSH_RETRIES=2                        (可选，确定未送达时的重试次数)
+  PUSH_RETRY_RETCODES=[]                (可选，协议端表示"未发送、可重试"的 retcode，如限流，依协议端而定)
+"""
+import asyncio
+import logging
+import random
+import re
+import time
+from typing import Iterable, Optional, Union
+
+import httpx
+from nonebot.adapters.onebot.v11 import ActionFailed, ApiNotAvailable, Bot, Message, NetworkError
+
+from ichika.config import get as cfg_get, get_float as cfg_get_float, get_int as cfg_get_int
+
+logger = logging.getLogger(__name__)
+
+# HTTP 模式下协议端拒绝处理的状态码（限流 / 暂不可用），请求没有被执行
+_REJECTED_STATUS = {429, 503}
+_STATUS_RE = re.compile(r"status code: (\d+)")
+
+
+class GroupSender:
+    def __init__(
+        self,
+        min_interval: float = 1.5,
+        concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 2.0,
+        retry_retcodes: Iterable[int] = (),
+    ):
+        """
+        :param min_interval: 同一个群两次发送之间的最小间隔（秒）
+        :param concurrency: 同时进行的发送请求数
+        :param retries: 单个群确定未送达后的重试次数
+        :param backoff: 重试的初始退避时间（秒），每次翻倍
+        :param retry_retcodes: 视为未发送、可以重试的 ActionFailed retcode
+        """
+        self.min_interval = min_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.retry_retcodes = frozenset(retry_retcodes)
+        self._sem = asyncio.Semaphore(max(concurrency, 1))
+        self._group_locks: dict[int, asyncio.Lock] = {}
+        self._last_sent: dict[int, float] = {}
+
+    def _retryable(self, e: Exception) -> bool:
+        """确定消息没有送达时才重试；超时等情况协议端可能已经发出"""
+        if isinstance(e, ApiNotAvailable):
+            # 协议端未连接，请求没有发出
+            return True
+        if isinstance(e, ActionFailed):
+            return e.info.get("retcode") in self.retry_retcodes
+        if isinstance(e, NetworkError):
+            if isinstance(e.__cause__, (ConnectionRefusedError, httpx.ConnectError)):
+                return True
+            match = _STATUS_RE.search(e.msg or "")
+            return bool(match) and int(match.group(1)) in _REJECTED_STATUS
+        return False
+
+    async def _send_one(self, bot: Bot, group_id: int, message: Union[Message, str]) -> None:
+        lock = self._group_locks.setdefault(group_id, asyncio.Lock())
+        async with lock:
+            for attempt in range(self.retries + 1):
+                wait = self._last_sent.get(group_id, 0) + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    async with self._sem:
+                        await bot.send_group_msg(group_id=group_id, message=message)
+                    return
+                except Exception as e:
+                    if not self._retryable(e):
+                        # 可能已经送达：不重试，也不报告为失败，免得调用方下一轮重发
+                        logger.warning(f"send to group {group_id} failed ({e!r}), may have been delivered, dropped")
+                        return
+                    if attempt >= self.retries:
+                        raise
+                    delay = self.backoff * (2 ** attempt) * random.uniform(0.8, 1.2)
+                    logger.warning(f"send to group {group_id} failed ({e}), retry in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                finally:
+                    self._last_sent[group_id] = time.monotonic()
+
+    async def send(self, bot: Bot, group_ids: Iterable[int], message: Union[Message, str]) -> list[int]:
+        """
+        把同一条消息并发发送到多个群
+
+        :return: 重试后仍确定没有送达的群号列表（可能已送达的失败只记日志，不计入）
+        """
+        group_ids = list(dict.fromkeys(group_ids))
+        results = await asyncio.gather(
+            *(self._send_one(bot, gid, message) for gid in group_ids),
+            return_exceptions=True,
+        )
+        failed = []
+        for gid, result in zip(group_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"send to group {gid} failed: {result}")
+                failed.append(gid)
+        return failed
+
+
+_sender: Optional[GroupSender] = None
+
+
+def _retcodes(value) -> list[int]:
+    if not isinstance(value, (list, tuple)):
+        return []
+    try:
+        return [int(v) for v in value]
+    except (TypeError, ValueError):
+        logger.warning(f"invalid push.retry_retcodes: {value!r}")
+        return []
+
+
+def get_sender() -> GroupSender:
+    """所有推送任务共用的发送器，保证对同一个群的节奏是全局的"""
+    global _sender
+    if _sender is None:
+        _sender = GroupSender(
+            min_interval=cfg_get_float("push.min_interval", 1.5),
+            concurrency=cfg_get_int("push.concurrency", 4),
+            retries=cfg_get_int("push.retries", 2),
+            retry_retcodes=_retcodes(cfg_get("push.retry_retcodes")),
+        )
+    return _sender
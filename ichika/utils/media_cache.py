@@ -0,0 +1,161 @@
+"""
+推送图片的本地缓存
+每个 URL 只经代理下载一次，按内容 sha256 落盘（相同内容只存一份），
+超过容量上限时按最近使用时间淘汰；推送时把本地文件交给 OneBot 协议端，
+避免协议端对每个群各下载一次
+配置项（.env.prod）：
+  MEDIA_CACHE_DIR=                      (可选，缓存目录，默认 resources/media_cache)
+  MEDIA_CACHE_MAX_MB=512                (可选，缓存容量上限)
+  MEDIA_SEND_BASE64=false               (可选，协议端与 bot 不在同一台机器时改用 base64 发送)
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+from nonebot.adapters.onebot.v11 import MessageSegment
+
+from ichika.config import get as cfg_get, get_bool as cfg_get_bool, get_int as cfg_get_int
+from ichika.utils.cache import TTLCache
+from ichika.utils.proxy_pool import ProxyLike, ProxyPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "resources" / "media_cache"
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/117.0'
+
+
+class MediaCache:
+    def __init__(self, cache_dir: Path, max_bytes: int, timeout: float = 30):
+        """
+        :param cache_dir: 缓存目录
+        :param max_bytes: 缓存总大小上限（字节）
+        :param timeout: 单次下载超时（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._clients: dict[Optional[str], httpx.AsyncClient] = {}
+        # url → 本地文件；进程内索引，重启后每个 URL 最多再下载一次
+        self._index: TTLCache[Path] = TTLCache(ttl=7 * 24 * 3600, maxsize=4096)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._store_lock = asyncio.Lock()
+        self._total = sum(p.stat().st_size for p in self.cache_dir.iterdir() if p.is_file())
+
+    def _client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        client = self._clients.get(proxy)
+        if client is None:
+            client = httpx.AsyncClient(
+                proxy=proxy or None, timeout=self.timeout, follow_redirects=True,
+                headers={'User-Agent': _USER_AGENT},
+            )
+            self._clients[proxy] = client
+        return client
+
+    @staticmethod
+    def _suffix(url: str, content_type: Optional[str]) -> str:
+        suffix = Path(urlparse(url).path).suffix
+        if not suffix and content_type:
+            suffix = mimetypes.guess_extension(content_type.split(';')[0].strip()) or ''
+        return suffix.lower()[:8]
+
+    async def fetch(self, url: str, proxy: ProxyLike = None) -> Optional[Path]:
+        """下载（或命中缓存）并返回本地文件路径，失败返回 None；proxy 为代理池时代理失败会换下一个"""
+        path = self._index.get(url)
+        if path is not None and path.exists():
+            os.utime(path)
+            return path
+
+        # 同一 URL 的并发请求共用一次下载
+        future = self._inflight.get(url)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            if isinstance(proxy, ProxyPool):
+                path = await proxy.run_async(lambda p: self._download(url, p))
+            else:
+                path = await self._download(url, proxy)
+            future.set_result(path)
+            return path
+        except Exception as e:
+            logger.warning(f"media cache download failed {url}: {e}")
+            future.set_result(None)
+            return None
+        finally:
+            # 被取消时也要结束 future，否则等待同一下载的其他请求会一直挂起
+            if not future.done():
+                future.set_result(None)
+            self._inflight.pop(url, None)
+
+    async def _download(self, url: str, proxy: Optional[str]) -> Path:
+        resp = await self._client(proxy).get(url)
+        resp.raise_for_status()
+        content = resp.content
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.cache_dir / f"{digest}{self._suffix(url, resp.headers.get('content-type'))}"
+        async with self._store_lock:
+            if path.exists():
+                os.utime(path)
+            else:
+                await asyncio.to_thread(path.write_bytes, content)
+                self._total += len(content)
+                await asyncio.to_thread(self._evict, path)
+        self._index.set(url, path)
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        if self._total <= self.max_bytes:
+            return
+        files = sorted(
+            (p for p in self.cache_dir.iterdir() if p.is_file() and p != keep),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for p in files:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                size = p.stat().st_size
+                p.unlink()
+                self._total -= size
+            except OSError:
+                continue
+
+    async def image_segment(self, url: str, proxy: ProxyLike = None, as_base64: bool = False) -> MessageSegment:
+        """构建图片消息段；下载失败时退回直接发 URL"""
+        path = await self.fetch(url, proxy)
+        if path is None:
+            return MessageSegment.image(url)
+        if as_base64:
+            data = await asyncio.to_thread(path.read_bytes)
+            return MessageSegment.image(f"base64://{base64.b64encode(data).decode()}")
+        return MessageSegment.image(path)
+
+
+_cache: Optional[MediaCache] = None
+
+
+def get_media_cache() -> MediaCache:
+    global _cache
+    if _cache is None:
+        _cache = MediaCache(
+            cache_dir=Path(cfg_get("media.cache_dir") or DEFAULT_CACHE_DIR),
+            max_bytes=cfg_get_int("media.cache_max_mb", 512) * 1024 * 1024,
+        )
+    return _cache
+
+
+async def image_segments(urls: list[str], proxy: ProxyLike = None) -> list[MessageSegment]:
+    """并发把一组图片 URL 转成消息段（保持原顺序）"""
+    cache = get_media_cache()
+    as_base64 = cfg_get_bool("media.send_base64")
+    return list(await asyncio.gather(*(cache.image_segment(u, proxy, as_base64) for u in urls)))
@@ -0,0 +1,98 @@
+"""
+Adaptive polling helpers.
+
+Each subscription keeps an exponentially decayed count of the new items seen
+on it (``{"score": float, "updated": ts}``), which gives a posting-rate
+estimate. ``allocate_intervals`` then splits a global poll budget across
+subscriptions following the square-root rule (poll frequency proportional to
+sqrt(rate)), which minimises the expected delivery delay for a fixed number
+of requests.
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+# Half-life of the activity score: a burst of posts stops counting after a few days
+DEFAULT_HALF_LIFE = 3 * 24 * 3600
+# Prior rate (items/hour) so that silent accounts still get a share of the budget
+RATE_FLOOR = 0.01
+
+
+def _decay(score: float, elapsed: float, half_life: float) -> float:
+    if elapsed <= 0:
+        return score
+    return score * math.pow(0.5, elapsed / half_life)
+
+
+def record_activity(
+    entry: Optional[Dict], new_items: int, now: float, half_life: float = DEFAULT_HALF_LIFE
+) -> Dict:
+    """Returns the activity entry updated with ``new_items`` observed at ``now``."""
+    entry = dict(entry or {})
+    score = _decay(float(entry.get("score", 0.0)), now - float(entry.get("updated", now)), half_life)
+    entry["score"] = score + max(new_items, 0)
+    entry["updated"] = now
+    return entry
+
+
+def seed_activity(timestamps: Iterable[float], now: float, half_life: float = DEFAULT_HALF_LIFE) -> Dict:
+    """
+    Builds an initial activity entry from the timestamps of already published items.
+
+    A timeline page only holds the latest few items, so the rate is taken as
+    items / span over the page rather than by decaying each item.
+    """
+    stamps = [ts for ts in timestamps if ts <= now]
+    if not stamps:
+        return {"score": 0.0, "updated": now}
+    span = max(now - min(stamps), 3600.0)
+    rate = len(stamps) / span
+    return {"score": rate * half_life / math.log(2), "updated": now}
+
+
+def activity_rate(entry: Optional[Dict], now: float, half_life: float = DEFAULT_HALF_LIFE) -> float:
+    """Estimated posting rate in items per hour."""
+    if not entry:
+        return 0.0
+    score = _decay(float(entry.get("score", 0.0)), now - float(entry.get("updated", now)), half_life)
+    # A decayed counter with half-life H integrates to rate * H / ln 2
+    return score * math.log(2) / half_life * 3600
+
+
+def allocate_intervals(
+    rates: Dict[str, float], budget: float, min_interval: float, max_interval: float
+) -> Dict[str, float]:
+    """
+    Splits ``budget`` polls per hour across subscriptions.
+
+    :param rates: estimated items per hour for each key
+    :param budget: total polls per hour
+    :param min_interval: shortest allowed interval between polls of one key (seconds)
+    :param max_interval: longest allowed interval between polls of one key (seconds)
+    :return: polling interval in seconds for each key
+    """
+    max_freq = 3600 / min_interval
+    min_freq = 3600 / max_interval
+    weights = {k: math.sqrt(max(r, 0.0) + RATE_FLOOR) for k, r in rates.items()}
+    freqs: Dict[str, float] = {}
+    remaining = float(budget)
+
+    # Water-filling: pin keys that hit a bound, then redistribute the rest
+    while weights:
+        total = sum(weights.values())
+        pinned = {}
+        for k, w in weights.items():
+            f = max(remaining, 0.0) * w / total
+            if f > max_freq:
+                pinned[k] = max_freq
+            elif f < min_freq:
+                pinned[k] = min_freq
+        if not pinned:
+            for k, w in weights.items():
+                freqs[k] = remaining * w / total
+            break
+        for k, f in pinned.items():
+            freqs[k] = f
+            remaining -= f
+            del weights[k]
+
+    return {k: 3600 / f for k, f in freqs.items()}
@@ -0,0 +1,212 @@
+"""
+Latency-ranked pool of outbound proxies.
+
+Every proxy is probed in the background against a cheap endpoint; requests go
+to the lowest-latency healthy proxy and fail over to the next one when the
+proxy itself fails (connect/proxy/timeout errors). HTTP errors from the
+upstream are not the proxy's fault and are returned to the caller untouched.
+
+``"direct"`` in the proxy list means "no proxy".
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+
+import httpx
+import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+DIRECT = 'direct'
+DEFAULT_PROBE_URL = 'https://x.com/robots.txt'
+# Consecutive proxy errors (probes or requests) before a proxy is marked down
+DEFAULT_MAX_FAILURES = 2
+# Weight of the newest probe in the latency average
+LATENCY_ALPHA = 0.3
+
+# Errors that mean the proxy (or the route through it) failed, not the upstream
+_PROXY_ERRORS = (
+    httpx.TransportError,
+    requests.exceptions.ProxyError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+class _ProxyStat:
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.healthy = True
+        self.failures = 0
+        self.requests = 0
+        self.errors = 0
+        self.last_probe = 0.0
+
+    @property
+    def proxy(self) -> Optional[str]:
+        """Value to hand to an HTTP client (None for a direct connection)."""
+        return None if self.url == DIRECT else self.url
+
+    def status(self) -> Dict:
+        return {
+            'healthy': self.healthy,
+            'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+            'failures': self.failures,
+            'requests': self.requests,
+            'errors': self.errors,
+            'last_probe': int(self.last_probe),
+        }
+
+
+class ProxyPool:
+    """
+    Health-checked proxy pool.
+
+    Call ``probe_all`` periodically (e.g. from a scheduler job), and send
+    requests through ``run_async``/``run_sync``, which try proxies in latency
+    order until one gets a response.
+    """
+
+    def __init__(
+        self,
+        proxies: Sequence[str],
+        probe_url: str = DEFAULT_PROBE_URL,
+        probe_timeout: float = 5.0,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+    ):
+        """
+        :param proxies: proxy URLs, or "direct" for no proxy
+        :param probe_url: cheap URL fetched through every proxy to measure latency
+        :param probe_timeout: seconds before a probe counts as failed
+        :param max_failures: consecutive proxy errors before a proxy is skipped
+        """
+        if not proxies:
+            raise ValueError('ProxyPool needs at least one proxy')
+        self._stats: Dict[str, _ProxyStat] = {p: _ProxyStat(p) for p in dict.fromkeys(proxies)}
+        self.probe_url = probe_url
+        self.probe_timeout = probe_timeout
+        self.max_failures = max_failures
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    # ---------- ranking ----------
+
+    def _ranked(self) -> List[_ProxyStat]:
+        # Healthy proxies by latency (unprobed ones after measured ones, in config order),
+        # then the unhealthy ones as a last resort
+        order = {url: i for i, url in enumerate(self._stats)}
+        return sorted(
+            self._stats.values(),
+            key=lambda s: (not s.healthy, s.latency is None, s.latency or 0, order[s.url]),
+        )
+
+    def candidates(self) -> List[Optional[str]]:
+        """Proxies in the order requests should try them."""
+        return [s.proxy for s in self._ranked()]
+
+    def best(self) -> Optional[str]:
+        return self._ranked()[0].proxy
+
+    def _stat(self, proxy: Optional[str]) -> Optional[_ProxyStat]:
+        return self._stats.get(proxy or DIRECT)
+
+    def report(self, proxy: Optional[str], ok: bool) -> None:
+        """Records the outcome of a real request sent through ``proxy``."""
+        stat = self._stat(proxy)
+        if stat is None:
+            return
+        stat.requests += 1
+        if ok:
+            stat.failures = 0
+            stat.healthy = True
+            return
+        stat.errors += 1
+        stat.failures += 1
+        if stat.healthy and stat.failures >= self.max_failures:
+            stat.healthy = False
+            logger.warning(f"Proxy {stat.url} marked down after {stat.failures} failures")
+
+    @staticmethod
+    def is_proxy_error(e: BaseException) -> bool:
+        return isinstance(e, _PROXY_ERRORS)
+
+    # ---------- health checks ----------
+
+    async def probe(self, url: str) -> Optional[float]:
+        """Fetches the probe URL through one proxy; returns the latency in seconds or None."""
+        stat = self._stats[url]
+        stat.last_probe = time.time()
+        try:
+            async with httpx.AsyncClient(proxy=stat.proxy, timeout=self.probe_timeout) as client:
+                start = time.monotonic()
+                # Any HTTP answer proves the route works; only transport errors count
+                await client.get(self.probe_url)
+                latency = time.monotonic() - start
+        except Exception as e:
+            stat.failures += 1
+            if stat.healthy and stat.failures >= self.max_failures:
+                stat.healthy = False
+                logger.warning(f"Proxy {url} marked down: {e!r}")
+            return None
+        stat.latency = latency if stat.latency is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * stat.latency
+        )
+        if not stat.healthy:
+            logger.info(f"Proxy {url} is back up ({int(latency * 1000)}ms)")
+        stat.healthy = True
+        stat.failures = 0
+        return latency
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self.probe(url) for url in self._stats))
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-proxy health and latency, in the order requests would try them."""
+        return {s.url: s.status() for s in self._ranked()}
+
+    # ---------- request helpers ----------
+
+    async def run_async(self, func: Callable[[Optional[str]], Awaitable[T]]) -> T:
+        """Runs ``func(proxy)`` on the best proxy, failing over to the next on proxy errors."""
+        last_error: Optional[BaseException] = None
+        for proxy in self.candidates():
+            try:
+                result = await func(proxy)
+            except Exception as e:
+                if not self.is_proxy_error(e):
+                    self.report(proxy, True)
+                    raise
+                self.report(proxy, False)
+                logger.info(f"Request via proxy {proxy or DIRECT} failed ({e!r}), failing over")
+                last_error = e
+                continue
+            self.report(proxy, True)
+            return result
+        raise last_error
+
+    def run_sync(self, func: Callable[[Optional[str]], T]) -> T:
+        """Blocking counterpart of ``run_async``."""
+        last_error: Optional[BaseException] = None
+        for proxy in self.candidates():
+            try:
+                result = func(proxy)
+            except Exception as e:
+                if not self.is_proxy_error(e):
+                    self.report(proxy, True)
+                    raise
+                self.report(proxy, False)
+                logger.info(f"Request via proxy {proxy or DIRECT} failed ({e!r}), failing over")
+                last_error = e
+                continue
+            self.report(proxy, True)
+            return result
+        raise last_error
+
+
+# What downloaders accept as their ``proxy`` argument: one fixed proxy URL, a pool, or nothing
+ProxyLike = Union[str, ProxyPool, None]
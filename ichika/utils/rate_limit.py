@@ -0,0 +1,52 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Async token bucket limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``; each
+    ``acquire`` takes tokens and waits only as long as needed for the refill.
+    Waiters are served in FIFO order, so a burst of concurrent callers is
+    spread evenly over the budget instead of hammering the endpoint.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        :param rate: tokens refilled per second
+        :param capacity: maximum number of tokens (burst size)
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_window(cls, requests: int, window: float, burst: Optional[int] = None) -> "TokenBucket":
+        """Builds a bucket allowing ``requests`` calls per ``window`` seconds."""
+        return cls(rate=requests / window, capacity=burst if burst is not None else requests)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available (without waiting)."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Waits until ``tokens`` are available and takes them."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
@@ -0,0 +1,60 @@
+"""
+Twitter snowflake ID helpers.
+
+A tweet ID is a 64-bit integer whose upper 41 bits hold the creation time in
+milliseconds since the Twitter epoch, so IDs order chronologically and carry
+their own timestamp. Comparing IDs as strings is wrong once their lengths
+differ; compare them with these helpers instead.
+"""
+from typing import Iterable, Optional, Union
+
+TWITTER_EPOCH_MS = 1288834974657
+TIMESTAMP_SHIFT = 22
+
+SnowflakeLike = Union[str, int]
+
+
+def to_int(snowflake_id: SnowflakeLike) -> int:
+    """Converts an ID to int, raising ValueError for anything that is not a non-negative integer."""
+    value = int(snowflake_id)
+    if value < 0:
+        raise ValueError(f"Invalid snowflake id: {snowflake_id!r}")
+    return value
+
+
+def is_snowflake(snowflake_id: SnowflakeLike) -> bool:
+    """Whether the ID is a timestamped snowflake (tweets since late 2010)."""
+    try:
+        return to_int(snowflake_id) >> TIMESTAMP_SHIFT > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def timestamp_ms(snowflake_id: SnowflakeLike) -> int:
+    """Creation time of the ID in milliseconds since the Unix epoch."""
+    return (to_int(snowflake_id) >> TIMESTAMP_SHIFT) + TWITTER_EPOCH_MS
+
+
+def timestamp(snowflake_id: SnowflakeLike) -> Optional[float]:
+    """Creation time of the ID in seconds since the Unix epoch, None for non-snowflake IDs."""
+    if not is_snowflake(snowflake_id):
+        return None
+    return timestamp_ms(snowflake_id) / 1000
+
+
+def from_timestamp(ts: float) -> int:
+    """Smallest ID that can have been created at ``ts`` (seconds), usable as a since_id bound."""
+    return max(int(ts * 1000) - TWITTER_EPOCH_MS, 0) << TIMESTAMP_SHIFT
+
+
+def is_newer(snowflake_id: SnowflakeLike, than: Optional[SnowflakeLike]) -> bool:
+    """Whether ``snowflake_id`` is strictly newer than ``than``; everything is newer than an empty ID."""
+    if not than:
+        return True
+    return to_int(snowflake_id) > to_int(than)
+
+
+def max_id(ids: Iterable[SnowflakeLike]) -> Optional[str]:
+    """Newest ID of ``ids`` as a string, None if empty."""
+    newest = max((to_int(i) for i in ids), default=None)
+    return None if newest is None else str(newest)
@@ -0,0 +1,217 @@
+"""
+Hedged tweet lookups across several backends.
+
+The router asks its first backend and, if no answer arrives within that
+backend's recent p95 latency, starts the next one in parallel (a hedged
+request). The first usable answer wins and the others are cancelled. A
+backend that fails or reports the tweet as missing hands over to the next
+one immediately instead of waiting for the hedge delay.
+
+Every backend returns the twikit-shaped pair used across the plugins:
+``tweet_data`` ({'tweet_type', 'id', 'text', 'created_at', 'imgs', 'videos',
+'video_variants', optional 'retweet_data' / 'quote_data'}) and ``user_info`` ({'id', 'name',
+'screen_name', 'icon', ...}). The ``normalize_*`` helpers convert the raw
+GraphQL and official API payloads into that shape.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TweetPair = Tuple[Dict, Dict]
+Fetcher = Callable[[str], Awaitable[Optional[TweetPair]]]
+
+# Hedge delay before enough latency samples exist (seconds)
+DEFAULT_HEDGE_DELAY = 1.5
+MIN_HEDGE_DELAY = 0.2
+MAX_HEDGE_DELAY = 5.0
+# Latency samples kept per backend, and how many are needed before trusting the p95
+LATENCY_WINDOW = 100
+MIN_SAMPLES = 10
+
+
+class _Backend:
+    def __init__(self, name: str, fetch: Fetcher):
+        self.name = name
+        self.fetch = fetch
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.wins = 0
+        self.errors = 0
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+        return min(max(p95, MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+
+class TweetRouter:
+    """Fetches a tweet from the first backend that answers, hedging slow ones."""
+
+    def __init__(self):
+        self._backends: List[_Backend] = []
+
+    def add_backend(self, name: str, fetch: Fetcher) -> None:
+        """Registers a backend; earlier backends are preferred."""
+        self._backends.append(_Backend(name, fetch))
+
+    def __len__(self) -> int:
+        return len(self._backends)
+
+    async def _timed(self, backend: _Backend, tweet_id: str) -> Optional[TweetPair]:
+        start = time.monotonic()
+        try:
+            result = await backend.fetch(tweet_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            backend.errors += 1
+            raise
+        backend.latencies.append(time.monotonic() - start)
+        return result
+
+    async def get_tweet(self, tweet_id: str) -> Optional[TweetPair]:
+        """
+        :return: (tweet_data, user_info), or None if every backend reports the tweet missing
+        :raises: the last backend error if no backend gave a definitive answer
+        """
+        pending: Dict[asyncio.Task, _Backend] = {}
+        queue = list(self._backends)
+        last_error: Optional[BaseException] = None
+        answered_missing = False
+
+        def _launch() -> None:
+            backend = queue.pop(0)
+            pending[asyncio.create_task(self._timed(backend, tweet_id))] = backend
+
+        try:
+            if queue:
+                _launch()
+            while pending:
+                # Wait for an answer, or until the newest backend is due for a hedge
+                timeout = next(reversed(pending.values())).hedge_delay() if queue else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.debug(f"Hedging tweet {tweet_id} to {queue[0].name}")
+                    _launch()
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.info(f"Tweet backend {backend.name} failed for {tweet_id}: {last_error}")
+                    elif task.result():
+                        backend.wins += 1
+                        return task.result()
+                    else:
+                        answered_missing = True
+                # A failed or empty answer hands over to the next backend right away
+                if not pending and queue:
+                    _launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if answered_missing or last_error is None:
+            return None
+        raise last_error
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-backend hedge delay, wins and errors, for monitoring."""
+        return [
+            {
+                'name': b.name,
+                'hedge_delay': round(b.hedge_delay(), 3),
+                'samples': len(b.latencies),
+                'wins': b.wins,
+                'errors': b.errors,
+            }
+            for b in self._backends
+        ]
+
+
+# ---------- normalization into the twikit shape ----------
+
+def normalize_graphql(tweet_data: Optional[Dict], user_info: Optional[Dict]) -> Optional[TweetPair]:
+    """TwitterManager.parse_tweet_detail output -> twikit shape."""
+    if not tweet_data or not user_info:
+        return None
+
+    def _user(u: Dict) -> Dict:
+        u = dict(u)
+        if u.get('icon'):
+            u['icon'] = u['icon'].replace('_normal', '')
+        return u
+
+    def _tweet(t: Dict) -> Dict:
+        t = dict(t)
+        # twikit's id is the tweet's own ID, not the thread root TwitterManager keeps in 'id'
+        t['id'] = t.pop('tweet_id', None) or t.get('id')
+        t.setdefault('imgs', [])
+        t.setdefault('videos', [])
+        t.setdefault('video_variants', [])
+        for key in ('retweet_data', 'quote_data'):
+            if key in t:
+                t[key] = {'user_info': _user(t[key].get('user_info', {})), 'data': _tweet(t[key].get('data', {}))}
+        return t
+
+    return _tweet(tweet_data), _user(user_info)
+
+
+def _x_api_user(author: Dict) -> Dict:
+    return {
+        'id': author.get('id'),
+        'name': author.get('name'),
+        'screen_name': author.get('username'),
+        'icon': (author.get('profile_image_url') or '').replace('_normal', '') or None,
+    }
+
+
+def _x_api_tweet(tweet: Dict) -> Dict:
+    return {
+        'tweet_type': 'default',
+        'id': tweet.get('id'),
+        'text': tweet.get('text'),
+        'created_at': tweet.get('created_at'),
+        'imgs': [u for u in tweet.get('imgs', []) if u],
+        'videos': [],
+        'video_variants': [
+            {'duration_ms': v.get('duration_ms'), 'variants': v['variants']}
+            for v in tweet.get('videos', []) if v.get('variants')
+        ],
+    }
+
+
+def normalize_x_api(response_data: Dict) -> Optional[TweetPair]:
+    """Official API v2 tweet lookup response -> twikit shape."""
+    from ichika.utils.x_api_manager import XAPIManager
+
+    parsed = XAPIManager.parse_tweets(response_data) if response_data.get('data') else None
+    if not parsed or not parsed['tweets']:
+        return None
+    main = parsed['tweets'][0]
+    if not main.get('author'):
+        return None
+
+    tweet_data = _x_api_tweet(main)
+    includes = response_data.get('includes', {})
+    media_map = {m['media_key']: m for m in includes.get('media', [])}
+    users_map = {u['id']: u for u in includes.get('users', [])}
+    referenced = {t['id']: t for t in includes.get('tweets', [])}
+    for ref in main.get('referenced_tweets', []):
+        tweet_type = {'retweeted': 'retweet', 'quoted': 'quote'}.get(ref.get('type'))
+        if not tweet_type or ref.get('id') not in referenced:
+            continue
+        sub = XAPIManager.parse_tweet(referenced[ref['id']], media_map, users_map)
+        tweet_data['tweet_type'] = tweet_type
+        tweet_data[f'{tweet_type}_data'] = {
+            'user_info': _x_api_user(sub.get('author') or {}),
+            'data': _x_api_tweet(sub),
+        }
+        break
+    return tweet_data, _x_api_user(main['author'])
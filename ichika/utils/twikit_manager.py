@@ -1,27 +1,148 @@
 import logging
 import json
 import asyncio
-from typing import Dict, Optional, List, Any
+import hashlib
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, Optional, List, Any, Tuple
+import bs4
+from httpx import AsyncHTTPTransport
+from httpx._utils import URLPattern  # the mount key twikit's own proxy setter uses
 from twikit import Client
+from twikit.errors import (
+    AccountLocked, AccountSuspended, Forbidden, NotFound, TooManyRequests,
+    TweetNotAvailable, Unauthorized,
+)
+
+from ichika.utils import snowflake
+from ichika.utils.cache import TTLCache
+from ichika.utils.circuit_breaker import FAILURE, OK, TRIP, BreakerRegistry, CircuitBreaker, CircuitOpen
+from ichika.utils.fileio import write_json
+from ichika.utils.proxy_pool import ProxyPool
 
 logger = logging.getLogger(__name__)
 
+# Seconds a cached user profile is considered fresh
+DEFAULT_USER_TTL = 6 * 3600
+# Cooldown when a 429 carries no x-rate-limit-reset header (one rate-limit window)
+RATE_LIMIT_COOLDOWN = 15 * 60
+# Cooldown for a cookie rejected as unauthorized / locked
+AUTH_FAILURE_COOLDOWN = 60 * 60
+# Platform name of the circuit breakers
+PLATFORM = 'twitter'
+# Seconds a saved X-Client-Transaction-Id state is reused before fetching the home page again
+DEFAULT_TRANSACTION_TTL = 12 * 3600
+
+
+class _CookieSlot:
+    """One cookie (account) of the pool with its own client and health."""
+
+    def __init__(
+        self, index: int, client: Client, breaker: CircuitBreaker, fingerprint: str = '', proxy: Optional[str] = None
+    ):
+        self.index = index
+        self.client = client
+        # Proxy the client's transport currently goes through
+        self.proxy = proxy
+        # One transport per proxy: switching back and forth reuses them instead of leaking a pool
+        # per switch, and requests still in flight keep their connections
+        self.transports: Dict[Optional[str], AsyncHTTPTransport] = {}
+        mounted = client.http._mounts.get(URLPattern('all://'))
+        if isinstance(mounted, AsyncHTTPTransport):
+            self.transports[proxy] = mounted
+        # Requests running through self.proxy; the proxy only changes once they are done
+        self.proxy_users = 0
+        self.proxy_changed = asyncio.Condition()
+        # Per-cookie circuit breaker; its persisted state replaces a plain cooldown timestamp
+        self.breaker = breaker
+        # Hash of the configured cookie, so saved state is dropped when the config changes
+        self.fingerprint = fingerprint
+        self.transaction_saved_at = 0.0
+        # Exponentially weighted success rate in [0, 1]
+        self.score = 1.0
+        self.last_used = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.ready()
+
+    def record(self, ok: bool) -> None:
+        self.score = self.score * 0.8 + (0.2 if ok else 0.0)
+        if not ok:
+            self.failures += 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'index': self.index,
+            'score': round(self.score, 3),
+            'breaker': self.breaker.state,
+            'cooldown': int(self.breaker.retry_after()),
+            'requests': self.requests,
+            'failures': self.failures,
+        }
+
 
 class TwikitManager:
     """
     Manager for interacting with Twitter (X) using the twikit library.
-    Config dict keys: 'cookie' (str or dict), optional 'proxy'.
+    Config dict keys: 'cookie' (str or dict) and/or 'cookies' (list of them),
+    optional 'proxy' (a single proxy URL) or 'proxy_pool' (a ``ProxyPool``; requests go
+    through its fastest healthy proxy and fail over to the next on proxy errors),
+    optional 'user_ttl' (seconds a cached profile stays fresh),
+    optional 'user_map_path' (JSON file persisting screen_name -> rest_id),
+    optional 'state_path' (JSON file persisting each cookie's refreshed cookies and
+    X-Client-Transaction-Id state, so a restart skips the home page fetch),
+    optional 'transaction_ttl' (seconds the saved transaction state is reused),
+    optional 'breakers' (a shared ``BreakerRegistry``; defaults to an in-memory one).
+
+    Requests are spread over all cookies: each call goes to the healthiest
+    cookie whose circuit breaker is closed (least recently used among equals),
+    and a 429/401 opens that cookie's breaker and retries on the next one.
+    A 'twitter' platform breaker opens when most calls fail across all cookies.
+    List operations always run on the first cookie, which owns the lists.
     """
 
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        proxy = self.config.get('proxy')
-        self.client = Client(language='en-US', proxy=proxy)
+        self._proxy_pool: Optional[ProxyPool] = self.config.get('proxy_pool')
+        proxy = self._proxy_pool.best() if self._proxy_pool else self.config.get('proxy')
+
+        cookie_inputs = self.config.get('cookies') or []
+        # A single cookie (string or dict) where a list was expected
+        if isinstance(cookie_inputs, (str, dict)):
+            cookie_inputs = [cookie_inputs]
+        cookie_inputs = list(cookie_inputs)
+        if self.config.get('cookie'):
+            cookie_inputs.insert(0, self.config['cookie'])
+        self._breakers: BreakerRegistry = self.config.get('breakers') or BreakerRegistry()
+        self._slots: List[_CookieSlot] = []
+        for cookie_input in cookie_inputs or [None]:
+            fingerprint = ''
+            cookies = None
+            if cookie_input:
+                cookies = self._parse_cookie_input(cookie_input)
+                fingerprint = hashlib.sha256(json.dumps(cookies, sort_keys=True).encode()).hexdigest()[:16]
+                # The same account configured twice would share one breaker and one state entry
+                if any(s.fingerprint == fingerprint for s in self._slots):
+                    logger.info(f"Skipping duplicate cookie (fingerprint {fingerprint})")
+                    continue
+            client = Client(language='en-US', proxy=proxy)
+            if cookies is not None:
+                client.set_cookies(cookies)
+            index = len(self._slots)
+            breaker = self._breakers.get(f"{PLATFORM}:{fingerprint or f'guest{index}'}")
+            self._slots.append(_CookieSlot(index, client, breaker, fingerprint, proxy))
 
-        cookie_input = self.config.get('cookie')
-        if cookie_input:
-            cookies = self._parse_cookie_input(cookie_input)
-            self.client.set_cookies(cookies)
+        self._state_path = self.config.get('state_path')
+        self._transaction_ttl = self.config.get('transaction_ttl') or DEFAULT_TRANSACTION_TTL
+        self._restore_state()
+
+        self._users: TTLCache[Dict] = TTLCache(ttl=self.config.get('user_ttl') or DEFAULT_USER_TTL)
+        self._user_map_path = self.config.get('user_map_path')
+        self._user_ids: Dict[str, str] = self._load_user_map()
 
     def _parse_cookie_input(self, cookie_input: Any) -> Dict[str, str]:
         if isinstance(cookie_input, dict):
@@ -37,41 +158,439 @@ class TwikitManager:
                         continue
         return cookies
 
-    async def get_user_info(self, screen_name: str) -> Optional[Dict]:
+    @property
+    def pool_size(self) -> int:
+        """Number of distinct cookies (accounts) requests rotate over."""
+        return len(self._slots)
+
+    @property
+    def client(self) -> Client:
+        """Client of the first cookie, for callers that need a raw twikit client."""
+        return self._slots[0].client
+
+    def _pick_slot(self, exclude: set, pin_slot: Optional[int] = None) -> Optional[_CookieSlot]:
+        candidates = [
+            s for s in self._slots
+            if s.available and s.index not in exclude and (pin_slot is None or s.index == pin_slot)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda s: (round(s.score, 1), -s.last_used))
+
+    async def _call(self, method: str, *args, pin_slot: Optional[int] = None, **kwargs) -> Any:
+        """
+        Runs a twikit client method on a healthy cookie, rotating on rate-limit/auth errors.
+
+        :param pin_slot: only use this cookie (for account-owned resources such as private lists)
+        """
+        tried: set = set()
+        last_error: Optional[Exception] = None
+        while True:
+            slot = self._pick_slot(tried, pin_slot)
+            if slot is None:
+                if last_error:
+                    raise last_error
+                slots = [s for s in self._slots if pin_slot is None or s.index == pin_slot]
+                raise CircuitOpen(f"{PLATFORM}:*", min(s.breaker.retry_after() for s in slots))
+            tried.add(slot.index)
+            slot.last_used = time.time()
+            slot.requests += 1
+            try:
+                result = await self._breakers.call(
+                    (PLATFORM, slot.breaker.name),
+                    lambda: self._request(slot, method, *args, **kwargs),
+                    self._classify_error,
+                )
+            except CircuitOpen as e:
+                if e.name == PLATFORM:
+                    raise
+                # Lost a half-open probe to a concurrent call, try another cookie
+                last_error = e
+                continue
+            except TooManyRequests as e:
+                slot.record(False)
+                logger.warning(f"Cookie #{slot.index} rate limited on {method}, breaker open {int(slot.breaker.retry_after())}s")
+                last_error = e
+                continue
+            except (Unauthorized, Forbidden, AccountLocked, AccountSuspended) as e:
+                slot.record(False)
+                logger.warning(f"Cookie #{slot.index} rejected on {method} ({type(e).__name__}), breaker open")
+                last_error = e
+                continue
+            except (NotFound, TweetNotAvailable):
+                slot.record(True)
+                raise
+            except Exception:
+                slot.record(False)
+                raise
+            slot.record(True)
+            return result
+
+    async def _request(self, slot: _CookieSlot, method: str, *args, **kwargs) -> Any:
+        if self._proxy_pool is None:
+            return await getattr(slot.client, method)(*args, **kwargs)
+
+        async def _via(proxy: Optional[str]) -> Any:
+            async with self._on_proxy(slot, proxy):
+                return await getattr(slot.client, method)(*args, **kwargs)
+
+        return await self._proxy_pool.run_async(_via)
+
+    @staticmethod
+    @asynccontextmanager
+    async def _on_proxy(slot: _CookieSlot, proxy: Optional[str]) -> AsyncIterator[None]:
+        """
+        Holds the slot on ``proxy`` for one request.
+
+        Requests on the current proxy run concurrently; one that needs another proxy waits until
+        they are done, so a transport is never swapped under a request in flight.
+        """
+        async with slot.proxy_changed:
+            await slot.proxy_changed.wait_for(lambda: slot.proxy == proxy or slot.proxy_users == 0)
+            if slot.proxy != proxy:
+                transport = slot.transports.get(proxy)
+                if transport is None:
+                    transport = slot.transports[proxy] = AsyncHTTPTransport(proxy=proxy)
+                slot.client.http._mounts = {URLPattern('all://'): transport}
+                slot.proxy = proxy
+            slot.proxy_users += 1
         try:
-            user = await self.client.get_user_by_screen_name(screen_name)
-            return self._parse_user(user)
+            yield
+        finally:
+            async with slot.proxy_changed:
+                slot.proxy_users -= 1
+                slot.proxy_changed.notify_all()
+
+    async def aclose(self) -> None:
+        """Closes the clients and every per-proxy transport."""
+        for slot in self._slots:
+            for transport in slot.transports.values():
+                await transport.aclose()
+            slot.transports.clear()
+            await slot.client.http.aclose()
+
+    @staticmethod
+    def _classify_error(e: BaseException) -> Tuple[str, Optional[float]]:
+        if isinstance(e, TooManyRequests):
+            reset = getattr(e, 'rate_limit_reset', None)
+            cooldown = reset - time.time() if reset else RATE_LIMIT_COOLDOWN
+            return TRIP, max(cooldown, 60)
+        if isinstance(e, (Unauthorized, Forbidden, AccountLocked, AccountSuspended)):
+            return TRIP, AUTH_FAILURE_COOLDOWN
+        if isinstance(e, (NotFound, TweetNotAvailable)):
+            # The request went through; the content is simply missing
+            return OK, None
+        return FAILURE, None
+
+    def breaker_ready(self) -> bool:
+        """Whether the platform breaker and at least one cookie breaker would let a call through."""
+        return self._breakers.ready(PLATFORM) and any(s.available for s in self._slots)
+
+    # ---------- persisted client state ----------
+
+    def _restore_state(self) -> None:
+        if not self._state_path or not os.path.exists(self._state_path):
+            return
+        try:
+            with open(self._state_path, 'r', encoding='utf-8') as f:
+                saved = {s.get('fingerprint'): s for s in (json.load(f) or {}).get('slots', [])}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load twikit state {self._state_path}: {e}")
+            return
+        for slot in self._slots:
+            state = saved.get(slot.fingerprint)
+            if not state:
+                continue
+            if state.get('cookies'):
+                slot.client.set_cookies(state['cookies'], clear_cookies=True)
+            transaction = state.get('transaction')
+            if transaction and time.time() - transaction.get('saved_at', 0) < self._transaction_ttl:
+                try:
+                    self._load_transaction(slot, transaction)
+                except Exception as e:
+                    logger.warning(f"Cookie #{slot.index}: saved transaction state unusable: {e}")
+
+    @staticmethod
+    def _load_transaction(slot: _CookieSlot, transaction: Dict[str, Any]) -> None:
+        ct = slot.client.client_transaction
+        ct.home_page_response = bs4.BeautifulSoup(transaction['home_page'], 'lxml')
+        ct.DEFAULT_ROW_INDEX = transaction['row_index']
+        ct.DEFAULT_KEY_BYTES_INDICES = transaction['key_bytes_indices']
+        ct.key = transaction['key']
+        ct.key_bytes = ct.get_key_bytes(key=ct.key)
+        ct.animation_key = transaction['animation_key']
+        slot.transaction_saved_at = transaction['saved_at']
+
+    @staticmethod
+    def _dump_transaction(slot: _CookieSlot) -> Optional[Dict[str, Any]]:
+        ct = slot.client.client_transaction
+        if not ct.home_page_response:
+            return None
+        if not slot.transaction_saved_at:
+            slot.transaction_saved_at = time.time()
+        return {
+            'home_page': str(ct.home_page_response),
+            'row_index': ct.DEFAULT_ROW_INDEX,
+            'key_bytes_indices': ct.DEFAULT_KEY_BYTES_INDICES,
+            'key': ct.key,
+            'animation_key': ct.animation_key,
+            'saved_at': slot.transaction_saved_at,
+        }
+
+    async def save_state(self) -> None:
+        """Writes every cookie's current cookies and transaction state to 'state_path'."""
+        if not self._state_path:
+            return
+        state = {'slots': [
+            {
+                'fingerprint': slot.fingerprint,
+                'cookies': slot.client.get_cookies(),
+                'transaction': self._dump_transaction(slot),
+            }
+            for slot in self._slots if slot.fingerprint
+        ]}
+        try:
+            await write_json(self._state_path, state)
+        except OSError as e:
+            logger.warning(f"Failed to save twikit state {self._state_path}: {e}")
+
+    async def warm_up(self) -> None:
+        """
+        Prepares every cookie's client so the first real request is as fast as any other:
+        initializes (or refreshes an expired) transaction state and opens the pooled
+        connection to x.com, then saves the state.
+        """
+        async def _warm(slot: _CookieSlot) -> None:
+            if self._proxy_pool:
+                async with self._on_proxy(slot, self._proxy_pool.best()):
+                    await _prepare(slot)
+            else:
+                await _prepare(slot)
+
+        async def _prepare(slot: _CookieSlot) -> None:
+            client = slot.client
+            ct = client.client_transaction
+            try:
+                if not ct.home_page_response or time.time() - slot.transaction_saved_at >= self._transaction_ttl:
+                    cookies_backup = client.get_cookies().copy()
+                    headers = {
+                        'Accept-Language': f'{client.language},{client.language.split("-")[0]};q=0.9',
+                        'Cache-Control': 'no-cache',
+                        'Referer': 'https://x.com',
+                        'User-Agent': client._user_agent,
+                    }
+                    await ct.init(client.http, headers)
+                    client.set_cookies(cookies_backup, clear_cookies=True)
+                    slot.transaction_saved_at = time.time()
+                else:
+                    # Transaction state came from disk, only the TLS connection needs opening
+                    await client.http.get('https://x.com/robots.txt', headers={'User-Agent': client._user_agent})
+            except Exception as e:
+                logger.warning(f"Cookie #{slot.index} warm-up failed: {e}")
+
+        await asyncio.gather(*(_warm(slot) for slot in self._slots))
+        await self.save_state()
+
+    def pool_status(self) -> List[Dict[str, Any]]:
+        """Health of every cookie in the pool, for monitoring."""
+        return [s.status() for s in self._slots]
+
+    def _load_user_map(self) -> Dict[str, str]:
+        if not self._user_map_path or not os.path.exists(self._user_map_path):
+            return {}
+        try:
+            with open(self._user_map_path, 'r', encoding='utf-8') as f:
+                return json.load(f) or {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load user map {self._user_map_path}: {e}")
+            return {}
+
+    async def _save_user_map(self) -> None:
+        if not self._user_map_path:
+            return
+        try:
+            await write_json(self._user_map_path, self._user_ids)
+        except OSError as e:
+            logger.warning(f"Failed to save user map {self._user_map_path}: {e}")
+
+    async def _remember_user(self, user_info: Dict) -> None:
+        key = (user_info.get('screen_name') or '').lower()
+        if not key:
+            return
+        self._users.set(key, user_info)
+        if self._user_ids.get(key) != user_info['id']:
+            self._user_ids[key] = user_info['id']
+            await self._save_user_map()
+
+    def cached_user_id(self, screen_name: str) -> Optional[str]:
+        """Known rest_id for a screen_name, without any request."""
+        return self._user_ids.get(screen_name.lower())
+
+    def cached_user(self, screen_name: str) -> Optional[Dict]:
+        """Last fetched profile for a screen_name, possibly older than the TTL."""
+        return self._users.peek(screen_name.lower())
+
+    def is_user_stale(self, screen_name: str) -> bool:
+        return not self._users.is_fresh(screen_name.lower())
+
+    async def get_user_info(self, screen_name: str, force: bool = False) -> Optional[Dict]:
+        if not force:
+            cached = self._users.get(screen_name.lower())
+            if cached:
+                return cached
+        try:
+            user = await self._call('get_user_by_screen_name', screen_name)
+            user_info = self._parse_user(user)
+            await self._remember_user(user_info)
+            return user_info
         except Exception as e:
             logger.error(f"Error fetching user info for {screen_name}: {e}")
             return None
 
-    async def get_user_timeline(self, user_id: str, count: int = 20) -> Dict:
+    async def get_user_id(self, screen_name: str) -> Optional[str]:
+        """Resolves a screen_name to rest_id, requesting the profile only on a map miss."""
+        uid = self.cached_user_id(screen_name)
+        if uid:
+            return uid
+        user_info = await self.get_user_info(screen_name)
+        return user_info['id'] if user_info else None
+
+    async def get_user_timeline(self, user_id: str, count: int = 20, stop_at_id: Optional[str] = None) -> Dict:
+        """
+        Fetches and parses a user's newest tweets.
+
+        Errors propagate (including CircuitOpen and TooManyRequests), so callers can tell
+        a failed fetch from a timeline with nothing new.
+        """
+        tweets_result = await self._call('get_user_tweets', user_id, 'Tweets', count=count)
+        tweets = list(tweets_result)
+        # The timeline carries the owner's profile, refresh the cache for free
+        owner = next((t.user for t in tweets if getattr(t, 'user', None) and t.user.id == user_id), None)
+        if owner:
+            await self._remember_user(self._parse_user(owner))
+        return self._parse_timeline_tweets(tweets, stop_at_id)
+
+    # ---------- lists (owned by the first cookie) ----------
+
+    async def ensure_list(self, name: str, list_id: Optional[str] = None) -> Optional[str]:
+        """Returns ``list_id`` if given, otherwise creates a private list called ``name``."""
+        if list_id:
+            return list_id
         try:
-            tweets_result = await self.client.get_user_tweets(user_id, 'Tweets', count=count)
-            tweets = list(tweets_result)
-            return self._parse_timeline_tweets(tweets)
+            created = await self._call('create_list', name, 'ichika subscriptions', is_private=True, pin_slot=0)
+            logger.info(f"Created private list {name} ({created.id})")
+            return created.id
         except Exception as e:
-            logger.error(f"Error fetching timeline for {user_id}: {e}")
-            return {}
+            logger.error(f"Error creating list {name}: {e}")
+            return None
+
+    async def get_list_member_ids(self, list_id: str) -> List[str]:
+        member_ids: List[str] = []
+        cursor = None
+        while True:
+            members = await self._call('get_list_members', list_id, count=100, cursor=cursor, pin_slot=0)
+            page = [m.id for m in members]
+            member_ids.extend(page)
+            cursor = members.next_cursor
+            if not page or not cursor:
+                return member_ids
 
-    async def get_tweet_detail(self, tweet_id: str) -> tuple[Optional[Dict], Optional[Dict]]:
+    async def sync_list_members(self, list_id: str, user_ids: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Makes the list members exactly ``user_ids``.
+
+        :return: (added, removed) user IDs
+        """
+        wanted = set(user_ids)
+        current = set(await self.get_list_member_ids(list_id))
+        added = sorted(wanted - current)
+        removed = sorted(current - wanted)
+        for uid in added:
+            await self._call('add_list_member', list_id, uid, pin_slot=0)
+        for uid in removed:
+            await self._call('remove_list_member', list_id, uid, pin_slot=0)
+        if added or removed:
+            logger.info(f"List {list_id}: added {len(added)}, removed {len(removed)} members")
+        return added, removed
+
+    async def get_list_timeline(
+        self,
+        list_id: str,
+        count: int = 40,
+        stop_at_id: Optional[str] = None,
+        max_pages: int = 2,
+        include_replies: bool = False,
+    ) -> Dict[str, Dict]:
+        """
+        Fetches the newest tweets of a list's members.
+
+        Pages are followed until a tweet not newer than ``stop_at_id`` shows up or
+        ``max_pages`` is reached. Errors propagate so callers can tell a missing list
+        (NotFound) from an empty result.
+
+        :return: {tweet_id: {'data': parsed tweet, 'user_info': parsed author}}
+        """
+        timeline: Dict[str, Dict] = {}
+        user_cache: Dict[str, Dict] = {}
+        authors: Dict[str, Dict] = {}
+        cursor = None
+        for _ in range(max_pages):
+            tweets = await self._call('get_list_tweets', list_id, count=count, cursor=cursor, pin_slot=0)
+            reached = not tweets
+            for tweet in tweets:
+                if stop_at_id and not snowflake.is_newer(tweet.id, stop_at_id):
+                    reached = True
+                    continue
+                if not include_replies and getattr(tweet, 'in_reply_to', None):
+                    continue
+                parsed = self._parse_tweet(tweet, user_cache=user_cache)
+                if not parsed or not getattr(tweet, 'user', None):
+                    continue
+                author = authors[tweet.user.id] = self._parse_user_cached(tweet.user, user_cache)
+                timeline[parsed['id']] = {'data': parsed, 'user_info': author}
+            cursor = tweets.next_cursor
+            if reached or not stop_at_id or not cursor:
+                break
+        # Authors' profiles come with the tweets, refresh the cache for free
+        for author in authors.values():
+            if author.get('screen_name'):
+                await self._remember_user(author)
+        return timeline
+
+    async def get_tweet_detail(
+        self, tweet_id: str, raise_errors: bool = False
+    ) -> tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Fetches and parses a single tweet.
+
+        :param raise_errors: re-raise transient errors (rate limit, network) instead of
+                             returning (None, None); (None, None) then always means the
+                             tweet is deleted, protected or otherwise unavailable
+        """
         try:
-            tweet = await self.client.get_tweet_by_id(tweet_id)
+            tweet = await self._call('get_tweet_by_id', tweet_id)
             if tweet:
                 return self._parse_tweet(tweet), self._parse_user(tweet.user)
             return None, None
+        except (TweetNotAvailable, NotFound) as e:
+            logger.info(f"Tweet {tweet_id} unavailable: {e}")
+            return None, None
         except KeyError as e:
             logger.warning(f"get_tweet_by_id KeyError ({e}) for {tweet_id}, trying get_tweets_by_ids fallback")
             try:
-                tweets = await self.client.get_tweets_by_ids([tweet_id])
+                tweets = await self._call('get_tweets_by_ids', [tweet_id])
                 if tweets:
                     tweet = tweets[0]
                     return self._parse_tweet(tweet), self._parse_user(tweet.user)
                 return None, None
             except Exception as e2:
+                if raise_errors:
+                    raise
                 logger.error(f"Fallback also failed for {tweet_id}: {e2}")
                 return None, None
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error fetching tweet detail for {tweet_id}: {e}")
             return None, None
 
@@ -87,15 +606,30 @@ class TwikitManager:
             'icon': (user.profile_image_url or '').replace('_normal', '') if getattr(user, 'profile_image_url', None) else None,
         }
 
-    def _parse_timeline_tweets(self, tweets) -> Dict:
+    def _parse_timeline_tweets(self, tweets, stop_at_id: Optional[str] = None) -> Dict:
+        """
+        :param stop_at_id: newest tweet ID already seen; older tweets are skipped without
+                           parsing (skipped rather than stopped at, as a pinned tweet may come first)
+        """
         timeline_data = {}
+        user_cache: Dict[str, Dict] = {}
         for tweet in tweets:
-            parsed = self._parse_tweet(tweet)
+            if stop_at_id and not snowflake.is_newer(tweet.id, stop_at_id):
+                continue
+            parsed = self._parse_tweet(tweet, user_cache=user_cache)
             if parsed and parsed.get('id'):
                 timeline_data[parsed['id']] = parsed
         return timeline_data
 
-    def _parse_tweet(self, tweet, depth=0) -> Optional[Dict]:
+    def _parse_user_cached(self, user, user_cache: Optional[Dict]) -> Dict:
+        if user_cache is None:
+            return self._parse_user(user)
+        parsed = user_cache.get(user.id)
+        if parsed is None:
+            parsed = user_cache[user.id] = self._parse_user(user)
+        return parsed
+
+    def _parse_tweet(self, tweet, depth=0, user_cache: Optional[Dict] = None) -> Optional[Dict]:
         if not tweet or depth > 2:
             return None
 
@@ -106,6 +640,8 @@ class TwikitManager:
             'created_at': tweet.created_at,
             'imgs': [],
             'videos': [],
+            # Every mp4 rendition per video, so senders can pick one that fits their size cap
+            'video_variants': [],
         }
 
         for m in (tweet.media or []):
@@ -123,20 +659,27 @@ class TwikitManager:
                         url = getattr(best, 'url', None)
                         if url:
                             tweet_data['videos'].append(url)
+                        tweet_data['video_variants'].append({
+                            'duration_ms': getattr(m, 'duration_millis', None),
+                            'variants': [
+                                {'url': s.url, 'bitrate': getattr(s, 'bitrate', 0) or 0}
+                                for s in mp4_streams if getattr(s, 'url', None)
+                            ],
+                        })
 
         try:
             retweeted = getattr(tweet, 'retweeted_tweet', None)
             if retweeted and depth < 2:
                 tweet_data['tweet_type'] = 'retweet'
-                rt_parsed = self._parse_tweet(retweeted, depth + 1)
-                rt_user = self._parse_user(retweeted.user) if getattr(retweeted, 'user', None) else {}
+                rt_parsed = self._parse_tweet(retweeted, depth + 1, user_cache)
+                rt_user = self._parse_user_cached(retweeted.user, user_cache) if getattr(retweeted, 'user', None) else {}
                 tweet_data['retweet_data'] = {'user_info': rt_user, 'data': rt_parsed or {}}
             else:
                 quoted = getattr(tweet, 'quote', None)
                 if quoted and depth < 2:
                     tweet_data['tweet_type'] = 'quote'
-                    q_parsed = self._parse_tweet(quoted, depth + 1)
-                    q_user = self._parse_user(quoted.user) if getattr(quoted, 'user', None) else {}
+                    q_parsed = self._parse_tweet(quoted, depth + 1, user_cache)
+                    q_user = self._parse_user_cached(quoted.user, user_cache) if getattr(quoted, 'user', None) else {}
                     tweet_data['quote_data'] = {'user_info': q_user, 'data': q_parsed or {}}
         except Exception as e:
             logger.warning(f"Error parsing nested tweet (depth={depth}): {e}")
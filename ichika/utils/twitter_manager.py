@@ -1,15 +1,36 @@
-import requests
+import asyncio
+import inspect
 import json
 import logging
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, Iterable
+from urllib.parse import parse_qsl, quote
+
+import httpx
+
+from ichika.utils import snowflake
+from ichika.utils.proxy_pool import ProxyPool
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401  httpx needs it for HTTP/2
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'))
+
 
 class TwitterManager:
     """
     A manager for interacting with Twitter's internal GraphQL API.
-    Config dict keys: 'cookie', 'authorization', 'x-csrf-token', optional 'proxy'.
+    Config dict keys: 'cookie', 'authorization', 'x-csrf-token', optional 'proxy'
+    or 'proxy_pool' (a ``ProxyPool`` to route requests through with failover).
+
+    The request methods are coroutines returning ``httpx.Response`` (they used to block and
+    return ``requests.Response``); both expose ``status_code``, ``json()`` and ``raise_for_status()``.
     """
     _USER_FEATURES = {
         "hidden_profile_subscriptions_enabled": True, "profile_label_improvements_pcf_label_in_post_enabled": True,
@@ -48,74 +69,122 @@ class TwitterManager:
     }
     _TWEET_DETAIL_FEATURES = _TIMELINE_FEATURES
 
+    _USER_INFO_URL = 'https://x.com/i/api/graphql/AWbeRIdkLtqTRN7yL_H8yw/UserByScreenName'
+    _USER_TIMELINE_URL = 'https://x.com/i/api/graphql/eApPT8jppbYXlweF_ByTyA/UserTweets'
+    _TWEET_DETAIL_URL = 'https://x.com/i/api/graphql/ooUbmy0T2DmvwfjgARktiQ/TweetDetail'
+
+    # features / fieldToggles never change, so their url-encoded query fragments are built
+    # once per class instead of re-serializing the large dicts on every call
+    _USER_INFO_QS = (
+        f"features={quote(_dumps(_USER_FEATURES))}"
+        f"&fieldToggles={quote(_dumps({'withPayments': False, 'withAuxiliaryUserLabels': True}))}"
+    )
+    _USER_TIMELINE_QS = (
+        f"features={quote(_dumps(_TIMELINE_FEATURES))}"
+        f"&fieldToggles={quote(_dumps({'withArticlePlainText': False}))}"
+    )
+    _TWEET_DETAIL_QS = (
+        f"features={quote(_dumps(_TWEET_DETAIL_FEATURES))}"
+        f"&fieldToggles={quote(_dumps({'withArticleRichContentState': True, 'withArticlePlainText': False, 'withGrokAnalyze': False, 'withDisallowedReplyControls': False}))}"
+    )
+
     def __init__(self, config: Dict[str, str], requests_get_fn: Optional[Callable] = None):
+        """
+        :param config: dict with keys 'cookie', 'authorization', 'x-csrf-token', optional 'proxy'/'proxy_pool'
+        :param requests_get_fn: optional replacement for the HTTP GET, called as before as
+                                fn(url, headers=..., params={...}) with the query as a dict of
+                                strings; a sync fn runs in a worker thread, an async one is awaited
+        """
         self.config = config
         self._requests_get_fn = requests_get_fn
-        self.session = None
-
-        if self._requests_get_fn is None:
-            self.session = requests.Session()
-            self.session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/117.0',
-                'Referer': 'https://x.com/',
-                'x-twitter-auth-type': 'OAuth2Session',
-                'cookie': self.config.get('cookie'),
-                'authorization': self.config.get('authorization'),
-                'x-csrf-token': self.config.get('x-csrf-token')
-            })
-            if self.config.get('proxy'):
-                proxies = {'http': self.config['proxy'], 'https': self.config['proxy']}
-                self.session.proxies.update(proxies)
-
-    def _get(self, url: str, params: Dict) -> requests.Response:
-        if self._requests_get_fn:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/117.0',
-                'Referer': 'https://x.com/',
-                'x-twitter-auth-type': 'OAuth2Session',
-                'cookie': self.config.get('cookie'),
-                'authorization': self.config.get('authorization'),
-                'x-csrf-token': self.config.get('x-csrf-token')
-            }
-            return self._requests_get_fn(url, headers=headers, params=params)
-        return self.session.get(url, params=params)
-
-    def get_user_info(self, user_name: str) -> requests.Response:
-        url = 'https://x.com/i/api/graphql/AWbeRIdkLtqTRN7yL_H8yw/UserByScreenName'
-        params = {
-            'variables': json.dumps({"screen_name": user_name, "withGrokTranslatedBio": False}),
-            'features': json.dumps(self._USER_FEATURES),
-            'fieldToggles': json.dumps({"withPayments": False, "withAuxiliaryUserLabels": True})
-        }
-        return self._get(url, params)
-
-    def get_user_timeline(self, uid: str) -> requests.Response:
-        url = 'https://x.com/i/api/graphql/eApPT8jppbYXlweF_ByTyA/UserTweets'
-        params = {
-            'variables': json.dumps({
-                "userId": uid, "count": 20, "includePromotedContent": True,
-                "withQuickPromoteEligibilityTweetFields": True, "withVoice": True
-            }),
-            'features': json.dumps(self._TIMELINE_FEATURES),
-            'fieldToggles': json.dumps({"withArticlePlainText": False})
-        }
-        return self._get(url, params)
-
-    def get_tweet_detail(self, tid: str) -> requests.Response:
-        url = 'https://x.com/i/api/graphql/ooUbmy0T2DmvwfjgARktiQ/TweetDetail'
-        params = {
-            'variables': json.dumps({
-                "focalTweetId": tid, "referrer": "profile", "with_rux_injections": False, "rankingMode": "Relevance",
-                "includePromotedContent": True, "withCommunity": True,
-                "withQuickPromoteEligibilityTweetFields": True, "withBirdwatchNotes": True, "withVoice": True
-            }),
-            'features': json.dumps(self._TWEET_DETAIL_FEATURES),
-            'fieldToggles': json.dumps({
-                "withArticleRichContentState": True, "withArticlePlainText": False,
-                "withGrokAnalyze": False, "withDisallowedReplyControls": False
-            })
+        self._headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/117.0',
+            'Referer': 'https://x.com/',
+            'x-twitter-auth-type': 'OAuth2Session',
+            'cookie': self.config.get('cookie') or '',
+            'authorization': self.config.get('authorization') or '',
+            'x-csrf-token': self.config.get('x-csrf-token') or '',
         }
-        return self._get(url, params)
+        self.session: Optional[httpx.AsyncClient] = None
+        self._proxy_pool: Optional[ProxyPool] = self.config.get('proxy_pool')
+        # One client per proxy of the pool, created on first use
+        self._sessions: Dict[Optional[str], httpx.AsyncClient] = {}
+
+        if self._requests_get_fn is None and self._proxy_pool is None:
+            self.session = self._new_session(self.config.get('proxy') or None)
+
+    def _new_session(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        # One pooled client: requests share TCP/TLS connections (multiplexed over HTTP/2 when h2 is installed)
+        return httpx.AsyncClient(
+            headers=self._headers,
+            proxy=proxy,
+            http2=_HTTP2,
+            timeout=20,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+
+    def _session_for(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        session = self._sessions.get(proxy)
+        if session is None:
+            session = self._sessions[proxy] = self._new_session(proxy)
+        return session
+
+    async def aclose(self) -> None:
+        if self.session is not None:
+            await self.session.aclose()
+        for session in self._sessions.values():
+            await session.aclose()
+        self._sessions.clear()
+
+    async def _get(self, url: str) -> httpx.Response:
+        if self._requests_get_fn:
+            fn = self._requests_get_fn
+            base, _, query = url.partition('?')
+            kwargs = {'headers': dict(self._headers), 'params': dict(parse_qsl(query))}
+            if inspect.iscoroutinefunction(fn):
+                return await fn(base, **kwargs)
+            result = await asyncio.to_thread(fn, base, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        if self._proxy_pool is not None:
+            return await self._proxy_pool.run_async(lambda proxy: self._session_for(proxy).get(url))
+        return await self.session.get(url)
+
+    async def get_user_info(self, user_name: str) -> httpx.Response:
+        variables = quote(_dumps({"screen_name": user_name, "withGrokTranslatedBio": False}))
+        return await self._get(f"{self._USER_INFO_URL}?variables={variables}&{self._USER_INFO_QS}")
+
+    async def get_user_timeline(self, uid: str) -> httpx.Response:
+        variables = quote(_dumps({
+            "userId": uid, "count": 20, "includePromotedContent": True,
+            "withQuickPromoteEligibilityTweetFields": True, "withVoice": True
+        }))
+        return await self._get(f"{self._USER_TIMELINE_URL}?variables={variables}&{self._USER_TIMELINE_QS}")
+
+    async def get_user_timelines(self, uids: Iterable[str]) -> Dict[str, httpx.Response]:
+        """
+        Fetches several user timelines concurrently over the shared connection pool.
+
+        :return: uid -> response for every request that completed; failures are logged and skipped
+        """
+        uids = list(dict.fromkeys(uids))
+        results = await asyncio.gather(*(self.get_user_timeline(uid) for uid in uids), return_exceptions=True)
+        responses = {}
+        for uid, result in zip(uids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch timeline for {uid}: {result}")
+                continue
+            responses[uid] = result
+        return responses
+
+    async def get_tweet_detail(self, tid: str) -> httpx.Response:
+        variables = quote(_dumps({
+            "focalTweetId": tid, "referrer": "profile", "with_rux_injections": False, "rankingMode": "Relevance",
+            "includePromotedContent": True, "withCommunity": True,
+            "withQuickPromoteEligibilityTweetFields": True, "withBirdwatchNotes": True, "withVoice": True
+        }))
+        return await self._get(f"{self._TWEET_DETAIL_URL}?variables={variables}&{self._TWEET_DETAIL_QS}")
 
     @staticmethod
     def parse_user_info(user_info: Dict) -> Optional[Dict]:
@@ -132,6 +201,7 @@ class TwitterManager:
         return {
             'id': user_result.get('rest_id'),
             'name': core.get('name') or legacy.get('name'),
+            'screen_name': core.get('screen_name') or legacy.get('screen_name'),
             'location': user_result.get('location', {}).get('location', '') or legacy.get('location', ''),
             'description': legacy.get('description'),
             'followers_count': legacy.get('followers_count'),
@@ -140,7 +210,26 @@ class TwitterManager:
         }
 
     @staticmethod
-    def parse_timeline(timeline: Dict) -> Optional[Dict]:
+    def _parse_user_cached(user_result: Dict, user_cache: Optional[Dict]) -> Dict:
+        """parse_user_result memoized by rest_id within one response (the parsed dict is shared)."""
+        if user_cache is None:
+            return TwitterManager.parse_user_result(user_result)
+        key = user_result.get('rest_id')
+        parsed = user_cache.get(key)
+        if parsed is None:
+            parsed = TwitterManager.parse_user_result(user_result)
+            if key:
+                user_cache[key] = parsed
+        return parsed
+
+    @staticmethod
+    def parse_timeline(timeline: Dict, stop_at_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Parses a UserTweets response into {entryId: tweet_data}.
+
+        :param stop_at_id: newest tweet ID already seen; entries are newest-first, so
+                           parsing stops at the first tweet that is not newer than it
+        """
         if not isinstance(timeline, dict):
             return None
         if 'errors' in timeline:
@@ -189,9 +278,14 @@ class TwitterManager:
 
         entries = entries_source.get('entries') or []
         timeline_data = {}
+        # Most entries of a user timeline share the same author
+        user_cache: Dict[str, Dict] = {}
         for entry in entries:
+            entry_id = entry.get('entryId') or ''
+            if stop_at_id and entry_id.startswith('tweet-') and not snowflake.is_newer(entry_id[6:], stop_at_id):
+                break
             try:
-                dparsed = TwitterManager.parse_twit_data_one(entry)
+                dparsed = TwitterManager.parse_twit_data_one(entry, user_cache)
                 if dparsed and len(dparsed) >= 3 and dparsed[2] is not None:
                     timeline_data[dparsed[0]] = dparsed[2]
             except Exception as e:
@@ -200,7 +294,7 @@ class TwitterManager:
         return timeline_data
 
     @staticmethod
-    def parse_twit_data_one(data: Dict) -> Optional[tuple]:
+    def parse_twit_data_one(data: Dict, user_cache: Optional[Dict] = None) -> Optional[tuple]:
         tweet_id = data.get('entryId')
         if not tweet_id or not tweet_id.startswith('tweet-'):
             return None
@@ -227,8 +321,8 @@ class TwitterManager:
         if not legacy or not user_result:
             return None
 
-        tweet_data = TwitterManager.parse_legacy(legacy)
-        user_info = TwitterManager.parse_user_result(user_result)
+        tweet_data = TwitterManager.parse_legacy(legacy, user_cache)
+        user_info = TwitterManager._parse_user_cached(user_result, user_cache)
         return tweet_id, entry_type, tweet_data, user_info
 
     @staticmethod
@@ -236,29 +330,32 @@ class TwitterManager:
         return result.get('tweet') if result and result.get('__typename') == 'TweetWithVisibilityResults' else result
 
     @staticmethod
-    def parse_legacy(legacy: Dict) -> Dict:
+    def parse_legacy(legacy: Dict, user_cache: Optional[Dict] = None) -> Dict:
         tweet_data = {'tweet_type': 'default'}
         if 'quoted_status_result' in legacy:
             tweet_data['tweet_type'] = 'quote'
             sub_result = TwitterManager.get_tweet_result(legacy['quoted_status_result'].get('result', {}))
             if sub_result:
                 tweet_data['quote_data'] = {
-                    'user_info': TwitterManager.parse_user_result(
-                        sub_result.get('core', {}).get('user_results', {}).get('result', {})),
-                    'data': TwitterManager.parse_legacy(sub_result.get('legacy', {}))
+                    'user_info': TwitterManager._parse_user_cached(
+                        sub_result.get('core', {}).get('user_results', {}).get('result', {}), user_cache),
+                    'data': TwitterManager.parse_legacy(sub_result.get('legacy', {}), user_cache)
                 }
         elif 'retweeted_status_result' in legacy:
             tweet_data['tweet_type'] = 'retweet'
             sub_result = TwitterManager.get_tweet_result(legacy['retweeted_status_result'].get('result', {}))
             if sub_result:
                 tweet_data['retweet_data'] = {
-                    'user_info': TwitterManager.parse_user_result(
-                        sub_result.get('core', {}).get('user_results', {}).get('result', {})),
-                    'data': TwitterManager.parse_legacy(sub_result.get('legacy', {}))
+                    'user_info': TwitterManager._parse_user_cached(
+                        sub_result.get('core', {}).get('user_results', {}).get('result', {}), user_cache),
+                    'data': TwitterManager.parse_legacy(sub_result.get('legacy', {}), user_cache)
                 }
 
         tweet_data['text'] = legacy.get('full_text')
-        tweet_data['id'] = legacy.get('conversation_id_str')
+        # 'id' keeps its original meaning (the thread root, equal to the tweet's own ID except
+        # for replies) since stored last-seen IDs and callers rely on it; 'tweet_id' is the tweet's own
+        tweet_data['id'] = legacy.get('conversation_id_str') or legacy.get('id_str')
+        tweet_data['tweet_id'] = legacy.get('id_str') or tweet_data['id']
         tweet_data['created_at'] = legacy.get('created_at')
         media = legacy.get('extended_entities', {}).get('media', [])
         tweet_data['imgs'] = [m['media_url_https'] for m in media if m.get('type') == 'photo']
@@ -266,14 +363,30 @@ class TwitterManager:
             r['url'] for m in media if m.get('type') == 'video' and m.get('video_info', {}).get('variants')
             for r in m['video_info']['variants'] if r.get('content_type') == 'video/mp4'
         ]
+        tweet_data['video_variants'] = [
+            {
+                'duration_ms': m['video_info'].get('duration_millis'),
+                'variants': [
+                    {'url': r['url'], 'bitrate': r.get('bitrate', 0)}
+                    for r in m['video_info']['variants'] if r.get('content_type') == 'video/mp4'
+                ],
+            }
+            for m in media if m.get('type') in ('video', 'animated_gif') and m.get('video_info', {}).get('variants')
+        ]
         return tweet_data
 
     @staticmethod
-    def parse_tweet_detail(tweet_detail: Dict) -> tuple:
+    def parse_tweet_detail(tweet_detail: Dict, tweet_id: Optional[str] = None) -> tuple:
+        """
+        :param tweet_id: focal tweet to pick from the conversation; without it the last entry is used
+        """
         instructions = tweet_detail.get('data', {}).get(
             'threaded_conversation_with_injections_v2', {}).get('instructions', [])
-        entry = next((e for i in instructions if i.get('type') == 'TimelineAddEntries'
-                      for e in reversed(i.get('entries', []))), None)
+        entries = [e for i in instructions if i.get('type') == 'TimelineAddEntries' for e in i.get('entries', [])]
+        if tweet_id:
+            entry = next((e for e in entries if e.get('entryId') == f'tweet-{tweet_id}'), None)
+        else:
+            entry = entries[-1] if entries else None
         if entry:
             dparsed = TwitterManager.parse_twit_data_one(entry)
             if dparsed and dparsed[2] is not None:
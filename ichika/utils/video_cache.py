@@ -0,0 +1,285 @@
+"""
+推送视频的下载管线
+按大小上限挑选清晰度（码率 × 时长估算），流式下载到本地缓存后以视频消息段发送：
+- 下载先写 .part 文件，中断后用 Range 请求续传，不必从头再下
+- 全局并发上限，一批视频推文不会同时占满带宽
+- 磁盘配额，超出时按最近使用时间淘汰已完成的视频
+配置项（.env.prod）：
+  VIDEO_MAX_MB=50                       (可选，单个视频大小上限，超过则只推送文字和图片)
+  VIDEO_CACHE_DIR=                      (可选，缓存目录，默认 resources/video_cache)
+  VIDEO_CACHE_MAX_MB=2048               (可选，视频缓存磁盘配额)
+  VIDEO_CONCURRENCY=2                   (可选，同时下载的视频数)
+  MEDIA_SEND_BASE64=false               (见 media_cache.py，同样适用于视频)
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import httpx
+from nonebot.adapters.onebot.v11 import MessageSegment
+
+from ichika.config import get as cfg_get, get_bool as cfg_get_bool, get_int as cfg_get_int
+from ichika.utils.proxy_pool import ProxyLike, ProxyPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "resources" / "video_cache"
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/117.0'
+_CHUNK_SIZE = 256 * 1024
+# 超过这个时间没有续传的 .part 文件视为废弃
+_PART_TTL = 24 * 3600
+
+
+class VideoTooLarge(Exception):
+    pass
+
+
+def estimate_size(variant: dict, duration_ms: Optional[int]) -> Optional[int]:
+    """码率（bit/s）× 时长估算文件大小（字节），信息不全时返回 None"""
+    bitrate = variant.get("bitrate")
+    if bitrate is None or not duration_ms:
+        return None
+    return int(bitrate * duration_ms / 1000 / 8)
+
+
+def choose_variant(variants: list[dict], duration_ms: Optional[int], max_bytes: int) -> Optional[dict]:
+    """
+    挑选不超过 max_bytes 的最高码率 mp4
+    时长未知时无法估算，取最低码率的一个，由下载时的大小检查兜底
+    """
+    mp4 = [v for v in variants if v.get("url") and v.get("content_type", "video/mp4") == "video/mp4"]
+    if not mp4:
+        return None
+    if not duration_ms:
+        return min(mp4, key=lambda v: v.get("bitrate") or 0)
+    fits = [v for v in mp4 if (estimate_size(v, duration_ms) or 0) <= max_bytes]
+    if not fits:
+        return None
+    return max(fits, key=lambda v: v.get("bitrate") or 0)
+
+
+class VideoCache:
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int,
+        max_file_bytes: int,
+        concurrency: int = 2,
+        retries: int = 2,
+        timeout: float = 30,
+    ):
+        """
+        :param cache_dir: 缓存目录
+        :param max_bytes: 缓存总大小上限（字节，含未完成的 .part）
+        :param max_file_bytes: 单个视频大小上限（字节）
+        :param concurrency: 同时下载的视频数
+        :param retries: 单次 fetch 内断线续传的次数
+        :param timeout: 连接/读取超时（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.retries = retries
+        self.timeout = timeout
+        self._sem = asyncio.Semaphore(concurrency)
+        self._clients: dict[Optional[str], httpx.AsyncClient] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._store_lock = asyncio.Lock()
+        # 正在下载的文件及其预留的空间，淘汰时跳过
+        self._reserved: dict[Path, int] = {}
+        self._total = sum(p.stat().st_size for p in self.cache_dir.iterdir() if p.is_file())
+
+    def _client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        client = self._clients.get(proxy)
+        if client is None:
+            client = httpx.AsyncClient(
+                proxy=proxy or None, timeout=self.timeout, follow_redirects=True,
+                headers={'User-Agent': _USER_AGENT},
+            )
+            self._clients[proxy] = client
+        return client
+
+    def _path(self, url: str) -> Path:
+        # 视频按 URL 缓存（流式下载拿不到完整内容的哈希），同一清晰度的 URL 是稳定的
+        return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.mp4"
+
+    async def fetch(self, url: str, proxy: ProxyLike = None) -> Optional[Path]:
+        """下载（或命中缓存）并返回本地文件路径，超限或失败返回 None"""
+        path = self._path(url)
+        if path.exists():
+            os.utime(path)
+            return path
+
+        future = self._inflight.get(url)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            async with self._sem:
+                await self._download(url, path, proxy)
+            future.set_result(path)
+            return path
+        except VideoTooLarge as e:
+            logger.info(f"video cache skip {url}: {e}")
+            future.set_result(None)
+            return None
+        except Exception as e:
+            logger.warning(f"video cache download failed {url}: {e}")
+            future.set_result(None)
+            return None
+        finally:
+            # 被取消时也要结束 future，否则等待同一下载的其他请求会一直挂起
+            if not future.done():
+                future.set_result(None)
+            self._inflight.pop(url, None)
+
+    async def _download(self, url: str, path: Path, proxy: ProxyLike) -> None:
+        part = path.with_name(path.name + ".part")
+        pool = proxy if isinstance(proxy, ProxyPool) else None
+        try:
+            for attempt in range(self.retries + 1):
+                # 使用代理池时每次续传都选当前最快的代理，断线的代理会被降级
+                current = pool.best() if pool else proxy
+                try:
+                    await self._download_once(url, part, current)
+                    if pool:
+                        pool.report(current, True)
+                    break
+                except httpx.TransportError as e:
+                    if pool:
+                        pool.report(current, False)
+                    if attempt >= self.retries:
+                        raise
+                    logger.info(f"video download interrupted {url}: {e}, resuming")
+                    await asyncio.sleep(2 ** attempt)
+            os.replace(part, path)
+        except VideoTooLarge:
+            size = part.stat().st_size if part.exists() else 0
+            await self._settle(part, size)
+            part.unlink(missing_ok=True)
+            self._total -= size
+            raise
+        except Exception:
+            # 保留 .part 供下次续传，配额按实际已下载的大小计
+            await self._settle(part, part.stat().st_size if part.exists() else 0)
+            raise
+        finally:
+            self._reserved.pop(part, None)
+
+    async def _download_once(self, url: str, part: Path, proxy: Optional[str]) -> None:
+        on_disk = offset = part.stat().st_size if part.exists() else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        async with self._client(proxy).stream('GET', url, headers=headers) as resp:
+            if resp.status_code == 416 and offset:
+                # 已经下载完整，只是上次没来得及改名
+                return
+            resp.raise_for_status()
+            if offset and resp.status_code != 206:
+                # 服务端不支持 Range，从头下载
+                offset = 0
+            length = resp.headers.get('content-length')
+            expected = offset + int(length) if length and length.isdigit() else self.max_file_bytes
+            if expected > self.max_file_bytes:
+                raise VideoTooLarge(f"{expected // 1024 // 1024}MB exceeds {self.max_file_bytes // 1024 // 1024}MB")
+            await self._reserve(part, expected, on_disk)
+
+            written = offset
+            async with aiofiles.open(part, 'ab' if offset else 'wb') as f:
+                async for chunk in resp.aiter_bytes(_CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > self.max_file_bytes:
+                        raise VideoTooLarge(f"exceeds {self.max_file_bytes // 1024 // 1024}MB while streaming")
+                    await f.write(chunk)
+        await self._settle(part, written)
+
+    async def _reserve(self, part: Path, expected: int, on_disk: int) -> None:
+        """为即将下载的文件预留配额，不够时淘汰旧视频；仍然不够则放弃"""
+        async with self._store_lock:
+            previous = self._reserved.get(part, on_disk)
+            self._total += expected - previous
+            self._reserved[part] = expected
+            await asyncio.to_thread(self._evict)
+            if self._total > self.max_bytes:
+                self._total -= expected - on_disk
+                self._reserved.pop(part, None)
+                raise VideoTooLarge("video cache quota exhausted")
+
+    async def _settle(self, part: Path, size: int) -> None:
+        """下载结束后按实际大小修正预留量"""
+        async with self._store_lock:
+            self._total += size - self._reserved.get(part, size)
+            self._reserved[part] = size
+
+    def _evict(self) -> None:
+        if self._total <= self.max_bytes:
+            return
+        now = time.time()
+        files = sorted(
+            (
+                p for p in self.cache_dir.iterdir()
+                if p.is_file() and p not in self._reserved
+                and (p.suffix != ".part" or now - p.stat().st_mtime > _PART_TTL)
+            ),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for p in files:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                size = p.stat().st_size
+                p.unlink()
+                self._total -= size
+            except OSError:
+                continue
+
+    async def video_segment(self, url: str, proxy: ProxyLike = None, as_base64: bool = False) -> Optional[MessageSegment]:
+        """构建视频消息段；超限或下载失败返回 None"""
+        path = await self.fetch(url, proxy)
+        if path is None:
+            return None
+        if as_base64:
+            data = await asyncio.to_thread(path.read_bytes)
+            return MessageSegment.video(f"base64://{base64.b64encode(data).decode()}")
+        return MessageSegment.video(path)
+
+
+_cache: Optional[VideoCache] = None
+
+
+def get_video_cache() -> VideoCache:
+    global _cache
+    if _cache is None:
+        _cache = VideoCache(
+            cache_dir=Path(cfg_get("video.cache_dir") or DEFAULT_CACHE_DIR),
+            max_bytes=cfg_get_int("video.cache_max_mb", 2048) * 1024 * 1024,
+            max_file_bytes=cfg_get_int("video.max_mb", 50) * 1024 * 1024,
+            concurrency=cfg_get_int("video.concurrency", 2),
+        )
+    return _cache
+
+
+async def video_segments(videos: list[dict], proxy: ProxyLike = None, limit: int = 2) -> list[MessageSegment]:
+    """
+    把解析出的视频（{'duration_ms', 'variants': [{'url', 'bitrate'}]}）转成消息段
+    放不下大小上限的视频直接跳过
+    """
+    cache = get_video_cache()
+    as_base64 = cfg_get_bool("media.send_base64")
+    urls = []
+    for video in videos:
+        variant = choose_variant(video.get("variants", []), video.get("duration_ms"), cache.max_file_bytes)
+        if variant:
+            urls.append(variant["url"])
+        if len(urls) >= limit:
+            break
+    segments = await asyncio.gather(*(cache.video_segment(u, proxy, as_base64) for u in urls))
+    return [seg for seg in segments if seg is not None]
@@ -1,6 +1,13 @@
 import requests
+import httpx
 import logging
-from typing import Optional, Dict, Any, List
+import re
+from typing import Optional, Dict, Any, List, AsyncIterator, Mapping
+
+from ichika.utils import snowflake
+from ichika.utils.api_budget import BudgetExceeded, BudgetLedger, Priority  # noqa: F401  re-exported for callers
+from ichika.utils.proxy_pool import ProxyPool
+from ichika.utils.snowflake import SnowflakeLike
 
 logger = logging.getLogger(__name__)
 
@@ -11,17 +18,30 @@ class XAPIManager:
     
     This class provides methods to fetch user information and tweets using the official API.
     It requires an API Bearer Token for authentication.
+    
+    Every request goes through a BudgetLedger (``self.budget``) tracking the rate-limit
+    headers and the monthly post cap; background requests that would eat into the
+    interactive reserve raise BudgetExceeded instead of being sent.
     """
     
     # X API v2 base URL
     BASE_URL = "https://api.twitter.com/2"
+    # Max IDs / usernames per batch lookup request
+    MAX_BATCH_SIZE = 100
+    # Posts that may be read per month on each tier
+    MONTHLY_POST_CAPS = {'free': 100, 'basic': 15000, 'pro': 1000000, 'enterprise': 50000000}
     
     def __init__(self, config: Dict[str, str]):
         """
         Initializes the XAPIManager.
 
-        :param config: dict with keys: 'bearer_token', optional 'proxy', 'api_tier'.
+        :param config: dict with keys: 'bearer_token', optional 'proxy' or 'proxy_pool', 'api_tier',
+                       'monthly_cap', 'budget_reserve', 'budget_path'.
+                       proxy_pool: a ProxyPool; requests use its fastest healthy proxy and fail over
                        api_tier options: 'free', 'basic', 'pro' (default: 'free')
+                       monthly_cap: posts per month, defaults to the tier's cap
+                       budget_reserve: share of every limit kept for interactive requests (default 0.2)
+                       budget_path: JSON file persisting this month's usage
         """
         self.config = config
         
@@ -34,9 +54,22 @@ class XAPIManager:
             'User-Agent': 'v2UserLookupPython'
         })
         
-        if self.config.get('proxy'):
+        self._proxy_pool: Optional[ProxyPool] = self.config.get('proxy_pool')
+        if self.config.get('proxy') and self._proxy_pool is None:
             proxies = {'http': self.config['proxy'], 'https': self.config['proxy']}
             self.session.proxies.update(proxies)
+        
+        # Async clients for the streaming paginators (one per proxy), created on first use
+        self._async_sessions: Dict[Optional[str], httpx.AsyncClient] = {}
+        
+        # 'kind:user_id' -> newest Tweet ID streamed; kept in memory, callers persist it with their own state
+        self._cursors: Dict[str, str] = {}
+        
+        self.budget = BudgetLedger(
+            monthly_cap=int(self.config.get('monthly_cap') or self.MONTHLY_POST_CAPS.get(self.api_tier, 100)),
+            reserve=float(self.config.get('budget_reserve') or 0.2),
+            path=self.config.get('budget_path'),
+        )
     
     def _get_user_fields(self) -> str:
         """
@@ -52,17 +85,81 @@ class XAPIManager:
             # Free tier - basic fields only
             return base_fields
     
-    def _get(self, endpoint: str, params: Optional[Dict] = None) -> requests.Response:
+    @staticmethod
+    def _budget_key(endpoint: str) -> str:
+        """Endpoint with IDs / usernames replaced, as rate-limit windows are per endpoint."""
+        if endpoint.startswith('users/by/username/'):
+            return 'users/by/username/:username'
+        return re.sub(r'/\d+(?=/|$)', '/:id', endpoint)
+    
+    def _account(self, key: str, status_code: int, headers: Mapping[str, str], body: Any) -> None:
+        """Record a response in the budget ledger."""
+        posts = 0
+        if status_code == 200 and (key.startswith('tweets') or key.endswith(('/tweets', '/mentions'))):
+            data = body.get('data') if isinstance(body, dict) else None
+            posts = len(data) if isinstance(data, list) else int(bool(data))
+        self.budget.record(key, headers, posts)
+    
+    def _get(
+        self, endpoint: str, params: Optional[Dict] = None, priority: Priority = Priority.INTERACTIVE
+    ) -> requests.Response:
         """Internal method to perform GET requests."""
+        key = self._budget_key(endpoint)
+        self.budget.check(key, priority)
         url = f"{self.BASE_URL}/{endpoint}"
         try:
-            response = self.session.get(url, params=params)
+            if self._proxy_pool is not None:
+                response = self._proxy_pool.run_sync(
+                    lambda proxy: self.session.get(url, params=params, proxies={'http': proxy, 'https': proxy})
+                )
+            else:
+                response = self.session.get(url, params=params)
+            self._account(key, response.status_code, response.headers,
+                          response.json() if response.status_code == 200 else None)
             response.raise_for_status()
             return response
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
             raise
     
+    async def _aget(
+        self, endpoint: str, params: Optional[Dict] = None, priority: Priority = Priority.INTERACTIVE
+    ) -> httpx.Response:
+        """Async counterpart of _get."""
+        key = self._budget_key(endpoint)
+        self.budget.check(key, priority)
+        url = f"{self.BASE_URL}/{endpoint}"
+        try:
+            if self._proxy_pool is not None:
+                response = await self._proxy_pool.run_async(
+                    lambda proxy: self._async_session(proxy).get(url, params=params)
+                )
+            else:
+                response = await self._async_session(self.config.get('proxy') or None).get(url, params=params)
+            self._account(key, response.status_code, response.headers,
+                          response.json() if response.status_code == 200 else None)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError as e:
+            logger.error(f"API request failed: {e}")
+            raise
+    
+    def _async_session(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        session = self._async_sessions.get(proxy)
+        if session is None:
+            session = self._async_sessions[proxy] = httpx.AsyncClient(
+                headers=dict(self.session.headers),
+                proxy=proxy,
+                timeout=20,
+            )
+        return session
+    
+    async def aclose(self) -> None:
+        await self.budget.flush()
+        for session in self._async_sessions.values():
+            await session.aclose()
+        self._async_sessions.clear()
+    
     # ------------------------ API Methods ------------------------
     
     def get_user_by_username(self, username: str) -> requests.Response:
@@ -91,16 +188,95 @@ class XAPIManager:
         }
         return self._get(endpoint, params)
     
+    def get_users_by_usernames(
+        self, usernames: List[str], priority: Priority = Priority.INTERACTIVE
+    ) -> requests.Response:
+        """
+        Get multiple users by username in one request (up to 100).
+
+        :param usernames: List of Twitter usernames (without @, max 100)
+        :param priority: Budget priority of the request
+        :return: Response object
+        """
+        if len(usernames) > self.MAX_BATCH_SIZE:
+            logger.warning(f"Too many usernames provided ({len(usernames)}). Only first {self.MAX_BATCH_SIZE} will be used.")
+            usernames = usernames[:self.MAX_BATCH_SIZE]
+
+        endpoint = "users/by"
+        params = {
+            'usernames': ','.join(u.lstrip('@') for u in usernames),
+            'user.fields': self._get_user_fields()
+        }
+        return self._get(endpoint, params, priority)
+
+    def get_users_by_ids(
+        self, user_ids: List[str], priority: Priority = Priority.INTERACTIVE
+    ) -> requests.Response:
+        """
+        Get multiple users by user ID in one request (up to 100).
+
+        :param user_ids: List of Twitter user IDs (max 100)
+        :param priority: Budget priority of the request
+        :return: Response object
+        """
+        if len(user_ids) > self.MAX_BATCH_SIZE:
+            logger.warning(f"Too many user IDs provided ({len(user_ids)}). Only first {self.MAX_BATCH_SIZE} will be used.")
+            user_ids = user_ids[:self.MAX_BATCH_SIZE]
+
+        endpoint = "users"
+        params = {
+            'ids': ','.join(str(i) for i in user_ids),
+            'user.fields': self._get_user_fields()
+        }
+        return self._get(endpoint, params, priority)
+
+    def lookup_users_by_usernames(
+        self, usernames: List[str], priority: Priority = Priority.BACKGROUND
+    ) -> Dict[str, Dict]:
+        """
+        Look up any number of users by username, 100 per request.
+
+        :param usernames: Twitter usernames (without @)
+        :param priority: Budget priority of the requests
+        :return: {lowercased username: parsed user}; users that were not found are left out
+        """
+        users = {}
+        for chunk in self._chunks(list(dict.fromkeys(u.lstrip('@').lower() for u in usernames))):
+            for user in self.parse_users(self.get_users_by_usernames(chunk, priority).json()):
+                users[(user['username'] or '').lower()] = user
+        return users
+
+    def lookup_users_by_ids(
+        self, user_ids: List[str], priority: Priority = Priority.BACKGROUND
+    ) -> Dict[str, Dict]:
+        """
+        Look up any number of users by user ID, 100 per request.
+
+        :param user_ids: Twitter user IDs
+        :param priority: Budget priority of the requests
+        :return: {user ID: parsed user}; users that were not found are left out
+        """
+        users = {}
+        for chunk in self._chunks(list(dict.fromkeys(str(i) for i in user_ids))):
+            for user in self.parse_users(self.get_users_by_ids(chunk, priority).json()):
+                users[user['id']] = user
+        return users
+
+    @classmethod
+    def _chunks(cls, items: List[str]) -> List[List[str]]:
+        return [items[i:i + cls.MAX_BATCH_SIZE] for i in range(0, len(items), cls.MAX_BATCH_SIZE)]
+
     def get_user_tweets(
         self, 
         user_id: str, 
         max_results: int = 10,
-        since_id: Optional[str] = None,
-        until_id: Optional[str] = None,
+        since_id: Optional[SnowflakeLike] = None,
+        until_id: Optional[SnowflakeLike] = None,
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
         exclude: Optional[str] = None,
-        pagination_token: Optional[str] = None
+        pagination_token: Optional[str] = None,
+        priority: Priority = Priority.BACKGROUND
     ) -> requests.Response:
         """
         Get tweets from a specific user.
@@ -113,10 +289,15 @@ class XAPIManager:
         :param end_time: YYYY-MM-DDTHH:mm:ssZ format. The latest UTC timestamp
         :param exclude: Comma-separated list of types to exclude (e.g., 'retweets,replies')
         :param pagination_token: Token to get the next page of results
+        :param priority: Budget priority; timeline polling is background by default
         :return: Response object
         """
         endpoint = f"users/{user_id}/tweets"
-        
+        params = self._user_tweets_params(max_results, exclude)
+        self._add_range_params(params, since_id, until_id, start_time, end_time, pagination_token)
+        return self._get(endpoint, params, priority)
+    
+    def _user_tweets_params(self, max_results: int, exclude: Optional[str] = None) -> Dict[str, Any]:
         # Base tweet fields (available in all tiers)
         tweet_fields = 'id,text,created_at,author_id,public_metrics,attachments,entities'
         if self.api_tier in ['basic', 'pro', 'enterprise']:
@@ -125,7 +306,7 @@ class XAPIManager:
         params = {
             'max_results': min(max_results, 100),
             'tweet.fields': tweet_fields,
-            'media.fields': 'url,preview_image_url,type,media_key',
+            'media.fields': 'url,preview_image_url,type,media_key,variants',
             'user.fields': 'id,name,username,profile_image_url',
             'expansions': 'attachments.media_keys,author_id'
         }
@@ -135,21 +316,30 @@ class XAPIManager:
             params['media.fields'] += ',duration_ms,height,width'
             params['expansions'] += ',referenced_tweets.id'
         
-        # Add optional parameters if provided
+        if exclude:
+            params['exclude'] = exclude
+        return params
+    
+    @staticmethod
+    def _add_range_params(
+        params: Dict[str, Any],
+        since_id: Optional[SnowflakeLike] = None,
+        until_id: Optional[SnowflakeLike] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        pagination_token: Optional[str] = None
+    ) -> None:
+        """Add the optional timeline range / pagination parameters that were provided."""
         if since_id:
-            params['since_id'] = since_id
+            params['since_id'] = str(snowflake.to_int(since_id))
         if until_id:
-            params['until_id'] = until_id
+            params['until_id'] = str(snowflake.to_int(until_id))
         if start_time:
             params['start_time'] = start_time
         if end_time:
             params['end_time'] = end_time
-        if exclude:
-            params['exclude'] = exclude
         if pagination_token:
             params['pagination_token'] = pagination_token
-        
-        return self._get(endpoint, params)
     
     def get_tweet(self, tweet_id: str) -> requests.Response:
         """
@@ -158,11 +348,21 @@ class XAPIManager:
         :param tweet_id: The Tweet ID
         :return: Response object
         """
-        endpoint = f"tweets/{tweet_id}"
+        return self._get(f"tweets/{tweet_id}", self._tweet_params())
+    
+    async def aget_tweet(self, tweet_id: str) -> httpx.Response:
+        """
+        Async counterpart of get_tweet.
         
+        Unlike get_tweet in a worker thread it can be cancelled; a request cancelled before
+        its response arrives is not recorded in the budget ledger.
+        """
+        return await self._aget(f"tweets/{tweet_id}", self._tweet_params())
+    
+    def _tweet_params(self) -> Dict[str, Any]:
         # Base fields for free tier
         tweet_fields = 'id,text,created_at,author_id,public_metrics,attachments,entities'
-        media_fields = 'url,preview_image_url,type,media_key'
+        media_fields = 'url,preview_image_url,type,media_key,variants'
         user_fields = 'id,name,username,profile_image_url'
         expansions = 'attachments.media_keys,author_id'
         
@@ -185,7 +385,7 @@ class XAPIManager:
             params['place.fields'] = 'id,full_name,country,country_code,geo,name,place_type'
             params['expansions'] += ',attachments.poll_ids,geo.place_id'
         
-        return self._get(endpoint, params)
+        return params
     
     def get_tweets(self, tweet_ids: List[str]) -> requests.Response:
         """
@@ -202,7 +402,7 @@ class XAPIManager:
         
         # Base fields for free tier
         tweet_fields = 'id,text,created_at,author_id,public_metrics,attachments,entities'
-        media_fields = 'url,preview_image_url,type,media_key'
+        media_fields = 'url,preview_image_url,type,media_key,variants'
         user_fields = 'id,name,username,profile_image_url'
         expansions = 'attachments.media_keys,author_id'
         
@@ -232,11 +432,12 @@ class XAPIManager:
         self,
         user_id: str,
         max_results: int = 10,
-        since_id: Optional[str] = None,
-        until_id: Optional[str] = None,
+        since_id: Optional[SnowflakeLike] = None,
+        until_id: Optional[SnowflakeLike] = None,
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
-        pagination_token: Optional[str] = None
+        pagination_token: Optional[str] = None,
+        priority: Priority = Priority.BACKGROUND
     ) -> requests.Response:
         """
         Get tweets that mention a specific user.
@@ -248,10 +449,15 @@ class XAPIManager:
         :param start_time: YYYY-MM-DDTHH:mm:ssZ format. The earliest UTC timestamp
         :param end_time: YYYY-MM-DDTHH:mm:ssZ format. The latest UTC timestamp
         :param pagination_token: Token to get the next page of results
+        :param priority: Budget priority; timeline polling is background by default
         :return: Response object
         """
         endpoint = f"users/{user_id}/mentions"
-        
+        params = self._user_mentions_params(max_results)
+        self._add_range_params(params, since_id, until_id, start_time, end_time, pagination_token)
+        return self._get(endpoint, params, priority)
+    
+    def _user_mentions_params(self, max_results: int) -> Dict[str, Any]:
         # Base fields for free tier
         tweet_fields = 'id,text,created_at,author_id,public_metrics,attachments,entities'
         
@@ -262,7 +468,7 @@ class XAPIManager:
         params = {
             'max_results': min(max_results, 100),
             'tweet.fields': tweet_fields,
-            'media.fields': 'url,preview_image_url,type,media_key',
+            'media.fields': 'url,preview_image_url,type,media_key,variants',
             'user.fields': 'id,name,username,profile_image_url',
             'expansions': 'attachments.media_keys,author_id'
         }
@@ -271,20 +477,7 @@ class XAPIManager:
         if self.api_tier in ['basic', 'pro', 'enterprise']:
             params['media.fields'] += ',duration_ms,height,width'
             params['expansions'] += ',referenced_tweets.id'
-        
-        # Add optional parameters if provided
-        if since_id:
-            params['since_id'] = since_id
-        if until_id:
-            params['until_id'] = until_id
-        if start_time:
-            params['start_time'] = start_time
-        if end_time:
-            params['end_time'] = end_time
-        if pagination_token:
-            params['pagination_token'] = pagination_token
-            
-        return self._get(endpoint, params)
+        return params
     
     def get_usage(self) -> requests.Response:
         """
@@ -294,6 +487,137 @@ class XAPIManager:
         endpoint = "usage/tweets"
         return self._get(endpoint)
     
+    def sync_usage(self) -> Dict[str, Any]:
+        """
+        Refresh the budget ledger from the usage endpoint and return the budget snapshot.
+        The usage endpoint reports the project's real consumption, which also covers
+        requests made outside this process.
+        """
+        data = self.get_usage().json().get('data', {})
+        if 'project_usage' in data:
+            self.budget.update_usage(
+                used=int(data['project_usage']),
+                cap=int(data['project_cap']) if data.get('project_cap') else None,
+                reset_day=data.get('cap_reset_day'),
+            )
+        return self.budget_snapshot()
+    
+    def budget_snapshot(self) -> Dict[str, Any]:
+        """Current request budget (monthly cap usage, rate-limit windows, predicted exhaustion)."""
+        return self.budget.snapshot()
+    
+    # ------------------------ Streaming Paginators ------------------------
+    
+    def get_cursor(self, kind: str, user_id: str) -> Optional[str]:
+        """
+        Newest Tweet ID already streamed for a timeline.
+        
+        :param kind: 'tweets' or 'mentions'
+        :param user_id: The Twitter user ID
+        """
+        return self._cursors.get(f"{kind}:{user_id}")
+    
+    def set_cursor(self, kind: str, user_id: str, tweet_id: SnowflakeLike) -> None:
+        """
+        Store the newest Tweet ID for a timeline if it moves the cursor forward.
+        
+        Also used to seed the cursor from a caller's stored last-seen ID after a restart.
+        """
+        key = f"{kind}:{user_id}"
+        if snowflake.is_newer(tweet_id, self._cursors.get(key)):
+            self._cursors[key] = str(snowflake.to_int(tweet_id))
+    
+    async def iter_user_tweets(
+        self,
+        user_id: str,
+        since_id: Optional[SnowflakeLike] = None,
+        max_results: int = 100,
+        max_pages: Optional[int] = None,
+        exclude: Optional[str] = None,
+        priority: Priority = Priority.BACKGROUND
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream a user's tweets newest-first, one page in memory at a time.
+        
+        :param user_id: The Twitter user ID
+        :param since_id: Only yield tweets newer than this; defaults to the stored cursor
+        :param max_results: Page size (max 100)
+        :param max_pages: Stop after this many pages (the cursor is then left untouched)
+        :param exclude: Comma-separated list of types to exclude (e.g., 'retweets,replies')
+        :param priority: Budget priority of the page requests; a refused page raises BudgetExceeded
+        :return: Async iterator of tweets parsed by parse_tweet
+        """
+        params = self._user_tweets_params(max_results, exclude)
+        async for tweet in self._iter_timeline(
+            'tweets', user_id, f"users/{user_id}/tweets", params, since_id, max_pages, priority
+        ):
+            yield tweet
+    
+    async def iter_user_mentions(
+        self,
+        user_id: str,
+        since_id: Optional[SnowflakeLike] = None,
+        max_results: int = 100,
+        max_pages: Optional[int] = None,
+        priority: Priority = Priority.BACKGROUND
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream tweets mentioning a user newest-first, one page in memory at a time.
+        
+        :param user_id: The Twitter user ID
+        :param since_id: Only yield tweets newer than this; defaults to the stored cursor
+        :param max_results: Page size (max 100)
+        :param max_pages: Stop after this many pages (the cursor is then left untouched)
+        :param priority: Budget priority of the page requests; a refused page raises BudgetExceeded
+        :return: Async iterator of tweets parsed by parse_tweet
+        """
+        params = self._user_mentions_params(max_results)
+        async for tweet in self._iter_timeline(
+            'mentions', user_id, f"users/{user_id}/mentions", params, since_id, max_pages, priority
+        ):
+            yield tweet
+    
+    async def _iter_timeline(
+        self,
+        kind: str,
+        user_id: str,
+        endpoint: str,
+        params: Dict[str, Any],
+        since_id: Optional[SnowflakeLike],
+        max_pages: Optional[int],
+        priority: Priority
+    ) -> AsyncIterator[Dict]:
+        if since_id is None:
+            since_id = self.get_cursor(kind, user_id)
+        self._add_range_params(params, since_id=since_id)
+        
+        newest_id = None
+        pages = 0
+        while True:
+            body = (await self._aget(endpoint, params, priority)).json()
+            pages += 1
+            if not body.get('data'):
+                # Empty page: nothing newer than since_id
+                break
+            page = self.parse_tweets(body, stop_at_id=since_id)
+            if newest_id is None:
+                newest_id = page['meta'].get('newest_id') or body['data'][0].get('id')
+            for tweet in page['tweets']:
+                yield tweet
+            
+            next_token = page['meta'].get('next_token')
+            if not next_token or len(page['tweets']) < len(body['data']):
+                # Last page, or since_id was reached inside this one
+                break
+            if max_pages is not None and pages >= max_pages:
+                # Older tweets remain unread, keep the cursor so the gap is fetched next time
+                return
+            params['pagination_token'] = next_token
+        
+        # Only move the cursor once everything down to since_id has been consumed
+        if newest_id:
+            self.set_cursor(kind, user_id, newest_id)
+    
     # ------------------------ Response Parsers ------------------------
     
     @staticmethod
@@ -308,7 +632,28 @@ class XAPIManager:
             logger.error(f"No data in response: {response_data}")
             return None
         
-        user = response_data['data']
+        return XAPIManager.parse_user_object(response_data['data'])
+    
+    @staticmethod
+    def parse_users(response_data: Dict) -> List[Dict]:
+        """
+        Parse a batch user lookup response.
+        
+        :param response_data: API response JSON
+        :return: List of parsed users, same shape as parse_user; missing users are logged and skipped
+        """
+        for error in response_data.get('errors', []):
+            logger.warning(f"User lookup error: {error.get('detail') or error}")
+        return [XAPIManager.parse_user_object(u) for u in response_data.get('data', [])]
+    
+    @staticmethod
+    def parse_user_object(user: Dict) -> Dict:
+        """
+        Parse a single user object.
+        
+        :param user: User object from the 'data' field
+        :return: Parsed user data
+        """
         public_metrics = user.get('public_metrics', {})
         
         return {
@@ -323,11 +668,13 @@ class XAPIManager:
         }
     
     @staticmethod
-    def parse_tweets(response_data: Dict) -> Optional[Dict]:
+    def parse_tweets(response_data: Dict, stop_at_id: Optional[SnowflakeLike] = None) -> Optional[Dict]:
         """
         Parse tweets data from API response.
         
         :param response_data: API response JSON
+        :param stop_at_id: Newest Tweet ID already seen; tweets come newest-first, so parsing
+                           stops at the first one that is not newer
         :return: Dictionary containing parsed tweets and metadata, or None
         """
         if 'data' not in response_data:
@@ -344,8 +691,11 @@ class XAPIManager:
         users_map = {u['id']: u for u in includes.get('users', [])}
         
         parsed_tweets = []
+        author_cache: Dict[str, Dict] = {}
         for tweet in tweets:
-            parsed_tweet = XAPIManager.parse_tweet(tweet, media_map, users_map)
+            if stop_at_id and not snowflake.is_newer(tweet.get('id'), stop_at_id):
+                break
+            parsed_tweet = XAPIManager.parse_tweet(tweet, media_map, users_map, author_cache)
             if parsed_tweet:
                 parsed_tweets.append(parsed_tweet)
         
@@ -358,13 +708,19 @@ class XAPIManager:
         return result
     
     @staticmethod
-    def parse_tweet(tweet: Dict, media_map: Optional[Dict] = None, users_map: Optional[Dict] = None) -> Dict:
+    def parse_tweet(
+        tweet: Dict,
+        media_map: Optional[Dict] = None,
+        users_map: Optional[Dict] = None,
+        author_cache: Optional[Dict] = None
+    ) -> Dict:
         """
         Parse a single tweet.
         
         :param tweet: Tweet data
         :param media_map: Optional media map from includes
         :param users_map: Optional users map from includes
+        :param author_cache: Optional dict reused across one response so each author is built once
         :return: Parsed tweet data
         """
         if media_map is None:
@@ -376,6 +732,7 @@ class XAPIManager:
             'id': tweet.get('id'),
             'text': tweet.get('text'),
             'created_at': tweet.get('created_at'),
+            'timestamp': snowflake.timestamp(tweet.get('id')),
             'author_id': tweet.get('author_id'),
             'lang': tweet.get('lang'),
             'imgs': [],
@@ -385,14 +742,19 @@ class XAPIManager:
         # Add author info if available
         author_id = tweet.get('author_id')
         if author_id and author_id in users_map:
-            author = users_map[author_id]
-            tweet_data['author'] = {
-                'id': author.get('id'),
-                'name': author.get('name'),
-                'username': author.get('username'),
-                'profile_image_url': author.get('profile_image_url'),
-                'verified': author.get('verified', False)
-            }
+            parsed_author = author_cache.get(author_id) if author_cache is not None else None
+            if parsed_author is None:
+                author = users_map[author_id]
+                parsed_author = {
+                    'id': author.get('id'),
+                    'name': author.get('name'),
+                    'username': author.get('username'),
+                    'profile_image_url': author.get('profile_image_url'),
+                    'verified': author.get('verified', False)
+                }
+                if author_cache is not None:
+                    author_cache[author_id] = parsed_author
+            tweet_data['author'] = parsed_author
         
         # Parse metrics
         public_metrics = tweet.get('public_metrics', {})
@@ -428,7 +790,11 @@ class XAPIManager:
                     'type': media_type,
                     'duration_ms': media.get('duration_ms'),
                     'height': media.get('height'),
-                    'width': media.get('width')
+                    'width': media.get('width'),
+                    'variants': [
+                        {'url': v.get('url'), 'bitrate': v.get('bit_rate', 0)}
+                        for v in media.get('variants', []) if v.get('content_type') == 'video/mp4'
+                    ]
                 }
                 tweet_data['videos'].append(video_info)
         
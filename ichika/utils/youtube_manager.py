@@ -1,13 +1,49 @@
+import hashlib
 import traceback
+from typing import Optional, Tuple
+
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from ichika.utils.circuit_breaker import FAILURE, OK, TRIP, BreakerRegistry, CircuitOpen
+
+# Platform name of the circuit breakers
+PLATFORM = 'youtube'
+# Error reasons meaning the key is out of quota or throttled
+QUOTA_REASONS = ('quotaExceeded', 'rateLimitExceeded', 'dailyLimitExceeded', 'userRateLimitExceeded')
+# Minimum seconds to stop calling after a quota error (the daily quota resets at most this late)
+QUOTA_COOLDOWN = 60 * 60
 
 
 class YoutubeManager:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, breakers: Optional[BreakerRegistry] = None):
         """
         :param api_key: Google Cloud Data API v3 key
+        :param breakers: shared circuit breaker registry (defaults to an in-memory one)
         """
         self.youtube = build('youtube', 'v3', developerKey=api_key)
+        self.breakers = breakers or BreakerRegistry()
+        key_id = hashlib.sha256(api_key.encode()).hexdigest()[:12]
+        self.breaker_names = (PLATFORM, f'{PLATFORM}:{key_id}')
+
+    @staticmethod
+    def _classify_error(e: BaseException) -> Tuple[str, Optional[float]]:
+        if isinstance(e, HttpError):
+            status = e.resp.status
+            reasons = [d.get('reason') for d in (e.error_details or []) if isinstance(d, dict)]
+            if status == 429 or (status == 403 and any(r in QUOTA_REASONS for r in reasons)):
+                return TRIP, QUOTA_COOLDOWN
+            if status < 500:
+                # Bad request / not found: the API itself answered
+                return OK, None
+        return FAILURE, None
+
+    def _execute(self, request):
+        """Executes a request behind the circuit breakers; raises CircuitOpen while they are open."""
+        return self.breakers.call_sync(self.breaker_names, request.execute, self._classify_error)
+
+    def breaker_ready(self) -> bool:
+        return self.breakers.ready(*self.breaker_names)
 
     def get_channel_details(self, user_id: str, id_type: str):
         try:
@@ -21,8 +57,10 @@ class YoutubeManager:
                     part="snippet,contentDetails,statistics",
                     id=user_id
                 )
-            response = request.execute()
+            response = self._execute(request)
             return 0, response['items'][0]
+        except CircuitOpen as e:
+            return 503, str(e)
         except Exception as e:
             traceback.print_exc()
             return 500, traceback.format_exc()
@@ -34,9 +72,11 @@ class YoutubeManager:
                 playlistId=playlist_id,
                 maxResults=5
             )
-            response = request.execute()
+            response = self._execute(request)
             res = [i['contentDetails']['videoId'] for i in response['items']]
             return 0, res
+        except CircuitOpen as e:
+            return 503, str(e)
         except Exception as e:
             traceback.print_exc()
             return 500, traceback.format_exc()
@@ -47,7 +87,7 @@ class YoutubeManager:
                 part="snippet,liveStreamingDetails",
                 id=','.join(video_id_list)
             )
-            response = request.execute()
+            response = self._execute(request)
             res = {
                 'live': {},
                 'upcoming': {}
@@ -67,6 +107,8 @@ class YoutubeManager:
                     }
                     res[i['snippet']['liveBroadcastContent']][i['id']] = res_one
             return 0, res
+        except CircuitOpen as e:
+            return 503, str(e)
         except Exception as e:
             traceback.print_exc()
             return 500, traceback.format_exc()
@@ -77,7 +119,7 @@ class YoutubeManager:
                 part="snippet",
                 id=video_id
             )
-            response = request.execute()
+            response = self._execute(request)
             res = {}
             res_row = response['items'][0]['snippet']
             res['name'] = res_row['channelTitle']
@@ -87,6 +129,8 @@ class YoutubeManager:
             res['publishedAt'] = res_row['publishedAt']
             res['thumbnail'] = res_row['thumbnails'].get('high', res_row['thumbnails'].get('medium', res_row['thumbnails'].get('default', {})))['url']
             return 0, res
+        except CircuitOpen as e:
+            return 503, str(e)
         except Exception as e:
             traceback.print_exc()
             return 500, traceback.format_exc()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from ichika.utils import api_budget
+from ichika.utils.api_budget import BudgetExceeded, BudgetLedger, Priority, _period_bounds
+
+
+def ts(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def budget_clock(clock, monkeypatch):
+    clock.now = ts(2026, 3, 16)
+    monkeypatch.setattr(api_budget.time, "time", clock)
+    return clock
+
+
+def headers(limit: int, remaining: int, reset: float) -> dict:
+    return {
+        "x-rate-limit-limit": str(limit),
+        "x-rate-limit-remaining": str(remaining),
+        "x-rate-limit-reset": str(int(reset)),
+    }
+
+
+def test_period_bounds():
+    assert _period_bounds(ts(2026, 3, 16), 1) == (ts(2026, 3, 1), ts(2026, 4, 1))
+    assert _period_bounds(ts(2026, 3, 4), 5) == (ts(2026, 2, 5), ts(2026, 3, 5))
+    assert _period_bounds(ts(2026, 1, 2), 10) == (ts(2025, 12, 10), ts(2026, 1, 10))
+    assert _period_bounds(ts(2026, 12, 20), 10) == (ts(2026, 12, 10), ts(2027, 1, 10))
+
+
+def test_usage_resets_with_the_period(budget_clock):
+    ledger = BudgetLedger(monthly_cap=1000)
+    ledger.record("tweets", {}, posts=40)
+    assert (ledger.used, ledger.calls) == (40, 1)
+    budget_clock.now = ts(2026, 4, 1)
+    assert ledger.snapshot()["used"] == 0
+    assert ledger.period_start == ts(2026, 4, 1)
+
+
+def test_rate_limit_window_keeps_a_reserve_for_interactive(budget_clock):
+    ledger = BudgetLedger(monthly_cap=100_000, reserve=0.2)
+    reset = budget_clock.now + 900
+    ledger.record("users/:id/tweets", headers(100, 20, reset))
+    with pytest.raises(BudgetExceeded) as exc:
+        ledger.check("users/:id/tweets", Priority.BACKGROUND)
+    assert exc.value.retry_after == pytest.approx(900)
+    ledger.check("users/:id/tweets", Priority.INTERACTIVE)
+    ledger.check("tweets/:id", Priority.BACKGROUND)
+
+    ledger.record("users/:id/tweets", headers(100, 0, reset))
+    with pytest.raises(BudgetExceeded):
+        ledger.check("users/:id/tweets", Priority.INTERACTIVE)
+    # An expired window no longer blocks
+    budget_clock.advance(901)
+    ledger.check("users/:id/tweets", Priority.BACKGROUND)
+    assert ledger.refused == 2
+
+
+def test_background_is_paced_over_the_period(budget_clock):
+    budget_clock.now = ts(2026, 4, 1)
+    ledger = BudgetLedger(monthly_cap=1000, reserve=0.2)
+    # Only the slack is available at the start of the period
+    ledger.record("tweets", {}, posts=49)
+    ledger.check("tweets", Priority.BACKGROUND)
+    ledger.record("tweets", {}, posts=1)
+    with pytest.raises(BudgetExceeded):
+        ledger.check("tweets", Priority.BACKGROUND)
+    ledger.check("tweets", Priority.INTERACTIVE)
+
+    budget_clock.now = ts(2026, 4, 16)
+    ledger.check("tweets", Priority.BACKGROUND)
+    ledger.record("tweets", {}, posts=950)
+    with pytest.raises(BudgetExceeded) as exc:
+        ledger.check("tweets", Priority.INTERACTIVE)
+    assert exc.value.retry_after == pytest.approx(ts(2026, 5, 1) - ts(2026, 4, 16))
+
+
+def test_state_and_reset_day_survive_a_restart(budget_clock, tmp_path):
+    path = str(tmp_path / "budget.json")
+    ledger = BudgetLedger(monthly_cap=1000, path=path)
+    ledger.update_usage(300, reset_day=20)
+    assert ledger.period_start == ts(2026, 2, 20)
+
+    restored = BudgetLedger(monthly_cap=1000, reset_day=1, path=path)
+    assert restored.reset_day == 20
+    assert restored.used == 300
+    assert restored.period_end == ts(2026, 3, 20)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["reset_day"] == 20
+
+
+def test_saves_on_the_event_loop_run_in_a_thread(budget_clock, tmp_path, monkeypatch):
+    path = str(tmp_path / "budget.json")
+    ledger = BudgetLedger(monthly_cap=1000, path=path)
+    writes = []
+    real_write = ledger._write
+
+    def write(state):
+        writes.append(state["used"])
+        real_write(state)
+
+    monkeypatch.setattr(ledger, "_write", write)
+    to_thread_calls = []
+    real_to_thread = asyncio.to_thread
+
+    async def to_thread(func, *args):
+        to_thread_calls.append(func)
+        return await real_to_thread(func, *args)
+
+    monkeypatch.setattr(api_budget.asyncio, "to_thread", to_thread)
+
+    async def main():
+        ledger.update_usage(5)
+        # Nothing was written on the loop itself
+        assert writes == []
+        ledger.update_usage(7)
+        await ledger.flush()
+
+    asyncio.run(main())
+    assert to_thread_calls
+    assert writes[-1] == 7
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["used"] == 7
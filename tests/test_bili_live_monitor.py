@@ -0,0 +1,82 @@
+import asyncio
+
+from ichika.utils.bili_live_monitor import LiveMonitor, StandInDanmaku, StandInDanmakuServer
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+def run_scenario(scenario, **monitor_kwargs) -> list:
+    """Runs ``scenario(server, monitor)`` against a stand-in server; returns what on_change received."""
+    changes = []
+
+    async def main():
+        server = StandInDanmakuServer()
+        await server.start()
+
+        async def on_change(uid: int, room_id: int, live: bool) -> None:
+            changes.append((uid, room_id, live))
+
+        monitor = LiveMonitor(
+            on_change,
+            client_factory=lambda room_id: StandInDanmaku(room_id, server.host, server.port),
+            **monitor_kwargs,
+        )
+        try:
+            await scenario(server, monitor, changes)
+        finally:
+            await monitor.stop()
+            await server.close()
+
+    asyncio.run(main())
+    return changes
+
+
+def test_repeated_live_is_reported_once():
+    async def scenario(server, monitor, changes):
+        monitor.watch({1: 101})
+        await wait_for(lambda: monitor.connected_uids() == {1})
+        await server.send(101, "LIVE")
+        await server.send(101, "LIVE")
+        await server.send(101, "DANMU_MSG", {"info": []})
+        await server.send(101, "PREPARING")
+        await wait_for(lambda: len(changes) == 2)
+        await server.send(101, "PREPARING")
+        await asyncio.sleep(0.05)
+
+    assert run_scenario(scenario) == [(1, 101, True), (1, 101, False)]
+
+
+def test_dropped_room_reconnects():
+    async def scenario(server, monitor, changes):
+        monitor.watch({1: 101, 2: 102})
+        await wait_for(lambda: monitor.connected_uids() == {1, 2})
+        server.drop(102)
+        await wait_for(lambda: monitor.status()[2]["reconnects"] == 1)
+        await wait_for(lambda: monitor.connected_uids() == {1, 2})
+        assert monitor.status()[1]["reconnects"] == 0
+        await server.send(102, "LIVE")
+        await wait_for(lambda: changes)
+
+    assert run_scenario(scenario, base_backoff=0.05) == [(2, 102, True)]
+
+
+def test_connections_are_capped():
+    async def scenario(server, monitor, changes):
+        monitor.watch({1: 101, 2: 102, 3: 103})
+        await wait_for(lambda: monitor.connected_uids() == {1, 2})
+        assert set(monitor.status()) == {1, 2}
+        assert await server.send(103, "LIVE") == 0
+
+        # A removed room frees its slot on the next watch
+        monitor.watch({2: 102, 3: 103})
+        await wait_for(lambda: monitor.connected_uids() == {2, 3})
+        await server.send(103, "LIVE")
+        await wait_for(lambda: changes)
+
+    assert run_scenario(scenario, max_connections=2) == [(3, 103, True)]
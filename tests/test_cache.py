@@ -0,0 +1,58 @@
+import pytest
+
+from ichika.utils import cache
+from ichika.utils.cache import TTLCache
+
+
+@pytest.fixture
+def cache_clock(clock, monkeypatch):
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(cache_clock):
+    c = TTLCache(ttl=10)
+    c.set("a", 1)
+    assert c.get("a") == 1
+    assert c.is_fresh("a")
+    cache_clock.advance(10)
+    assert c.get("a") is None
+    assert not c.is_fresh("a")
+    assert "a" not in c
+
+
+def test_peek_returns_stale_values(cache_clock):
+    c = TTLCache(ttl=10)
+    c.set("a", 1)
+    cache_clock.advance(60)
+    assert c.peek("a") == 1
+    assert c.peek("missing", "default") == "default"
+
+
+def test_per_entry_ttl_overrides_default(cache_clock):
+    c = TTLCache(ttl=10)
+    c.set("short", 1, ttl=1)
+    c.set("long", 2, ttl=100)
+    cache_clock.advance(5)
+    assert c.get("short") is None
+    assert c.get("long") == 2
+    assert c.items() == {"long": 2}
+
+
+def test_maxsize_evicts_least_recently_used(cache_clock):
+    c = TTLCache(ttl=10, maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    assert list(c) == ["a", "c"]
+
+
+def test_pop_and_clear(cache_clock):
+    c = TTLCache(ttl=10)
+    c.set("a", 1)
+    assert c.pop("a") == 1
+    assert c.pop("a", "gone") == "gone"
+    c.set("b", 2)
+    c.clear()
+    assert len(c) == 0
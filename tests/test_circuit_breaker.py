@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+import pytest
+
+from ichika.utils import circuit_breaker
+from ichika.utils.circuit_breaker import (
+    CLOSED, FAILURE, HALF_OPEN, OK, OPEN, TRIP, BreakerRegistry, CircuitBreaker, CircuitOpen,
+)
+
+
+@pytest.fixture
+def breaker_clock(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker.time, "time", clock)
+    # No jitter, so cooldowns are exact
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda a, b: 1.0)
+    return clock
+
+
+def classify_as(outcome, cooldown=None):
+    return lambda e: (outcome, cooldown)
+
+
+def test_opens_once_the_error_rate_is_reached(breaker_clock):
+    b = CircuitBreaker("x", min_calls=4, error_rate=0.5, base_cooldown=60)
+    b.record_success()
+    b.record_failure()
+    b.record_failure()
+    # Not enough calls yet to trust the rate
+    assert b.state == CLOSED
+    b.record_failure()
+    assert b.state == OPEN
+    assert b.retry_after() == pytest.approx(60)
+    with pytest.raises(CircuitOpen):
+        b.allow()
+
+
+def test_old_outcomes_leave_the_window(breaker_clock):
+    b = CircuitBreaker("x", window=300, min_calls=2, error_rate=0.5)
+    b.record_failure()
+    breaker_clock.advance(301)
+    b.record_success()
+    b.record_success()
+    b.record_failure()
+    assert b.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens_with_backoff(breaker_clock):
+    b = CircuitBreaker("x", base_cooldown=60, max_cooldown=200, half_open_probes=1)
+    b.trip()
+    breaker_clock.advance(60)
+    assert b.ready()
+    assert b.state == HALF_OPEN
+    b.allow()
+    # Only one probe at a time
+    assert not b.ready()
+    with pytest.raises(CircuitOpen):
+        b.allow()
+
+    b.record_failure()
+    assert b.state == OPEN
+    assert b.retry_after() == pytest.approx(120)
+    breaker_clock.advance(120)
+    b.allow()
+    b.record_failure()
+    # Capped at max_cooldown
+    assert b.retry_after() == pytest.approx(200)
+
+    breaker_clock.advance(200)
+    b.allow()
+    b.record_success()
+    assert b.state == CLOSED
+    assert b.trips == 0
+    assert b.total_trips == 3
+
+
+def test_released_probe_can_be_claimed_again(breaker_clock):
+    b = CircuitBreaker("x", base_cooldown=60)
+    b.trip()
+    breaker_clock.advance(60)
+    b.allow()
+    b.release()
+    assert b.ready()
+
+
+def test_trip_honours_a_longer_cooldown(breaker_clock):
+    b = CircuitBreaker("x", base_cooldown=60)
+    b.trip(cooldown=900)
+    assert b.retry_after() == pytest.approx(900)
+
+
+def test_trip_opens_the_credential_but_only_counts_for_the_platform(breaker_clock):
+    registry = BreakerRegistry(min_calls=2)
+
+    async def fail():
+        raise RuntimeError("429")
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await registry.call(["p", "p:a"], fail, classify_as(TRIP, 300))
+
+    asyncio.run(main())
+    assert registry.get("p:a").state == OPEN
+    assert registry.get("p:a").retry_after() == pytest.approx(300)
+    assert registry.get("p").state == CLOSED
+    assert not registry.ready("p", "p:a")
+    assert registry.ready("p", "p:b")
+
+
+def test_refused_call_does_not_hold_a_probe(breaker_clock):
+    registry = BreakerRegistry(base_cooldown=60)
+    registry.get("p").trip()
+    registry.get("p:a").trip(cooldown=600)
+    breaker_clock.advance(60)
+    calls = []
+
+    async def ok():
+        calls.append(1)
+
+    async def main():
+        with pytest.raises(CircuitOpen):
+            await registry.call(["p", "p:a"], ok, classify_as(FAILURE))
+        await registry.call(["p", "p:b"], ok, classify_as(FAILURE))
+
+    asyncio.run(main())
+    assert calls == [1]
+    assert registry.get("p").state == CLOSED
+
+
+def test_ok_classified_errors_count_as_success(breaker_clock):
+    registry = BreakerRegistry(min_calls=1)
+
+    def not_found():
+        raise KeyError("gone")
+
+    with pytest.raises(KeyError):
+        registry.call_sync(["p"], not_found, classify_as(OK))
+    assert registry.get("p").state == CLOSED
+
+
+def test_state_survives_a_restart(breaker_clock, tmp_path):
+    path = str(tmp_path / "breakers.json")
+    registry = BreakerRegistry(path=path, base_cooldown=60)
+    registry.get("p:a").trip(cooldown=600)
+    registry.get("p")
+
+    restored = BreakerRegistry(path=path, base_cooldown=60)
+    assert restored.get("p").state == CLOSED
+    # Breakers not used since the restart keep their saved state
+    restored.save(force=True)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["p:a"]["state"] == OPEN
+    assert restored.get("p:a").state == OPEN
+    assert restored.get("p:a").retry_after() == pytest.approx(600)
+
+
+def test_saves_on_the_event_loop_run_in_a_thread(breaker_clock, tmp_path, monkeypatch):
+    path = str(tmp_path / "breakers.json")
+    registry = BreakerRegistry(path=path)
+    to_thread_calls = []
+    real_to_thread = asyncio.to_thread
+
+    async def to_thread(func, *args):
+        to_thread_calls.append(func)
+        return await real_to_thread(func, *args)
+
+    monkeypatch.setattr(circuit_breaker.asyncio, "to_thread", to_thread)
+
+    async def main():
+        registry.get("p").trip()
+        # Nothing was written on the loop itself
+        assert not (tmp_path / "breakers.json").exists()
+        registry.get("q").trip()
+        await registry.flush()
+
+    asyncio.run(main())
+    assert to_thread_calls
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"p", "q"}
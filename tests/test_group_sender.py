@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from nonebot.adapters.onebot.v11 import ActionFailed, ApiNotAvailable, NetworkError
+
+from ichika.utils import group_sender
+from ichika.utils.group_sender import GroupSender
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def sleep(seconds):
+        pass
+
+    monkeypatch.setattr(group_sender.asyncio, "sleep", sleep)
+
+
+class FakeBot:
+    """Fails each group's first sends with the queued errors, then succeeds."""
+
+    def __init__(self, errors: dict):
+        self.errors = {gid: list(errs) for gid, errs in errors.items()}
+        self.calls = []
+
+    async def send_group_msg(self, group_id: int, message) -> None:
+        self.calls.append(group_id)
+        errors = self.errors.get(group_id)
+        if errors:
+            raise errors.pop(0)
+
+
+def refused() -> NetworkError:
+    try:
+        raise NetworkError("HTTP request failed") from ConnectionRefusedError()
+    except NetworkError as e:
+        return e
+
+
+def send(bot: FakeBot, groups, **kwargs) -> list:
+    sender = GroupSender(min_interval=0, **kwargs)
+    return asyncio.run(sender.send(bot, groups, "hi"))
+
+
+def test_undelivered_failures_are_retried():
+    bot = FakeBot({
+        1: [ApiNotAvailable()],
+        2: [refused()],
+        3: [NetworkError("HTTP request received unexpected status code: 429")],
+        4: [ActionFailed(retcode=1429)],
+    })
+    assert send(bot, [1, 2, 3, 4], retry_retcodes=[1429]) == []
+    assert sorted(bot.calls) == [1, 1, 2, 2, 3, 3, 4, 4]
+
+
+def test_possibly_delivered_failures_are_dropped():
+    bot = FakeBot({
+        1: [NetworkError("WebSocket call api send_group_msg timeout")],
+        2: [ActionFailed(retcode=100)],
+        3: [RuntimeError("unexpected")],
+    })
+    # Not retried, and not reported as failed so callers do not send again
+    assert send(bot, [1, 2, 3]) == []
+    assert sorted(bot.calls) == [1, 2, 3]
+
+
+def test_retries_are_limited():
+    bot = FakeBot({1: [ApiNotAvailable()] * 3})
+    assert send(bot, [1, 2], retries=2) == [1]
+    assert bot.calls.count(1) == 3
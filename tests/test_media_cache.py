@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+
+from ichika.utils.media_cache import MediaCache
+
+URL = "https://img.example/a.png"
+
+
+def make_cache(tmp_path, handler) -> MediaCache:
+    cache = MediaCache(tmp_path, max_bytes=1024 * 1024)
+    cache._clients[None] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return cache
+
+
+def test_concurrent_fetches_share_one_download(tmp_path):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, content=b"png", headers={"content-type": "image/png"})
+
+    cache = make_cache(tmp_path, handler)
+
+    async def main():
+        return await asyncio.gather(cache.fetch(URL), cache.fetch(URL))
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert first.read_bytes() == b"png"
+    assert len(requests) == 1
+
+
+def test_cancelled_download_releases_waiters(tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200, content=b"png")
+
+    cache = make_cache(tmp_path, handler)
+
+    async def main():
+        owner = asyncio.create_task(cache.fetch(URL))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.fetch(URL))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        # The waiter gives up with None instead of hanging on the orphaned future
+        assert await asyncio.wait_for(waiter, 1) is None
+        assert URL not in cache._inflight
+
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import pytest
+
+from ichika.utils.poll_schedule import (
+    DEFAULT_HALF_LIFE, activity_rate, allocate_intervals, record_activity, seed_activity,
+)
+
+NOW = 1_700_000_000.0
+
+
+def test_record_activity_decays_the_old_score():
+    entry = record_activity(None, 4, NOW)
+    assert entry == {"score": 4, "updated": NOW}
+    later = record_activity(entry, 1, NOW + DEFAULT_HALF_LIFE)
+    assert later["score"] == pytest.approx(2 + 1)
+    assert later["updated"] == NOW + DEFAULT_HALF_LIFE
+
+
+def test_record_activity_does_not_mutate_its_input():
+    entry = {"score": 1.0, "updated": NOW}
+    record_activity(entry, 3, NOW + 10)
+    assert entry == {"score": 1.0, "updated": NOW}
+
+
+def test_seed_activity_matches_page_rate():
+    # 10 posts over the last 10 hours -> 1 post per hour
+    stamps = [NOW - 3600 * i for i in range(1, 11)]
+    entry = seed_activity(stamps, NOW)
+    assert activity_rate(entry, NOW) == pytest.approx(1.0)
+
+
+def test_seed_activity_ignores_future_stamps_and_empty_pages():
+    assert seed_activity([], NOW) == {"score": 0.0, "updated": NOW}
+    assert seed_activity([NOW + 60], NOW)["score"] == 0.0
+
+
+def test_activity_rate_of_unknown_account_is_zero():
+    assert activity_rate(None, NOW) == 0.0
+
+
+def test_allocate_intervals_follows_square_root_rule():
+    intervals = allocate_intervals({"busy": 16.0, "quiet": 1.0}, budget=50, min_interval=1, max_interval=1e9)
+    freqs = {k: 3600 / v for k, v in intervals.items()}
+    assert sum(freqs.values()) == pytest.approx(50)
+    # sqrt(16.01) / sqrt(1.01) ~= 4
+    assert freqs["busy"] / freqs["quiet"] == pytest.approx(4, rel=0.01)
+
+
+def test_allocate_intervals_water_fills_around_the_bounds():
+    rates = {"hot": 1000.0, "warm": 1.0, "cold": 0.0}
+    intervals = allocate_intervals(rates, budget=60, min_interval=120, max_interval=3600)
+    # "hot" is pinned at the shortest interval; the rest of the budget is shared by the others
+    assert intervals["hot"] == pytest.approx(120)
+    freqs = {k: 3600 / v for k, v in intervals.items()}
+    assert sum(freqs.values()) == pytest.approx(60)
+    assert all(120 <= v <= 3600 for v in intervals.values())
+
+
+def test_allocate_intervals_respects_max_interval_when_budget_is_tiny():
+    intervals = allocate_intervals({"a": 0.0, "b": 0.0}, budget=0.1, min_interval=60, max_interval=3600)
+    assert intervals == {"a": pytest.approx(3600), "b": pytest.approx(3600)}
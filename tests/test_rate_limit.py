@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from ichika.utils import rate_limit
+from ichika.utils.rate_limit import TokenBucket
+
+
+@pytest.fixture
+def bucket_clock(clock, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.advance(seconds)
+
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    clock.sleeps = sleeps
+    return clock
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_per_window_defaults_burst_to_request_count():
+    bucket = TokenBucket.per_window(90, 900)
+    assert bucket.rate == pytest.approx(0.1)
+    assert bucket.capacity == 90
+    assert TokenBucket.per_window(90, 900, burst=5).capacity == 5
+
+
+def test_refill_is_capped_at_capacity(bucket_clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+    assert bucket.available == 4
+    asyncio.run(bucket.acquire(3))
+    assert bucket.available == pytest.approx(1)
+    bucket_clock.advance(1)
+    assert bucket.available == pytest.approx(3)
+    bucket_clock.advance(60)
+    assert bucket.available == 4
+
+
+def test_acquire_waits_only_for_the_missing_tokens(bucket_clock):
+    bucket = TokenBucket(rate=0.5, capacity=1)
+
+    async def run():
+        await bucket.acquire()
+        await bucket.acquire()
+
+    asyncio.run(run())
+    # The first token was there; the second needed 1 / 0.5 = 2 seconds of refill
+    assert bucket_clock.sleeps == [pytest.approx(2)]
+
+
+def test_concurrent_waiters_are_spread_over_the_budget(bucket_clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    finished = []
+
+    async def worker(i: int) -> None:
+        await bucket.acquire()
+        finished.append((i, bucket_clock()))
+
+    async def run():
+        await asyncio.gather(*(worker(i) for i in range(4)))
+
+    start = bucket_clock()
+    asyncio.run(run())
+    assert [i for i, _ in finished] == [0, 1, 2, 3]
+    assert [t - start for _, t in finished] == pytest.approx([0, 1, 2, 3])
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from ichika.utils import cache
+from ichika.utils.cache import SingleFlightCache
+
+
+@pytest.fixture
+def cache_clock(clock, monkeypatch):
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_concurrent_lookups_share_one_fetch(cache_clock):
+    c = SingleFlightCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(c.get_or_fetch("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+    assert (c.hits, c.misses) == (4, 1)
+
+
+def test_cached_value_is_reused_until_ttl(cache_clock):
+    c = SingleFlightCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert asyncio.run(c.get_or_fetch("k", fetch)) == 1
+    assert asyncio.run(c.get_or_fetch("k", fetch)) == 1
+    cache_clock.advance(60)
+    assert asyncio.run(c.get_or_fetch("k", fetch)) == 2
+
+
+def test_none_is_cached_for_negative_ttl(cache_clock):
+    c = SingleFlightCache(ttl=60, negative_ttl=5)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+
+    assert asyncio.run(c.get_or_fetch("gone", fetch)) is None
+    assert asyncio.run(c.get_or_fetch("gone", fetch)) is None
+    assert len(calls) == 1
+    cache_clock.advance(5)
+    asyncio.run(c.get_or_fetch("gone", fetch))
+    assert len(calls) == 2
+
+
+def test_errors_propagate_to_every_waiter_and_are_not_cached(cache_clock):
+    c = SingleFlightCache(ttl=60)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(*(c.get_or_fetch("k", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 1
+
+    async def ok():
+        return "recovered"
+
+    assert asyncio.run(c.get_or_fetch("k", ok)) == "recovered"
@@ -0,0 +1,42 @@
+import pytest
+
+from ichika.utils import snowflake
+
+# 2023-01-01T00:00:00Z
+TS = 1672531200.0
+
+
+def test_timestamp_roundtrip():
+    sid = snowflake.from_timestamp(TS)
+    assert snowflake.timestamp(sid) == pytest.approx(TS)
+    assert snowflake.timestamp(str(sid + 12345)) == pytest.approx(TS, abs=0.001)
+
+
+def test_comparison_is_numeric_across_lengths():
+    short, long_ = "999999999999999999", "1000000000000000000"
+    # As strings the shorter ID would sort after the longer one
+    assert short > long_
+    assert snowflake.is_newer(long_, short)
+    assert not snowflake.is_newer(short, long_)
+    assert snowflake.max_id([short, long_]) == long_
+
+
+def test_everything_is_newer_than_an_empty_id():
+    assert snowflake.is_newer("1", "")
+    assert snowflake.is_newer("1", None)
+
+
+def test_max_id_of_nothing_is_none():
+    assert snowflake.max_id([]) is None
+
+
+def test_non_snowflake_ids_have_no_timestamp():
+    # Pre-2010 sequential IDs and junk carry no time
+    assert snowflake.timestamp("12345") is None
+    assert not snowflake.is_snowflake("abc")
+    assert not snowflake.is_snowflake(-1)
+
+
+def test_to_int_rejects_negative_ids():
+    with pytest.raises(ValueError):
+        snowflake.to_int("-5")
@@ -0,0 +1,177 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from ichika.utils import video_cache
+from ichika.utils.video_cache import VideoCache, choose_variant, estimate_size
+
+URL = "https://video.example/v.mp4"
+BODY = bytes(range(256)) * 40
+# asyncio.sleep is stubbed out in every test; this one really yields
+real_sleep = asyncio.sleep
+
+
+class Origin:
+    """Serves BODY over a MockTransport, optionally breaking the first response midway."""
+
+    def __init__(self, body: bytes = BODY, ranges: bool = True, break_after: int = 0):
+        self.body = body
+        self.ranges = ranges
+        self.break_after = break_after
+        self.requests = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("range")
+        self.requests.append(range_header)
+        start = int(range_header[len("bytes="):-1]) if range_header and self.ranges else 0
+        if start >= len(self.body) and range_header:
+            return httpx.Response(416)
+        data = self.body[start:]
+        headers = {"content-length": str(len(data))}
+        status = 206 if start else 200
+        if self.break_after:
+            cut, self.break_after = self.break_after, 0
+
+            async def broken():
+                yield data[:cut]
+                raise httpx.ReadError("connection reset")
+
+            return httpx.Response(status, headers=headers, content=broken())
+        return httpx.Response(status, headers=headers, content=data)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    async def sleep(seconds):
+        pass
+
+    monkeypatch.setattr(video_cache.asyncio, "sleep", sleep)
+    # Small chunks, so what arrived before a break is on disk
+    monkeypatch.setattr(video_cache, "_CHUNK_SIZE", 500)
+
+
+def make_cache(tmp_path, origin: Origin, **kwargs) -> VideoCache:
+    kwargs.setdefault("max_bytes", 1024 * 1024)
+    kwargs.setdefault("max_file_bytes", 1024 * 1024)
+    cache = VideoCache(tmp_path, **kwargs)
+    cache._clients[None] = httpx.AsyncClient(transport=httpx.MockTransport(origin.handler))
+    return cache
+
+
+def test_choose_variant_picks_the_best_fit():
+    variants = [
+        {"url": "low", "bitrate": 256_000},
+        {"url": "mid", "bitrate": 832_000},
+        {"url": "high", "bitrate": 2_176_000},
+        {"url": "playlist", "content_type": "application/x-mpegURL"},
+    ]
+    assert estimate_size(variants[1], 10_000) == 1_040_000
+    assert estimate_size(variants[1], None) is None
+    assert choose_variant(variants, 10_000, 2_000_000)["url"] == "mid"
+    assert choose_variant(variants, 10_000, 100_000) is None
+    # Without a duration the smallest one is tried
+    assert choose_variant(variants, None, 100_000)["url"] == "low"
+    assert choose_variant(variants[3:], 10_000, 2_000_000) is None
+
+
+def test_download_is_cached(tmp_path):
+    origin = Origin()
+    cache = make_cache(tmp_path, origin)
+
+    async def main():
+        first, second = await asyncio.gather(cache.fetch(URL), cache.fetch(URL))
+        third = await cache.fetch(URL)
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert first == second == third
+    assert first.read_bytes() == BODY
+    assert origin.requests == [None]
+    assert cache._total == len(BODY)
+
+
+def test_interrupted_download_resumes_with_range(tmp_path):
+    origin = Origin(break_after=1000)
+    cache = make_cache(tmp_path, origin)
+    path = asyncio.run(cache.fetch(URL))
+    assert path.read_bytes() == BODY
+    assert origin.requests == [None, "bytes=1000-"]
+    assert not list(tmp_path.glob("*.part"))
+    assert cache._total == len(BODY)
+
+
+def test_leftover_part_is_resumed(tmp_path):
+    origin = Origin()
+    cache = make_cache(tmp_path, origin)
+    part = cache._path(URL).with_name(cache._path(URL).name + ".part")
+    part.write_bytes(BODY[:3000])
+    path = asyncio.run(cache.fetch(URL))
+    assert path.read_bytes() == BODY
+    assert origin.requests == ["bytes=3000-"]
+
+
+def test_complete_part_is_renamed_on_416(tmp_path):
+    origin = Origin()
+    cache = make_cache(tmp_path, origin)
+    part = cache._path(URL).with_name(cache._path(URL).name + ".part")
+    part.write_bytes(BODY)
+    assert asyncio.run(cache.fetch(URL)).read_bytes() == BODY
+
+
+def test_server_without_range_support_restarts(tmp_path):
+    origin = Origin(ranges=False)
+    cache = make_cache(tmp_path, origin)
+    part = cache._path(URL).with_name(cache._path(URL).name + ".part")
+    part.write_bytes(b"stale")
+    assert asyncio.run(cache.fetch(URL)).read_bytes() == BODY
+
+
+def test_oversized_video_is_skipped(tmp_path):
+    origin = Origin()
+    cache = make_cache(tmp_path, origin, max_file_bytes=len(BODY) - 1)
+    assert asyncio.run(cache.fetch(URL)) is None
+    assert list(tmp_path.iterdir()) == []
+    assert cache._total == 0
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    old = tmp_path / "old.mp4"
+    recent = tmp_path / "recent.mp4"
+    old.write_bytes(b"x" * 5000)
+    recent.write_bytes(b"x" * 5000)
+    os.utime(old, (1, 1))
+    origin = Origin()
+    cache = make_cache(tmp_path, origin, max_bytes=len(BODY) + 6000)
+    path = asyncio.run(cache.fetch(URL))
+    assert path.read_bytes() == BODY
+    assert not old.exists()
+    assert recent.exists()
+    assert cache._total == len(BODY) + 5000
+
+
+def test_quota_too_small_gives_up(tmp_path):
+    origin = Origin()
+    cache = make_cache(tmp_path, origin, max_bytes=len(BODY) - 1)
+    assert asyncio.run(cache.fetch(URL)) is None
+    assert cache._total == 0
+
+
+def test_cancelled_download_releases_waiters(tmp_path):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.Event().wait()
+
+    cache = make_cache(tmp_path, Origin())
+    cache._clients[None] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def main():
+        owner = asyncio.create_task(cache.fetch(URL))
+        await real_sleep(0.01)
+        waiter = asyncio.create_task(cache.fetch(URL))
+        await real_sleep(0.01)
+        owner.cancel()
+        assert await asyncio.wait_for(waiter, 1) is None
+        assert URL not in cache._inflight
+
+    asyncio.run(main())